@@ -0,0 +1,25 @@
+"""transaction indexes
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Support time-range and per-address scans of the ledger
+    op.create_index('ix_transactions_timestamp_id', 'transactions', ['timestamp', 'id'])
+    op.create_index('ix_transactions_sender_timestamp', 'transactions', ['sender', 'timestamp'])
+    op.create_index('ix_transactions_recipient_timestamp', 'transactions', ['recipient', 'timestamp'])
+
+def downgrade():
+    op.drop_index('ix_transactions_recipient_timestamp', table_name='transactions')
+    op.drop_index('ix_transactions_sender_timestamp', table_name='transactions')
+    op.drop_index('ix_transactions_timestamp_id', table_name='transactions')
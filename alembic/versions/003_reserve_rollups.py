@@ -0,0 +1,39 @@
+"""reserve rollups
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Support time-range scans of one reserve type's history
+    op.create_index('ix_reserves_type_timestamp', 'reserves', ['type', 'timestamp'])
+
+    # Minute, hour and day buckets of reserve levels
+    op.create_table(
+        'reserve_rollups',
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('resolution', sa.String(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('min', sa.Numeric(precision=36, scale=18), nullable=False),
+        sa.Column('max', sa.Numeric(precision=36, scale=18), nullable=False),
+        sa.Column('sum', sa.Numeric(precision=48, scale=18), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('last', sa.Numeric(precision=36, scale=18), nullable=False),
+        sa.PrimaryKeyConstraint('type', 'resolution', 'bucket_start')
+    )
+    op.create_index('ix_reserve_rollups_resolution_bucket', 'reserve_rollups', ['resolution', 'bucket_start'])
+
+def downgrade():
+    op.drop_index('ix_reserve_rollups_resolution_bucket', table_name='reserve_rollups')
+    op.drop_table('reserve_rollups')
+    op.drop_index('ix_reserves_type_timestamp', table_name='reserves')
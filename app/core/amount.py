@@ -0,0 +1,140 @@
+from decimal import (
+    Context,
+    Decimal,
+    ROUND_CEILING,
+    ROUND_DOWN,
+    ROUND_FLOOR,
+    ROUND_HALF_DOWN,
+    ROUND_HALF_EVEN,
+    ROUND_HALF_UP,
+    ROUND_UP
+)
+from typing import Iterable, List, Optional, Tuple, Union
+
+# Amounts inside the managers are plain ints of 10^-18 DAC, matching the
+# Numeric(36, 18) columns: add, subtract and compare are exact integer
+# operations, and scaling by a ratio rounds once with an explicit decimal
+# rounding mode. Decimal is used only where amounts enter or leave (request
+# and response models, database rows, log records and snapshots).
+DECIMALS = 18
+SCALE = 10 ** DECIMALS
+
+# Wide enough for any Numeric(36, 18) value, so conversions never round
+_CONTEXT = Context(prec=60)
+_SCALE_DECIMAL = Decimal(SCALE)
+
+def to_units(value: Union[Decimal, int, str], rounding: Optional[str] = None) -> int:
+    """
+    Converts an amount to integer units
+    
+    Args:
+        value: Amount in DAC
+        rounding: How to round digits beyond 18 decimal places, one of the
+            modes mul_ratio supports; by default such amounts are rejected
+            
+    Returns:
+        int: Amount in 10^-18 units
+        
+    Raises:
+        ValueError: The amount is not finite, or is not representable and no
+            rounding mode was given
+    """
+    if isinstance(value, int):
+        return value * SCALE
+    if not isinstance(value, Decimal):
+        value = Decimal(value)
+    # One exact integer division, rather than rescaling and rounding a Decimal
+    try:
+        numerator, denominator = value.as_integer_ratio()
+    except (OverflowError, ValueError):
+        raise ValueError(f"Amount is not finite: {value}")
+    units, remainder = divmod(numerator * SCALE, denominator)
+    if not remainder:
+        return units
+    if rounding is None:
+        raise ValueError(f"Amount has more than {DECIMALS} decimal places: {value}")
+    return mul_ratio(numerator, SCALE, denominator, rounding)
+
+def from_units(units: int) -> Decimal:
+    """Converts integer units to a Decimal amount without trailing zeros"""
+    return _CONTEXT.divide(Decimal(units), _SCALE_DECIMAL)
+
+def positive_units(amount: Decimal) -> Optional[int]:
+    """Returns a positive amount in units, None if it is not positive or not representable"""
+    try:
+        units = to_units(amount)
+    except ValueError:
+        return None
+    return units if units > 0 else None
+
+def mul_ratio(units: int, numerator: int, denominator: int, rounding: str = ROUND_HALF_EVEN) -> int:
+    """
+    Multiplies an amount by numerator / denominator, rounding once
+    
+    Args:
+        units: Amount in units
+        numerator: Integer numerator of the factor
+        denominator: Non-zero integer denominator of the factor
+        rounding: decimal rounding mode applied to the exact result
+        
+    Returns:
+        int: Rounded result in units
+    """
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    quotient, remainder = divmod(units * numerator, denominator)
+    if not remainder:
+        return quotient
+        
+    # The exact result lies strictly between quotient and quotient + 1
+    negative = quotient < 0
+    if rounding == ROUND_FLOOR:
+        return quotient
+    if rounding == ROUND_CEILING:
+        return quotient + 1
+    if rounding == ROUND_DOWN:
+        return quotient + 1 if negative else quotient
+    if rounding == ROUND_UP:
+        return quotient if negative else quotient + 1
+        
+    twice = remainder * 2
+    if twice > denominator:
+        return quotient + 1
+    if twice < denominator:
+        return quotient
+    if rounding == ROUND_HALF_EVEN:
+        return quotient + (quotient & 1)
+    if rounding == ROUND_HALF_UP:
+        return quotient if negative else quotient + 1
+    if rounding == ROUND_HALF_DOWN:
+        return quotient + 1 if negative else quotient
+    raise ValueError(f"Unsupported rounding mode: {rounding}")
+
+def mul(units: int, factor_units: int, rounding: str = ROUND_HALF_EVEN) -> int:
+    """Multiplies two fixed-point amounts, e.g. an amount by a rate held in units"""
+    return mul_ratio(units, factor_units, SCALE, rounding)
+
+def ratio(value: Union[Decimal, int, float, str]) -> Tuple[int, int]:
+    """
+    Returns a factor as an exact (numerator, denominator) pair
+    
+    Floats are taken at their shortest repr, so 1.1 means 11/10 rather than
+    the nearest binary fraction.
+    """
+    if isinstance(value, int):
+        return value, 1
+    if isinstance(value, float):
+        value = repr(value)
+    return Decimal(value).as_integer_ratio()
+
+def floats_to_units(values: Iterable[float], rounding: str = ROUND_HALF_EVEN) -> List[int]:
+    """
+    Converts finite floats to units, each at its exact binary value and rounded once
+    
+    Matches to_units(Decimal(value), rounding) without building Decimals, for
+    converting many valuations, e.g. a NumPy array's tolist(), at once.
+    """
+    return [
+        mul_ratio(numerator, SCALE, denominator, rounding)
+        for numerator, denominator in map(float.as_integer_ratio, values)
+    ]
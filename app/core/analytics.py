@@ -1,23 +1,51 @@
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Dict, List, Optional, Tuple
-from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional, Tuple
 import logging
 
+from .amount import from_units, mul_ratio, to_units
+from .rollups import RESOLUTIONS, ROLLUP_RESOLUTIONS, Aggregate, RollupStore, bucket_start
+from .series import TimeSeries
+
 logger = logging.getLogger(__name__)
 
 class AnalyticsManager:
-    """Manages system analytics and reporting"""
+    """
+    Manages system analytics and reporting
+    
+    Transactions, supply levels and reserve states are folded into minute,
+    hour and day rollups as they are recorded, so metrics over a range are
+    computed from the few coarse buckets that tile it, and given a
+    resolution, come with one point per bucket. Supply levels are also kept
+    individually for exact supply metrics.
+    """
     
-    def __init__(self):
-        self._supply_history: List[Tuple[datetime, Decimal]] = []
-        self._transaction_volume: Dict[datetime, Decimal] = defaultdict(Decimal)
-        self._active_users: Dict[datetime, set] = defaultdict(set)
-        self._reserve_history: Dict[datetime, Dict[str, Decimal]] = {}
+    def __init__(
+        self,
+        retention: Optional[Dict[str, Optional[float]]] = None,
+        max_points: int = 500
+    ):
+        """
+        Args:
+            retention: Seconds to keep each rollup resolution ("minute",
+                "hour", "day"); missing or None keeps it forever
+            max_points: Most buckets one metrics history may return
+        """
+        # Supply, volume and reserves are held in 10^-18 units
+        self._supply_history = TimeSeries()
+        self._supply_rollups = RollupStore(retention)
+        # Per bucket, a "volume" Aggregate of amounts and a "users" set
+        self._transaction_rollups = RollupStore(retention)
+        # Per bucket, an Aggregate of levels per reserve type
+        self._reserve_rollups = RollupStore(retention)
+        self._max_points = max_points
         
-    async def record_supply_change(self, amount: Decimal) -> None:
-        """Records a change in total supply"""
-        self._supply_history.append((datetime.utcnow(), amount))
+    async def record_supply_change(self, amount: Decimal, timestamp: Optional[datetime] = None) -> None:
+        """Records the total supply after a change"""
+        ts = timestamp or datetime.utcnow()
+        units = to_units(amount)
+        self._supply_history.append(ts, units)
+        self._supply_rollups.add(ts, "supply", units)
         logger.info(f"Recorded supply change: {amount}")
         
     async def record_transaction(
@@ -28,9 +56,8 @@ class AnalyticsManager:
     ) -> None:
         """Records a transaction for volume tracking"""
         ts = timestamp or datetime.utcnow()
-        date_key = ts.date()
-        self._transaction_volume[date_key] += amount
-        self._active_users[date_key].add(user_id)
+        self._transaction_rollups.add(ts, "volume", to_units(amount))
+        self._transaction_rollups.add_member(ts, "users", user_id)
         logger.info(f"Recorded transaction: {amount} DAC")
         
     async def record_reserve_state(
@@ -40,114 +67,171 @@ class AnalyticsManager:
     ) -> None:
         """Records the state of reserves"""
         ts = timestamp or datetime.utcnow()
-        self._reserve_history[ts] = reserves.copy()
+        for reserve_type, amount in reserves.items():
+            self._reserve_rollups.add(ts, reserve_type, to_units(amount))
         logger.info("Recorded reserve state")
         
     async def get_supply_metrics(
         self,
         start_time: Optional[datetime] = None,
-        end_time: Optional[datetime] = None
-    ) -> Dict[str, Decimal]:
-        """Calculates supply metrics for a time period"""
-        filtered_history = [
-            (ts, amount) for ts, amount in self._supply_history
-            if (not start_time or ts >= start_time) and
-               (not end_time or ts <= end_time)
-        ]
+        end_time: Optional[datetime] = None,
+        resolution: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Calculates supply metrics for a time period
         
-        if not filtered_history:
-            return {
-                "current_supply": Decimal('0'),
-                "max_supply": Decimal('0'),
-                "min_supply": Decimal('0'),
-                "average_supply": Decimal('0')
-            }
-            
-        amounts = [amount for _, amount in filtered_history]
-        return {
-            "current_supply": amounts[-1],
-            "max_supply": max(amounts),
-            "min_supply": min(amounts),
-            "average_supply": sum(amounts) / len(amounts)
-        }
+        Without a range this reads running totals; a range is answered in
+        O(log n) from the supply history's segment trees.
+        
+        Args:
+            start_time: Start of the period, or None for all history
+            end_time: End of the period, or None for up to now
+            resolution: "minute", "hour" or "day" to add the metrics of each
+                bucket in the period as history
+                
+        Raises:
+            ValueError: Unknown resolution, or more than max_points buckets
+        """
+        metrics = self._supply_metrics(self._supply_history.summary(start_time, end_time))
+        if resolution:
+            metrics["history"] = [
+                {"timestamp": bucket_time, **self._supply_metrics(bucket["supply"])}
+                for bucket_time, bucket in self._supply_rollups.buckets(
+                    *self._history_range(start_time, end_time, resolution), resolution
+                )
+            ]
+        return metrics
         
     async def get_transaction_metrics(
         self,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
-    ) -> Dict[str, any]:
-        """Calculates transaction metrics for a time period"""
-        filtered_volume = {
-            date: volume for date, volume in self._transaction_volume.items()
-            if (not start_date or date >= start_date.date()) and
-               (not end_date or date <= end_date.date())
-        }
+        end_date: Optional[datetime] = None,
+        resolution: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Calculates transaction metrics for a time period
         
-        filtered_users = {
-            date: users for date, users in self._active_users.items()
-            if (not start_date or date >= start_date.date()) and
-               (not end_date or date <= end_date.date())
-        }
+        Daily averages are over the days with transactions in the period.
         
-        if not filtered_volume:
-            return {
+        Args:
+            start_date: Start of the period, or None for all history
+            end_date: End of the period, or None for up to now
+            resolution: "minute", "hour" or "day" to add each bucket's volume,
+                transaction count and active users as history
+                
+        Raises:
+            ValueError: Unknown resolution, or more than max_points buckets
+        """
+        daily_users: Dict[datetime, set] = {}
+        total_volume = 0
+        for bucket_time, _, bucket in self._transaction_rollups.tiles(start_date, end_date):
+            total_volume += bucket["volume"].sum
+            daily_users.setdefault(bucket_start(bucket_time, "day"), set()).update(bucket["users"])
+            
+        if not daily_users:
+            metrics = {
                 "total_volume": Decimal('0'),
                 "average_daily_volume": Decimal('0'),
                 "total_active_users": 0,
                 "average_daily_users": 0
             }
+        else:
+            total_days = len(daily_users)
+            metrics = {
+                "total_volume": from_units(total_volume),
+                "average_daily_volume": from_units(mul_ratio(total_volume, 1, total_days)),
+                "total_active_users": len(set().union(*daily_users.values())),
+                "average_daily_users": sum(len(users) for users in daily_users.values()) / total_days
+            }
             
-        total_volume = sum(filtered_volume.values())
-        total_days = len(filtered_volume)
-        unique_users = set().union(*filtered_users.values())
-        
-        return {
-            "total_volume": total_volume,
-            "average_daily_volume": total_volume / total_days,
-            "total_active_users": len(unique_users),
-            "average_daily_users": sum(len(users) for users in filtered_users.values()) / total_days
-        }
+        if resolution:
+            metrics["history"] = [
+                {
+                    "timestamp": bucket_time,
+                    "volume": from_units(bucket["volume"].sum),
+                    "transaction_count": bucket["volume"].count,
+                    "active_users": len(bucket["users"])
+                }
+                for bucket_time, bucket in self._transaction_rollups.buckets(
+                    *self._history_range(start_date, end_date, resolution), resolution
+                )
+            ]
+        return metrics
         
     async def get_reserve_metrics(
         self,
         start_time: Optional[datetime] = None,
-        end_time: Optional[datetime] = None
-    ) -> Dict[str, Dict[str, Decimal]]:
-        """Calculates reserve metrics for a time period"""
-        filtered_history = {
-            ts: reserves for ts, reserves in self._reserve_history.items()
-            if (not start_time or ts >= start_time) and
-               (not end_time or ts <= end_time)
-        }
+        end_time: Optional[datetime] = None,
+        resolution: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Calculates reserve metrics for a time period
         
-        if not filtered_history:
+        Args:
+            start_time: Start of the period, or None for all history
+            end_time: End of the period, or None for up to now
+            resolution: "minute", "hour" or "day" to add the metrics of each
+                bucket in the period as history
+                
+        Raises:
+            ValueError: Unknown resolution, or more than max_points buckets
+        """
+        metrics = self._reserve_metrics(
+            bucket for _, _, bucket in self._reserve_rollups.tiles(start_time, end_time)
+        )
+        if resolution:
+            metrics["history"] = [
+                {"timestamp": bucket_time, **self._reserve_metrics([bucket])}
+                for bucket_time, bucket in self._reserve_rollups.buckets(
+                    *self._history_range(start_time, end_time, resolution), resolution
+                )
+            ]
+        return metrics
+        
+    def _history_range(
+        self,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        resolution: str
+    ) -> Tuple[datetime, datetime]:
+        """Fills in a history range, by default the last max_points buckets up to now"""
+        if resolution not in ROLLUP_RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        seconds = RESOLUTIONS[resolution]
+        end_time = end_time or datetime.utcnow()
+        start_time = start_time or end_time - timedelta(seconds=seconds * (self._max_points - 1))
+        if (end_time - start_time).total_seconds() // seconds + 1 > self._max_points:
+            raise ValueError(f"Range needs more than {self._max_points} {resolution} buckets")
+        return start_time, end_time
+        
+    @staticmethod
+    def _supply_metrics(summary: Optional[Aggregate]) -> Dict[str, Any]:
+        if summary is None:
             return {
-                "current_reserves": {},
-                "average_reserves": {},
-                "min_reserves": {},
-                "max_reserves": {}
+                "current_supply": Decimal('0'),
+                "max_supply": Decimal('0'),
+                "min_supply": Decimal('0'),
+                "average_supply": Decimal('0')
             }
-            
-        # Get the latest reserve state
-        latest_ts = max(filtered_history.keys())
-        current_reserves = filtered_history[latest_ts]
-        
-        # Calculate metrics for each reserve type
-        reserve_types = set().union(*[reserves.keys() for reserves in filtered_history.values()])
-        metrics = {
-            "current_reserves": current_reserves,
-            "average_reserves": {},
-            "min_reserves": {},
-            "max_reserves": {}
+        return {
+            "current_supply": from_units(summary.last),
+            "max_supply": from_units(summary.max),
+            "min_supply": from_units(summary.min),
+            "average_supply": from_units(mul_ratio(summary.sum, 1, summary.count))
         }
         
-        for reserve_type in reserve_types:
-            values = [
-                reserves.get(reserve_type, Decimal('0'))
-                for reserves in filtered_history.values()
-            ]
-            metrics["average_reserves"][reserve_type] = sum(values) / len(values)
-            metrics["min_reserves"][reserve_type] = min(values)
-            metrics["max_reserves"][reserve_type] = max(values)
-            
-        return metrics
+    @staticmethod
+    def _reserve_metrics(buckets: Iterable[Dict[str, Aggregate]]) -> Dict[str, Dict[str, Decimal]]:
+        """Merges per-type aggregates of buckets given in time order"""
+        totals: Dict[str, Aggregate] = {}
+        for bucket in buckets:
+            for reserve_type, aggregate in bucket.items():
+                totals.setdefault(reserve_type, Aggregate()).merge(aggregate)
+        return {
+            "current_reserves": {name: from_units(total.last) for name, total in totals.items()},
+            "average_reserves": {
+                name: from_units(mul_ratio(total.sum, 1, total.count)) for name, total in totals.items()
+            },
+            "min_reserves": {name: from_units(total.min) for name, total in totals.items()},
+            "max_reserves": {name: from_units(total.max) for name, total in totals.items()}
+        }
@@ -0,0 +1,210 @@
+from decimal import Decimal
+from typing import Any, AsyncContextManager, Dict, List, Optional, Tuple
+import asyncio
+import logging
+
+from .amount import from_units, to_units
+from .ledger import ShardedLedger
+from .merkle import MerkleSumTree
+from .transactions import Transaction, TransactionType
+from ..models.currency import Balance
+
+logger = logging.getLogger(__name__)
+
+Effect = Tuple[str, int]  # (address, signed amount in units)
+
+class BalanceBook:
+    """
+    Materialized address balances, updated incrementally as transactions execute
+    
+    Effects by transaction type:
+        ISSUANCE, REWARD: credit the recipient
+        TRANSFER: debit the sender, credit the recipient
+        BURN, REDEMPTION: debit the sender (the recipient if there is no sender)
+        
+    Balances live in a ShardedLedger, so reads are a single dict lookup and
+    transactions on unrelated addresses do not contend. Changed balances are
+    optionally written through to the balances table, and optionally kept
+    in a Merkle sum tree for proof of liabilities.
+    """
+    
+    def __init__(
+        self,
+        ledger: Optional[ShardedLedger] = None,
+        session_factory=None,
+        merkle_tree: Optional[MerkleSumTree] = None
+    ):
+        """
+        Args:
+            ledger: Ledger holding the balances; a new one is created if omitted
+            session_factory: Optional SQLAlchemy session factory for writing
+                changed balances through to the balances table
+            merkle_tree: Optional tree updated with every changed balance
+        """
+        self._ledger = ledger or ShardedLedger()
+        self._session_factory = session_factory
+        self._merkle_tree = merkle_tree
+        
+    @property
+    def merkle_tree(self) -> Optional[MerkleSumTree]:
+        """Merkle sum tree over all balances in units, if enabled"""
+        return self._merkle_tree
+        
+    def get_balance(self, address: str) -> Decimal:
+        """Returns the current balance of an address"""
+        return self._ledger.get_balance(address)
+        
+    def locked(self, *transactions: Transaction) -> AsyncContextManager[None]:
+        """Holds the shard locks of every address the transactions touch"""
+        return self._ledger.locked(*{
+            address for transaction in transactions for address in self._addresses(transaction)
+        })
+        
+    def reserve(self, transactions: List[Transaction]) -> List[Optional[str]]:
+        """
+        Checks transactions against current balances and applies those accepted
+        
+        The check and the changes form one atomic unit of the ledger, so they
+        hold even when balances are shared with other processes. The caller
+        must hold locked() over the transactions, and revert() the accepted
+        ones if they cannot be committed.
+        
+        Returns:
+            List[Optional[str]]: An error per transaction, None where accepted
+        """
+        with self._ledger.atomic():
+            errors = self.check(transactions)
+            self.apply([
+                transaction for transaction, error in zip(transactions, errors) if error is None
+            ])
+        return errors
+        
+    def check(self, transactions: List[Transaction]) -> List[Optional[str]]:
+        """
+        Validates transactions against current balances, applied in order
+        
+        Each transaction sees the effects of the accepted ones before it, so
+        a batch cannot overdraw an address that each item alone would not.
+        
+        Returns:
+            List[Optional[str]]: An error per transaction, None where accepted
+        """
+        pending: Dict[str, int] = {}
+        errors: List[Optional[str]] = []
+        for transaction in transactions:
+            error = None
+            try:
+                effects = self._effects(transaction)
+            except ValueError as e:
+                effects = []
+                error = str(e)
+            if not effects and error is None:
+                error = f"{transaction.type.value} transaction has no address to debit"
+            for address, delta in effects:
+                if delta < 0:
+                    balance = pending.get(address)
+                    if balance is None:
+                        balance = self._ledger.get_units(address)
+                    if balance + delta < 0:
+                        error = (
+                            f"Insufficient balance for {address}: "
+                            f"{from_units(balance)} < {from_units(-delta)}"
+                        )
+                        break
+            if error is None:
+                for address, delta in effects:
+                    balance = pending.get(address)
+                    if balance is None:
+                        balance = self._ledger.get_units(address)
+                    pending[address] = balance + delta
+            errors.append(error)
+        return errors
+        
+    def apply(self, transactions: List[Transaction]) -> None:
+        """Applies already checked transactions; the caller must hold locked()"""
+        with self._ledger.atomic():
+            for transaction in transactions:
+                self._apply_effects(self._effects(transaction), 1)
+                
+    def revert(self, transactions: List[Transaction]) -> None:
+        """Undoes reserve() for transactions whose commit failed; the caller must hold locked()"""
+        with self._ledger.atomic():
+            for transaction in reversed(transactions):
+                self._apply_effects(self._effects(transaction), -1)
+                
+    async def write_through(self, transactions: List[Transaction]) -> None:
+        """
+        Writes the balances the transactions touched to the balances table
+        
+        The table is a projection of the book, so a failed write is logged
+        rather than failing transactions that are already committed.
+        """
+        if not self._session_factory or not transactions:
+            return
+        balances = {
+            address: self._ledger.get_balance(address)
+            for transaction in transactions
+            for address in self._addresses(transaction)
+        }
+        await asyncio.to_thread(self._write_rows, balances)
+        
+    def replay_transaction(self, transaction: Transaction) -> None:
+        """Re-applies a transaction replayed from the ledger log"""
+        self._apply_effects(self._effects(transaction), 1)
+        
+    def export_state(self) -> Dict[str, Any]:
+        """Returns a serializable snapshot of all balances"""
+        return self._ledger.export_state()
+        
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """Restores balances from a snapshot"""
+        self._ledger.load_state(state)
+        if self._merkle_tree is not None:
+            self._merkle_tree.load(self._ledger.items())
+            
+    def _apply_effects(self, effects: List[Effect], sign: int) -> None:
+        for address, delta in effects:
+            self._ledger.apply_adjustment(address, sign * delta)
+        if self._merkle_tree is not None:
+            for address, _ in effects:
+                self._merkle_tree.update(address, self._ledger.get_units(address))
+                
+    def _write_rows(self, balances: Dict[str, Decimal]) -> None:
+        session = self._session_factory()
+        try:
+            for address, amount in balances.items():
+                session.merge(Balance(address=address, amount=amount))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Failed to write {len(balances)} balances: {str(e)}")
+        finally:
+            session.close()
+            
+    @staticmethod
+    def _addresses(transaction: Transaction) -> List[str]:
+        """Returns the addresses whose balances a transaction changes"""
+        if transaction.type in (TransactionType.ISSUANCE, TransactionType.REWARD):
+            return [transaction.recipient]
+        if transaction.type == TransactionType.TRANSFER:
+            return [transaction.sender, transaction.recipient] if transaction.sender else []
+        return [transaction.sender or transaction.recipient]
+        
+    @staticmethod
+    def _effects(transaction: Transaction) -> List[Effect]:
+        """
+        Returns the changes a transaction makes, in integer units
+        
+        Raises:
+            ValueError: The amount is not positive or has more than 18 decimal places
+        """
+        amount = to_units(transaction.amount)
+        if amount <= 0:
+            raise ValueError(f"Invalid amount: {transaction.amount}")
+        if transaction.type in (TransactionType.ISSUANCE, TransactionType.REWARD):
+            return [(transaction.recipient, amount)]
+        if transaction.type == TransactionType.TRANSFER:
+            if not transaction.sender:
+                return []
+            return [(transaction.sender, -amount), (transaction.recipient, amount)]
+        return [(transaction.sender or transaction.recipient, -amount)]
@@ -0,0 +1,182 @@
+from array import array
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+import uuid
+
+from .transactions import (
+    Transaction,
+    TransactionType,
+    TransactionStatus,
+    EPOCH,
+    to_epoch_micros
+)
+
+AMOUNT_SCALE = Decimal('1000000')  # Amounts are stored in micro-units
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+NO_ADDRESS = -1
+EMPTY_SLOT = -1
+
+TRANSACTION_TYPES = list(TransactionType)
+TRANSACTION_STATUSES = list(TransactionStatus)
+
+def from_epoch_micros(micros: int) -> datetime:
+    return EPOCH + timedelta(microseconds=micros)
+
+class CompactTransactionStore:
+    """
+    Columnar store for executed transactions
+    
+    Each field lives in a typed array: amounts as int64 micro-units, timestamps
+    as int64 epoch microseconds, sender and recipient as interned address ids,
+    type and status as enum codes, and IDs as 16-byte UUIDs. Rows are looked up
+    by ID through an open-addressing hash table over the UUID bytes. Values that
+    do not fit a column (sub-micro amounts, non-UUID IDs, metadata) are kept in
+    sparse side tables, so every row round-trips exactly.
+    
+    Transaction models are materialized only when a row is read, and are
+    copies: changing one does not change the stored row.
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        self._amounts = array('q')
+        self._timestamps = array('q')
+        self._senders = array('i')
+        self._recipients = array('i')
+        self._types = array('b')
+        self._statuses = array('b')
+        self._ids = bytearray()
+        
+        self._address_ids: Dict[str, int] = {}
+        self._addresses: List[str] = []
+        
+        # Sparse side tables, keyed by row
+        self._exact_amounts: Dict[int, Decimal] = {}
+        self._metadata: Dict[int, Dict[str, str]] = {}
+        self._irregular_ids: Dict[int, str] = {}
+        self._irregular_rows: Dict[str, int] = {}
+        
+        # Power-of-two table so a slot is the UUID prefix masked by size - 1
+        self._slots = array('q', [EMPTY_SLOT]) * (1 << max(capacity - 1, 1).bit_length())
+        
+    def __len__(self) -> int:
+        return len(self._amounts)
+        
+    def __getitem__(self, row: int) -> Transaction:
+        """Materializes the transaction stored at a row"""
+        if row in self._irregular_ids:
+            transaction_id = self._irregular_ids[row]
+        else:
+            transaction_id = str(uuid.UUID(bytes=bytes(self._ids[row * 16:row * 16 + 16])))
+            
+        sender = self._senders[row]
+        amount = self._exact_amounts.get(row)
+        if amount is None:
+            amount = Decimal(self._amounts[row]) / AMOUNT_SCALE
+            
+        # Every column was validated on the way in
+        return Transaction.model_construct(
+            id=transaction_id,
+            type=TRANSACTION_TYPES[self._types[row]],
+            amount=amount,
+            sender=self._addresses[sender] if sender != NO_ADDRESS else None,
+            recipient=self._addresses[self._recipients[row]],
+            timestamp=from_epoch_micros(self._timestamps[row]),
+            status=TRANSACTION_STATUSES[self._statuses[row]],
+            metadata=dict(self._metadata.get(row, {}))
+        )
+        
+    def add(self, transaction: Transaction) -> int:
+        """
+        Appends a transaction
+        
+        Returns:
+            int: Row the transaction was stored at
+        """
+        row = len(self._amounts)
+        key = self._uuid_bytes(transaction.id)
+        if key is None:
+            self._irregular_ids[row] = transaction.id
+            self._irregular_rows[transaction.id] = row
+            key = bytes(16)
+        self._ids += key
+        
+        micro_amount = transaction.amount * AMOUNT_SCALE
+        if micro_amount == micro_amount.to_integral_value() and INT64_MIN < micro_amount <= INT64_MAX:
+            self._amounts.append(int(micro_amount))
+        else:
+            self._amounts.append(INT64_MIN)
+            self._exact_amounts[row] = transaction.amount
+            
+        self._timestamps.append(to_epoch_micros(transaction.timestamp))
+        self._senders.append(
+            self._intern(transaction.sender) if transaction.sender is not None else NO_ADDRESS
+        )
+        self._recipients.append(self._intern(transaction.recipient))
+        self._types.append(TRANSACTION_TYPES.index(transaction.type))
+        self._statuses.append(TRANSACTION_STATUSES.index(transaction.status))
+        if transaction.metadata:
+            self._metadata[row] = dict(transaction.metadata)
+            
+        if row not in self._irregular_ids:
+            if (row + 1) * 2 > len(self._slots):
+                self._grow()
+            self._insert_slot(key, row)
+        return row
+        
+    def get(self, transaction_id: str) -> Optional[Transaction]:
+        """Materializes a transaction by ID"""
+        row = self.row_of(transaction_id)
+        return self[row] if row is not None else None
+        
+    def row_of(self, transaction_id: str) -> Optional[int]:
+        """Returns the row a transaction ID is stored at"""
+        if transaction_id in self._irregular_rows:
+            return self._irregular_rows[transaction_id]
+        key = self._uuid_bytes(transaction_id)
+        if key is None:
+            return None
+        mask = len(self._slots) - 1
+        slot = int.from_bytes(key[:8], "little") & mask
+        while True:
+            row = self._slots[slot]
+            if row == EMPTY_SLOT:
+                return None
+            if self._ids[row * 16:row * 16 + 16] == key:
+                return row
+            slot = (slot + 1) & mask
+            
+    def __contains__(self, transaction_id: str) -> bool:
+        return self.row_of(transaction_id) is not None
+        
+    def _intern(self, address: str) -> int:
+        address_id = self._address_ids.get(address)
+        if address_id is None:
+            address_id = len(self._addresses)
+            self._address_ids[address] = address_id
+            self._addresses.append(address)
+        return address_id
+        
+    def _insert_slot(self, key: bytes, row: int) -> None:
+        mask = len(self._slots) - 1
+        slot = int.from_bytes(key[:8], "little") & mask
+        while self._slots[slot] != EMPTY_SLOT:
+            slot = (slot + 1) & mask
+        self._slots[slot] = row
+        
+    def _grow(self) -> None:
+        """Doubles the hash table, keeping the load factor at or below one half"""
+        self._slots = array('q', [EMPTY_SLOT]) * (len(self._slots) * 2)
+        for row in range(len(self._amounts) - 1):
+            if row not in self._irregular_ids:
+                self._insert_slot(bytes(self._ids[row * 16:row * 16 + 16]), row)
+                
+    @staticmethod
+    def _uuid_bytes(transaction_id: str) -> Optional[bytes]:
+        """Returns the 16 UUID bytes of a canonical UUID string, None otherwise"""
+        try:
+            parsed = uuid.UUID(transaction_id)
+        except ValueError:
+            return None
+        return parsed.bytes if str(parsed) == transaction_id else None
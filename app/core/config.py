@@ -17,20 +17,105 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     ALLOWED_HOSTS: List[str] = ["*"]
+    ADMIN_USERS: List[str] = ["admin"]  # May use the /admin endpoints
     
     # Currency Configuration
     INITIAL_SUPPLY: float = 0.0
     MIN_RESERVE_RATIO: float = 0.95
-    MAX_SUPPLY_GROWTH_RATE: float = 0.1  # 10% maximum growth rate
+    RESERVE_RATIO_ENFORCED: bool = False  # Refuse issuance that would take the live ratio below MIN_RESERVE_RATIO
+    MAX_SUPPLY_GROWTH_RATE: Optional[float] = 0.1  # 10% maximum growth rate per window; None disables the limit
+    SUPPLY_GROWTH_WINDOW_SECONDS: float = 86400.0
+    SUPPLY_GROWTH_BUCKETS: int = 24
+    SUPPLY_GROWTH_MIN_ALLOWANCE: float = 1000000.0  # DAC always issuable per window, e.g. from zero supply
+    MAX_TRANSFER_BATCH_SIZE: int = 10000
+    SNAPSHOT_MAX_WAIT_SECONDS: float = 30.0  # Longest long poll on /currency/info and /reserves/status
     
     # Reserve Configuration
     COMPUTATIONAL_RESERVE_WEIGHT: float = 0.4
     STORAGE_RESERVE_WEIGHT: float = 0.3
     ENGAGEMENT_RESERVE_WEIGHT: float = 0.3
+    MAX_RESERVE_ADJUSTMENT_BATCH_SIZE: int = 1000
+    
+    # Reserve History Configuration
+    # Records reserve changes in the reserves table with minute, hour and day
+    # rollups; retention is in seconds, None keeps a resolution forever
+    RESERVE_HISTORY_ENABLED: bool = False
+    RESERVE_HISTORY_RAW_RETENTION_SECONDS: Optional[float] = 86400
+    RESERVE_HISTORY_MINUTE_RETENTION_SECONDS: Optional[float] = 7 * 86400
+    RESERVE_HISTORY_HOUR_RETENTION_SECONDS: Optional[float] = 90 * 86400
+    RESERVE_HISTORY_DAY_RETENTION_SECONDS: Optional[float] = None
+    RESERVE_HISTORY_MAX_POINTS: int = 500  # Per reserve type in one history response
+    RESERVE_HISTORY_MAX_RAW_ROWS: int = 10000  # Newest raw rows returned when resolution=raw
+    
+    # Analytics Configuration
+    # Transactions, supply and reserves are rolled up into minute, hour and
+    # day buckets; retention is in seconds, None keeps a resolution forever
+    ANALYTICS_MINUTE_RETENTION_SECONDS: Optional[float] = 2 * 86400
+    ANALYTICS_HOUR_RETENTION_SECONDS: Optional[float] = 90 * 86400
+    ANALYTICS_DAY_RETENTION_SECONDS: Optional[float] = None
+    ANALYTICS_MAX_POINTS: int = 500  # Buckets in one metrics history
+    
+    # Reward Queue Configuration
+    # Credits submitted to the reward queue are merged per user and applied once per interval
+    REWARD_QUEUE_FLUSH_INTERVAL_SECONDS: float = 1.0
+    REWARD_QUEUE_MAX_PENDING: int = 100000  # Users with queued credits before submitters wait
+    
+    # Bulk Reward Distribution Configuration
+    REWARD_JOB_DIR: str = "./payouts"  # Input files and checkpoints for /admin/rewards/jobs
+    REWARD_JOB_CHUNK_SIZE: int = 10000
     
     # Database Configuration
     DATABASE_URL: str = "sqlite:///./dacr.db"
     
+    # Transaction Store Configuration
+    TRANSACTION_STORE_COMPACT: bool = False  # Columnar storage for executed transactions
+    
+    # Ledger Persistence Configuration
+    LEDGER_PERSISTENCE_ENABLED: bool = False
+    LEDGER_DURABILITY_MODE: str = "batched"  # "sync" commits per write, "batched" uses write-behind
+    LEDGER_FLUSH_BATCH_SIZE: int = 500
+    LEDGER_FLUSH_INTERVAL_SECONDS: float = 0.5
+    LEDGER_FLUSH_MAX_ATTEMPTS: int = 5  # Failed flushes before a transaction is dead-lettered
+    LEDGER_DEAD_LETTER_PATH: str = "./ledger_dead_letter.jsonl"  # Transactions that could not be persisted
+    
+    # Ledger Log Configuration
+    LEDGER_LOG_ENABLED: bool = False
+    LEDGER_LOG_DIR: str = "./ledger"
+    LEDGER_SEGMENT_SIZE_BYTES: int = 64 * 1024 * 1024
+    LEDGER_GROUP_COMMIT_SIZE: int = 256
+    LEDGER_GROUP_COMMIT_INTERVAL_SECONDS: float = 0.002
+    LEDGER_SNAPSHOT_INTERVAL: int = 10000  # Records between snapshots
+    
+    # Pending Transaction Configuration
+    PENDING_TRANSACTION_TTL_SECONDS: Optional[float] = 900  # None keeps pending transactions indefinitely
+    PENDING_SWEEP_INTERVAL_SECONDS: float = 5.0
+    
+    # Balance Configuration
+    BALANCE_NUM_SHARDS: int = 256  # Lock stripes; must be a power of two
+    BALANCE_WRITE_THROUGH_ENABLED: bool = False  # Mirror balances into the balances table
+    BALANCE_MERKLE_PROOFS_ENABLED: bool = True  # Merkle sum tree for proof of liabilities; not with shared state
+    
+    # DAC Expiry Configuration
+    # Issued DAC is burned if not spent within its lifetime; spending uses
+    # the oldest DAC first. None never expires it
+    DAC_EXPIRY_ENABLED: bool = False  # Requires LEDGER_LOG_ENABLED
+    DAC_EXPIRY_ISSUANCE_SECONDS: Optional[float] = 365 * 86400
+    DAC_EXPIRY_TICK_SECONDS: float = 60.0  # Resolution of expiry times
+    DAC_EXPIRY_BATCH_SIZE: int = 1000  # Burn transactions per batch
+    
+    # Shared State Configuration
+    # Lets several uvicorn workers on one host share the supply counter and
+    # balances; not compatible with LEDGER_LOG_ENABLED
+    SHARED_STATE_ENABLED: bool = False
+    SHARED_STATE_PATH: str = "./dacr_state.db"
+    
+    # Idempotency Configuration
+    IDEMPOTENCY_BACKEND: str = "memory"  # "memory" or "sqlite"
+    IDEMPOTENCY_SQLITE_PATH: str = "./idempotency.db"
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_MAX_ENTRIES: int = 100000
+    IDEMPOTENCY_LEASE_SECONDS: int = 60  # How long an in-flight key stays reserved
+    
     # Governance Configuration
     MIN_PROPOSAL_THRESHOLD: float = 0.05  # 5% of total supply needed to create proposal
     VOTING_PERIOD_DAYS: int = 7
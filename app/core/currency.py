@@ -1,18 +1,52 @@
-from datetime import datetime
-from decimal import Decimal
-from typing import Optional
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from decimal import Decimal, ROUND_FLOOR, ROUND_HALF_EVEN
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 import logging
+import time
+
+from .amount import SCALE, from_units, mul_ratio, positive_units, ratio, to_units
+from .transactions import Transaction, TransactionType
 
 logger = logging.getLogger(__name__)
 
 class CurrencyManager:
     """Manages the core operations of the Digital AI Currency (DAC)"""
     
-    def __init__(self):
-        self._total_supply: Decimal = Decimal('0')
+    def __init__(
+        self,
+        shared_store=None,
+        reserves=None,
+        min_reserve_ratio: Optional[Decimal] = Decimal('0.95'),
+        growth_limiter=None,
+        state_version=None
+    ):
+        """
+        Args:
+            shared_store: Optional SharedStateStore holding the total supply, so
+                that several worker processes issue and burn against one counter
+            reserves: Optional ReserveManager backing the supply; without it the
+                reserve ratio is the constant 1:1 peg
+            min_reserve_ratio: Weighted reserves to supply ratio that issuance
+                must preserve; None disables the check
+            growth_limiter: Optional SupplyGrowthLimiter capping issuance
+                over a sliding window
+            state_version: Optional StateVersion bumped on every supply change
+        """
+        self._shared_store = shared_store
+        self._reserves = reserves
+        self._total_supply: int = 0  # In 10^-18 units
         self._reserve_ratio: Decimal = Decimal('1.0')  # 1:1 USD peg
-        self._min_reserve_ratio: Decimal = Decimal('0.95')
+        self._min_reserve_ratio: Optional[Decimal] = min_reserve_ratio
+        self._min_ratio = ratio(min_reserve_ratio) if min_reserve_ratio else None
+        self._growth_limiter = growth_limiter
+        self._state_version = state_version
+        # Supply implied by the transactions in the ledger log, once there is
+        # one. Snapshots export it rather than the live supply, which moves
+        # before an issuance is logged and after an expiry burn is, so that
+        # replaying the records after a snapshot never counts a change twice.
+        self._logged_supply: Optional[int] = None
         
     async def issue_currency(self, amount: Decimal, reason: str) -> bool:
         """
@@ -25,19 +59,48 @@ class CurrencyManager:
         Returns:
             bool: Success status
         """
-        if amount <= 0:
+        units = positive_units(amount)
+        if units is None:
             logger.error("Invalid issuance amount")
             return False
             
-        # Verify reserve requirements
-        if not await self._verify_reserve_requirements(amount):
-            logger.error("Reserve requirements not met for issuance")
-            return False
-            
-        self._total_supply += amount
+        now = time.time()
+        # Other workers must not issue between the checks and the updates
+        with self._shared_store.atomic() if self._shared_store else nullcontext():
+            if self._growth_limiter and not self._growth_limiter.allows(units, self._supply_units(), now):
+                logger.error("Supply growth limit reached for issuance")
+                return False
+                
+            # Verify reserve requirements; the cap is checked and applied in one step
+            if not self._add_supply(units, maximum=self._max_backed_supply()):
+                logger.error("Reserve requirements not met for issuance")
+                return False
+                
+            if self._growth_limiter:
+                self._growth_limiter.record(units, now)
         logger.info(f"Issued {amount} DAC: {reason}")
         return True
         
+    async def revert_issuance(self, amount: Decimal, reason: str) -> None:
+        """
+        Takes back an issuance whose transaction could not be executed
+        
+        Removes the amount from the supply and from the growth window, so
+        that neither counts DAC that was never credited to anyone.
+        
+        Args:
+            amount: Amount a successful issue_currency call added
+            reason: Reason given for the issuance
+        """
+        units = positive_units(amount)
+        if units is None:
+            return
+        with self._shared_store.atomic() if self._shared_store else nullcontext():
+            self._add_supply(-units)
+            if self._growth_limiter:
+                self._growth_limiter.release(units)
+        logger.error(f"Reverted issuance of {amount} DAC: {reason}")
+        
     async def burn_currency(self, amount: Decimal, reason: str) -> bool:
         """
         Burns (removes) DAC tokens from circulation
@@ -49,32 +112,120 @@ class CurrencyManager:
         Returns:
             bool: Success status
         """
-        if amount <= 0 or amount > self._total_supply:
+        units = positive_units(amount)
+        if units is None or not self._add_supply(-units, minimum=0):
             logger.error("Invalid burn amount")
             return False
             
-        self._total_supply -= amount
         logger.info(f"Burned {amount} DAC: {reason}")
         return True
         
     async def get_supply(self) -> Decimal:
         """Returns the current total supply of DAC"""
+        return from_units(self._supply_units())
+        
+    async def get_reserve_ratio(self) -> Optional[Decimal]:
+        """Returns weighted reserves over total supply, None while there is no supply"""
+        return await self._calculate_reserve_ratio()
+        
+    def export_state(self) -> Dict[str, Any]:
+        """Returns a serializable snapshot of the currency state"""
+        supply = self._logged_supply if self._logged_supply is not None else self._supply_units()
+        state = {"total_supply": str(from_units(supply))}
+        if self._growth_limiter:
+            state["growth_window"] = self._growth_limiter.export_state()
+        return state
+        
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """Restores the currency state from a snapshot"""
+        if self._shared_store:
+            self._shared_store.set_counter("total_supply", Decimal(state["total_supply"]))
+        else:
+            self._total_supply = to_units(Decimal(state["total_supply"]))
+        self._logged_supply = to_units(Decimal(state["total_supply"]))
+        self._changed()
+        if self._growth_limiter and "growth_window" in state:
+            self._growth_limiter.load_state(state["growth_window"])
+            
+    def replay_transaction(self, transaction: Transaction) -> None:
+        """Re-applies the supply effect of a transaction replayed from the ledger log"""
+        delta = self._supply_effect(transaction)
+        if delta:
+            self._add_supply(delta)
+        if transaction.type == TransactionType.ISSUANCE and self._growth_limiter:
+            issued_at = transaction.timestamp.replace(tzinfo=timezone.utc).timestamp()
+            self._growth_limiter.record(delta, issued_at)
+        self._logged_supply = (self._logged_supply or 0) + delta
+        
+    def log_transactions(self, transactions: List[Transaction]) -> None:
+        """Tracks the supply effect of transactions just written to the ledger log"""
+        self._logged_supply = (self._logged_supply or 0) + sum(
+            self._supply_effect(transaction) for transaction in transactions
+        )
+        
+    def unlog_transactions(self, transactions: List[Transaction]) -> None:
+        """Takes back the supply effect of transactions the ledger log failed to make durable"""
+        self._logged_supply = (self._logged_supply or 0) - sum(
+            self._supply_effect(transaction) for transaction in transactions
+        )
+        
+    @staticmethod
+    def _supply_effect(transaction: Transaction) -> int:
+        """Returns the signed supply change of a transaction in units, as replay applies it"""
+        if transaction.type == TransactionType.ISSUANCE:
+            return to_units(transaction.amount)
+        if transaction.type in (TransactionType.BURN, TransactionType.REDEMPTION):
+            return -to_units(transaction.amount)
+        return 0
+        
+    def _supply_units(self) -> int:
+        if self._shared_store:
+            return to_units(self._shared_store.get_counter("total_supply"))
         return self._total_supply
         
-    async def _verify_reserve_requirements(self, amount: Decimal) -> bool:
-        """
-        Verifies if reserve requirements are met for currency operations
+    def _add_supply(self, delta: int, minimum: Optional[int] = None, maximum: Optional[int] = None) -> bool:
+        """Adds signed units to the total supply unless it would leave [minimum, maximum]"""
+        if self._shared_store:
+            # The shared store is a database boundary and holds decimal strings
+            if not self._shared_store.add_to_counter(
+                "total_supply",
+                from_units(delta),
+                from_units(minimum) if minimum is not None else None,
+                from_units(maximum) if maximum is not None else None
+            ):
+                return False
+        else:
+            supply = self._total_supply + delta
+            if minimum is not None and supply < minimum:
+                return False
+            if maximum is not None and supply > maximum:
+                return False
+            self._total_supply = supply
+        self._changed()
+        return True
         
-        Args:
-            amount: Amount of DAC involved in operation
+    def _changed(self) -> None:
+        if self._state_version:
+            self._state_version.bump()
             
+    def _max_backed_supply(self) -> Optional[int]:
+        """
+        Returns the largest supply, in units, that the reserves back at the minimum ratio
+        
         Returns:
-            bool: Whether requirements are met
+            Optional[int]: The cap, or None when no reserves are linked or the check is disabled
         """
-        current_ratio = await self._calculate_reserve_ratio()
-        return current_ratio >= self._min_reserve_ratio
+        if self._reserves is None or self._min_ratio is None:
+            return None
+        numerator, denominator = self._min_ratio
+        # Weighted reserves are in 10^-36 units; flooring keeps the ratio at or above the minimum
+        return mul_ratio(self._reserves.weighted_total(), denominator, numerator * SCALE, ROUND_FLOOR)
         
-    async def _calculate_reserve_ratio(self) -> Decimal:
+    async def _calculate_reserve_ratio(self) -> Optional[Decimal]:
         """Calculates the current reserve ratio"""
-        # In a real implementation, this would query actual reserve values
-        return self._reserve_ratio
+        if self._reserves is None:
+            return self._reserve_ratio
+        supply = self._supply_units()
+        if not supply:
+            return None
+        return from_units(mul_ratio(self._reserves.weighted_total(), 1, supply, ROUND_HALF_EVEN))
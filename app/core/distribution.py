@@ -1,9 +1,12 @@
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_EVEN
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from enum import Enum
+import bisect
 import logging
 
+from .amount import from_units, mul_ratio, ratio, to_units
+
 logger = logging.getLogger(__name__)
 
 class RewardTier(Enum):
@@ -18,6 +21,89 @@ class RewardType(Enum):
     MILESTONE = "milestone"
     CONTRIBUTION = "contribution"
 
+# The metadata field each reward type scales with, its default, and the
+# multiplier as a function of the field's exact (numerator, denominator)
+_SCALING: Dict[RewardType, Tuple[str, Any, Callable[[int, int], Tuple[int, int]]]] = {
+    RewardType.TASK_COMPLETION: ('complexity', 1, lambda n, d: (n, d)),
+    # 1 + duration in hours
+    RewardType.ENGAGEMENT: ('duration', 0, lambda n, d: (3600 * d + n, 3600 * d)),
+    RewardType.MILESTONE: ('importance', 1, lambda n, d: (2 * n, d)),
+    RewardType.CONTRIBUTION: ('impact', 1, lambda n, d: (3 * n, 2 * d))
+}
+
+class RewardEngine:
+    """
+    Reward rates and tier thresholds compiled for fast lookups
+    
+    Tiers are resolved by bisecting the thresholds in ascending order. Each
+    reward is memoized per reward type and tier by the value of the metadata
+    field that type scales with, so repeated values (a task complexity, a
+    duration in whole minutes) cost a dict lookup instead of an exact ratio
+    conversion and a rounded multiplication. The memo is cleared when it
+    reaches max_entries; a new engine is built whenever rates or thresholds
+    change.
+    """
+    
+    def __init__(
+        self,
+        rate_units: Dict[RewardTier, int],
+        threshold_units: Dict[RewardTier, int],
+        max_entries: int = 65536
+    ):
+        """
+        Args:
+            rate_units: Base reward of each tier in units
+            threshold_units: Balance in units at which each tier starts
+            max_entries: Largest number of memoized rewards
+        """
+        self._rate_units = dict(rate_units)
+        ordered = sorted(threshold_units.items(), key=lambda item: item[1])
+        self._thresholds = [threshold for _, threshold in ordered]
+        self._tiers = [tier for tier, _ in ordered]
+        self._max_entries = max_entries
+        self._entries = 0
+        # Reward type to (field, default, multiplier, memo per tier of field value to units)
+        self._compiled = {
+            reward_type: (field, default, multiplier, {tier: {} for tier in self._rate_units})
+            for reward_type, (field, default, multiplier) in _SCALING.items()
+        }
+        
+    def tier_for(self, balance: int) -> RewardTier:
+        """Returns the highest tier whose threshold a balance in units reaches"""
+        index = bisect.bisect_right(self._thresholds, balance) - 1
+        return self._tiers[index] if index >= 0 else RewardTier.BASIC
+        
+    def reward(self, tier: RewardTier, reward_type: RewardType, metadata: Dict[str, Any]) -> int:
+        """
+        Returns a reward in units
+        
+        Raises:
+            ArithmeticError, TypeError, ValueError: The metadata value is not a number
+        """
+        field, default, multiplier, memos = self._compiled[reward_type]
+        memo = memos[tier]
+        value = metadata.get(field, default)
+        try:
+            return memo[value]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable, so not a number either; ratio raises
+            return self._scale(tier, multiplier, value)
+            
+        units = self._scale(tier, multiplier, value)
+        if self._entries >= self._max_entries:
+            for memos_by_tier in self._compiled.values():
+                for tier_memo in memos_by_tier[3].values():
+                    tier_memo.clear()
+            self._entries = 0
+        memo[value] = units
+        self._entries += 1
+        return units
+        
+    def _scale(self, tier: RewardTier, multiplier: Callable[[int, int], Tuple[int, int]], value: Any) -> int:
+        return mul_ratio(self._rate_units[tier], *multiplier(*ratio(value)), ROUND_HALF_EVEN)
+
 class DistributionManager:
     """Manages DAC distribution and rewards"""
     
@@ -34,7 +120,8 @@ class DistributionManager:
             RewardTier.ADVANCED: Decimal('1000'),
             RewardTier.PREMIUM: Decimal('10000')
         }
-        self._user_balances: Dict[str, Decimal] = {}
+        self._compile()
+        self._user_balances: Dict[str, int] = {}  # In 10^-18 units
         self._user_tiers: Dict[str, RewardTier] = {}
         
     async def calculate_reward(
@@ -45,10 +132,7 @@ class DistributionManager:
     ) -> Decimal:
         """Calculates reward amount based on user tier and activity"""
         tier = await self.get_user_tier(user_id)
-        base_rate = self._reward_rates[tier]
-        
-        multiplier = self._get_reward_multiplier(reward_type, metadata)
-        return base_rate * multiplier
+        return from_units(self._engine.reward(tier, reward_type, metadata))
         
     async def distribute_reward(
         self,
@@ -58,8 +142,7 @@ class DistributionManager:
     ) -> bool:
         """Distributes rewards to a user"""
         try:
-            current_balance = self._user_balances.get(user_id, Decimal('0'))
-            self._user_balances[user_id] = current_balance + amount
+            self._user_balances[user_id] = self._user_balances.get(user_id, 0) + to_units(amount)
             
             # Update user tier if necessary
             await self._update_user_tier(user_id)
@@ -70,6 +153,71 @@ class DistributionManager:
             logger.error(f"Failed to distribute reward to user {user_id}: {str(e)}")
             return False
             
+    async def calculate_rewards(
+        self,
+        rewards: List[Tuple[str, RewardType, Dict[str, Any]]]
+    ) -> List[Optional[int]]:
+        """
+        Calculates many rewards at once, in units
+        
+        Each reward is looked up in the compiled engine at the user's current
+        tier; nothing is logged per reward.
+        
+        Args:
+            rewards: (user_id, reward_type, metadata) for each reward
+            
+        Returns:
+            List[Optional[int]]: The reward for each entry in order, None
+                where the metadata is not a valid multiplier
+        """
+        results: List[Optional[int]] = []
+        for user_id, reward_type, metadata in rewards:
+            tier = self._user_tiers.get(user_id, RewardTier.BASIC)
+            try:
+                results.append(self._engine.reward(tier, reward_type, metadata))
+            except (ArithmeticError, TypeError, ValueError):
+                results.append(None)
+        return results
+        
+    async def credit_rewards(self, credits: Dict[str, int]) -> int:
+        """
+        Adds rewards in units to many balances, updating each user's tier once
+        
+        Balances and tiers are worked out before any is changed, so a call
+        that raises credits nothing and can be retried as a whole.
+        
+        Returns:
+            int: Number of users whose tier changed
+        """
+        updates = []
+        for user_id, units in credits.items():
+            balance = self._user_balances.get(user_id, 0) + units
+            updates.append((user_id, balance, self._engine.tier_for(balance)))
+        changed = 0
+        for user_id, balance, tier in updates:
+            self._user_balances[user_id] = balance
+            if self._user_tiers.get(user_id) != tier:
+                self._user_tiers[user_id] = tier
+                changed += 1
+        return changed
+        
+    def update_schedule(
+        self,
+        rates: Optional[Dict[RewardTier, Decimal]] = None,
+        thresholds: Optional[Dict[RewardTier, Decimal]] = None
+    ) -> None:
+        """
+        Changes tier reward rates and balance thresholds, and recompiles the reward engine
+        
+        Users keep their current tier until their next credit.
+        """
+        if rates:
+            self._reward_rates.update(rates)
+        if thresholds:
+            self._tier_thresholds.update(thresholds)
+        self._compile()
+        logger.info("Updated reward schedule")
+        
     async def get_user_tier(self, user_id: str) -> RewardTier:
         """Gets the current tier of a user"""
         if user_id not in self._user_tiers:
@@ -78,42 +226,33 @@ class DistributionManager:
         
     async def get_user_balance(self, user_id: str) -> Decimal:
         """Gets the current balance of a user"""
-        return self._user_balances.get(user_id, Decimal('0'))
+        return from_units(self._user_balances.get(user_id, 0))
+        
+    def export_state(self) -> Dict[str, Any]:
+        """Returns a serializable snapshot of user balances and tiers"""
+        return {
+            "balances": {user_id: str(from_units(units)) for user_id, units in self._user_balances.items()},
+            "tiers": {user_id: tier.value for user_id, tier in self._user_tiers.items()}
+        }
+        
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """Restores user balances and tiers from a snapshot"""
+        self._user_balances = {
+            user_id: to_units(Decimal(amount)) for user_id, amount in state["balances"].items()
+        }
+        self._user_tiers = {
+            user_id: RewardTier(tier) for user_id, tier in state["tiers"].items()
+        }
         
     async def _update_user_tier(self, user_id: str) -> None:
         """Updates user tier based on their total balance"""
-        balance = self._user_balances.get(user_id, Decimal('0'))
-        
-        new_tier = RewardTier.BASIC
-        for tier, threshold in self._tier_thresholds.items():
-            if balance >= threshold:
-                new_tier = tier
-            else:
-                break
-                
+        new_tier = self._engine.tier_for(self._user_balances.get(user_id, 0))
         if user_id not in self._user_tiers or self._user_tiers[user_id] != new_tier:
             self._user_tiers[user_id] = new_tier
             logger.info(f"Updated user {user_id} to tier {new_tier.value}")
             
-    def _get_reward_multiplier(
-        self,
-        reward_type: RewardType,
-        metadata: Dict[str, any]
-    ) -> Decimal:
-        """Calculates reward multiplier based on activity type and metadata"""
-        base_multiplier = Decimal('1.0')
-        
-        if reward_type == RewardType.TASK_COMPLETION:
-            complexity = metadata.get('complexity', 1)
-            base_multiplier *= Decimal(str(complexity))
-        elif reward_type == RewardType.ENGAGEMENT:
-            duration = metadata.get('duration', 0)
-            base_multiplier *= Decimal(str(1 + duration / 3600))  # Duration in hours
-        elif reward_type == RewardType.MILESTONE:
-            importance = metadata.get('importance', 1)
-            base_multiplier *= Decimal(str(importance * 2))
-        elif reward_type == RewardType.CONTRIBUTION:
-            impact = metadata.get('impact', 1)
-            base_multiplier *= Decimal(str(impact * 1.5))
-            
-        return base_multiplier
+    def _compile(self) -> None:
+        self._engine = RewardEngine(
+            {tier: to_units(rate) for tier, rate in self._reward_rates.items()},
+            {tier: to_units(threshold) for tier, threshold in self._tier_thresholds.items()}
+        )
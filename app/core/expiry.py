@@ -0,0 +1,367 @@
+from collections import deque
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import math
+import time
+import uuid
+
+from .amount import from_units, to_units
+from .transactions import Transaction, TransactionStatus, TransactionType
+
+logger = logging.getLogger(__name__)
+
+# Metadata reason of the BURN transactions that remove expired lots
+EXPIRY_REASON = "expiry"
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel of keys due at integer ticks
+    
+    Level 0 has a slot per tick, and each slot of a level above covers a
+    full turn of the level below. A key is filed at the lowest level whose
+    span reaches its due tick and is moved down a level whenever the level
+    below completes a turn, so it is refiled at most once per level. A tick
+    visits one slot of level 0, plus one slot higher up on turn boundaries,
+    so its cost is the number of keys coming due, however many are waiting.
+    Keys due beyond the top level's span wait in its furthest slot and are
+    refiled when it comes round.
+    """
+    
+    def __init__(self, start: int, bits: int = 6, levels: int = 4):
+        """
+        Args:
+            start: First tick to process
+            bits: Log2 of the slots per level
+            levels: Number of levels; the wheel spans 2^(bits * levels) ticks
+        """
+        self._bits = bits
+        self._mask = (1 << bits) - 1
+        self._levels = levels
+        self._slots: List[List[List[Tuple[int, Any]]]] = [
+            [[] for _ in range(1 << bits)] for _ in range(levels)
+        ]
+        self._tick = start  # Next tick to process
+        self._count = 0
+        
+    def __len__(self) -> int:
+        return self._count
+        
+    def add(self, key: Any, due: int) -> None:
+        """Schedules a key; one already due comes out of the next advance()"""
+        self._file(due, key)
+        self._count += 1
+        
+    def advance(self, tick: int) -> List[Any]:
+        """Processes every tick up to and including tick, returning the keys due by then"""
+        due: List[Any] = []
+        while self._tick <= tick:
+            if not self._count:
+                self._tick = tick + 1
+                break
+            index = self._tick & self._mask
+            if index == 0:
+                self._cascade()
+            slot = self._slots[0][index]
+            if slot:
+                self._slots[0][index] = []
+                self._count -= len(slot)
+                due.extend(key for _, key in slot)
+            self._tick += 1
+        return due
+        
+    def _cascade(self) -> None:
+        """Refiles the slots that the completed turns of the levels below have reached"""
+        for level in range(1, self._levels):
+            index = (self._tick >> (self._bits * level)) & self._mask
+            entries, self._slots[level][index] = self._slots[level][index], []
+            for due, key in entries:
+                self._file(due, key)
+            if index:
+                break
+                
+    def _file(self, due: int, key: Any) -> None:
+        delta = due - self._tick
+        if delta < 0:
+            # Overdue: the current slot, processed on the next tick
+            self._slots[0][self._tick & self._mask].append((due, key))
+            return
+        position = due
+        if delta >= 1 << (self._bits * self._levels):
+            position = self._tick + (1 << (self._bits * self._levels)) - 1
+            delta = position - self._tick
+        level = 0
+        while delta >= 1 << (self._bits * (level + 1)):
+            level += 1
+        self._slots[level][(position >> (self._bits * level)) & self._mask].append((due, key))
+
+class ExpiryManager:
+    """
+    Expires DAC that is not spent within its lifetime
+    
+    Every executed ISSUANCE or REWARD transaction whose type has a lifetime
+    credits a lot, keyed by the transaction ID, that expires that lifetime
+    after it. Debits from a holder (TRANSFER from, BURN, REDEMPTION) spend
+    the holder's lots oldest first; DAC received by transfer carries no lot
+    and does not expire. Lots are scheduled in a TimingWheel, and each tick
+    burns the ones that came due: one BURN transaction per holder, from the
+    holder to DACR, executed in batches, then one burn_currency call for the
+    total.
+    
+    Lot changes are recorded with the transactions that cause them and
+    replayed from the ledger log, so they survive restarts; lots are only
+    kept in memory, so expiry needs the ledger log. Spent and
+    expired lots are left in the wheel and holder queues and skipped when
+    reached.
+    """
+    
+    def __init__(
+        self,
+        currency_manager,
+        lifetimes: Dict[TransactionType, Optional[float]],
+        tick_seconds: float = 60.0,
+        batch_size: int = 1000
+    ):
+        """
+        Args:
+            currency_manager: CurrencyManager whose supply expired lots are burned from
+            lifetimes: Seconds until DAC credited by each transaction type
+                expires; types not listed, or None, never expire
+            tick_seconds: Resolution of expiry times and interval between ticks
+            batch_size: BURN transactions executed per batch
+        """
+        self._currency = currency_manager
+        self._lifetimes = {
+            type: lifetime for type, lifetime in lifetimes.items() if lifetime is not None
+        }
+        self._tick_seconds = tick_seconds
+        self._batch_size = batch_size
+        # Lot ID to [holder, units remaining, expiry as epoch seconds]
+        self._lots: Dict[str, List[Any]] = {}
+        # Lot IDs of each holder, oldest first
+        self._holdings: Dict[str, Deque[str]] = {}
+        self._wheel = TimingWheel(self._tick_of(time.time()))
+        self._expired_units = 0
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+        
+    @property
+    def lot_count(self) -> int:
+        return len(self._lots)
+        
+    @property
+    def expired_total(self) -> Decimal:
+        """DAC burned by expiry since startup"""
+        return from_units(self._expired_units)
+        
+    def get_expiring(self, holder: str) -> List[Dict[str, Any]]:
+        """Returns a holder's unspent lots, oldest first"""
+        return [
+            {
+                "lot_id": lot_id,
+                "amount": from_units(self._lots[lot_id][1]),
+                "expires_at": datetime.utcfromtimestamp(self._lots[lot_id][2])
+            }
+            for lot_id in self._holdings.get(holder, ())
+            if lot_id in self._lots
+        ]
+        
+    async def start(self, transaction_manager) -> None:
+        """Starts the background tick that burns expired lots through the transaction manager"""
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run(transaction_manager))
+            logger.info(f"Started DAC expiry (tick {self._tick_seconds}s, {len(self._lots)} lots)")
+            
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+            
+    async def expire(self, transaction_manager, now: Optional[float] = None) -> Decimal:
+        """
+        Burns every lot due by now
+        
+        Returns:
+            Decimal: Amount burned
+        """
+        due: Dict[str, List[str]] = {}
+        amounts: Dict[str, int] = {}
+        # Taken out now so that spends while the burns run cannot use them
+        taken: Dict[str, List[Any]] = {}
+        for lot_id in self._wheel.advance(self._tick_of(time.time() if now is None else now)):
+            lot = self._lots.pop(lot_id, None)
+            if lot is None:
+                continue
+            taken[lot_id] = lot
+            holder, units, _ = lot
+            due.setdefault(holder, []).append(lot_id)
+            amounts[holder] = amounts.get(holder, 0) + units
+        if not due:
+            return Decimal(0)
+            
+        timestamp = datetime.utcnow()
+        burns = [
+            Transaction(
+                id=str(uuid.uuid4()),
+                type=TransactionType.BURN,
+                amount=from_units(amounts[holder]),
+                sender=holder,
+                recipient="DACR",
+                timestamp=timestamp,
+                status=TransactionStatus.PENDING,
+                metadata={"reason": EXPIRY_REASON, "lots": ",".join(lot_ids)}
+            )
+            for holder, lot_ids in due.items()
+        ]
+        burned = 0
+        for start in range(0, len(burns), self._batch_size):
+            batch = burns[start:start + self._batch_size]
+            try:
+                errors = await transaction_manager.execute_batch(batch)
+            except Exception as e:
+                logger.error(f"Failed to burn {len(batch)} expired holdings: {str(e)}")
+                errors = [str(e)] * len(batch)
+            for burn, error in zip(batch, errors):
+                if error:
+                    # Put back, already due, so that the next tick retries them
+                    logger.error(f"Could not burn expired DAC of {burn.sender}: {error}")
+                    for lot_id in due[burn.sender]:
+                        self._restore_lot(lot_id, taken[lot_id])
+                else:
+                    burned += amounts[burn.sender]
+                    
+        if burned:
+            if not await self._currency.burn_currency(from_units(burned), "Expired unused DAC"):
+                logger.error(f"Failed to remove {from_units(burned)} expired DAC from the supply")
+            self._expired_units += burned
+            logger.info(f"Expired {from_units(burned)} DAC held by {len(due)} addresses")
+        return from_units(burned)
+        
+    def record(self, transactions: List[Transaction]) -> List[Tuple]:
+        """
+        Applies executed transactions to the lots
+        
+        Returns:
+            List[Tuple]: Changes to pass to undo() if the transactions are rolled back
+        """
+        changes: List[Tuple] = []
+        for transaction in transactions:
+            if transaction.type == TransactionType.BURN and transaction.metadata.get("reason") == EXPIRY_REASON:
+                # Already taken out when the burn was built; this matters on replay
+                for lot_id in transaction.metadata.get("lots", "").split(","):
+                    self._lots.pop(lot_id, None)
+                continue
+                
+            units = to_units(transaction.amount)
+            if transaction.type in (TransactionType.ISSUANCE, TransactionType.REWARD):
+                lifetime = self._lifetimes.get(transaction.type)
+                if lifetime is not None:
+                    credited_at = transaction.timestamp.replace(tzinfo=timezone.utc).timestamp()
+                    self._add_lot(transaction.id, transaction.recipient, units, credited_at + lifetime)
+                    changes.append(("credit", transaction.id))
+            elif transaction.type == TransactionType.TRANSFER:
+                if transaction.sender and transaction.sender != transaction.recipient:
+                    changes.extend(self._spend(transaction.sender, units))
+            else:
+                changes.extend(self._spend(transaction.sender or transaction.recipient, units))
+        return changes
+        
+    def undo(self, changes: List[Tuple]) -> None:
+        """Reverts record() for transactions whose commit failed"""
+        for change in reversed(changes):
+            if change[0] == "credit":
+                self._lots.pop(change[1], None)
+                continue
+            _, holder, lot_id, lot, units, emptied = change
+            lot[1] += units
+            if emptied:
+                self._lots[lot_id] = lot
+                self._holdings.setdefault(holder, deque()).appendleft(lot_id)
+                # It may have come due meanwhile; a second wheel entry is skipped once expired
+                self._wheel.add(lot_id, self._due_tick(lot[2]))
+                
+    def replay_transaction(self, transaction: Transaction) -> None:
+        """Re-applies a transaction replayed from the ledger log"""
+        self.record([transaction])
+        
+    def export_state(self) -> Dict[str, Any]:
+        """Returns a serializable snapshot of every holder's unspent lots, oldest first"""
+        return {
+            "lots": {
+                holder: [
+                    [lot_id, str(from_units(self._lots[lot_id][1])), self._lots[lot_id][2]]
+                    for lot_id in lot_ids
+                    if lot_id in self._lots
+                ]
+                for holder, lot_ids in self._holdings.items()
+            }
+        }
+        
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """Restores lots from a snapshot and reschedules them"""
+        self._lots = {}
+        self._holdings = {}
+        self._wheel = TimingWheel(self._tick_of(time.time()))
+        for holder, lots in state.get("lots", {}).items():
+            for lot_id, amount, expires_at in lots:
+                self._add_lot(lot_id, holder, to_units(Decimal(amount)), expires_at)
+                
+    async def _run(self, transaction_manager) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self._tick_seconds)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.expire(transaction_manager)
+            except Exception as e:
+                logger.error(f"DAC expiry tick failed: {str(e)}")
+                
+    def _add_lot(self, lot_id: str, holder: str, units: int, expires_at: float) -> None:
+        self._lots[lot_id] = [holder, units, expires_at]
+        self._holdings.setdefault(holder, deque()).append(lot_id)
+        self._wheel.add(lot_id, self._due_tick(expires_at))
+        
+    def _restore_lot(self, lot_id: str, lot: List[Any]) -> None:
+        """Puts back a lot taken out for a burn that failed"""
+        holder, units, expires_at = lot
+        lot_ids = self._holdings.get(holder)
+        if lot_ids is not None and lot_id in lot_ids:
+            # Still queued in its place
+            self._lots[lot_id] = lot
+            self._wheel.add(lot_id, self._due_tick(expires_at))
+        else:
+            self._add_lot(lot_id, holder, units, expires_at)
+            
+    def _spend(self, holder: str, units: int) -> List[Tuple]:
+        """Takes units from a holder's lots, oldest first; any rest is untagged DAC"""
+        changes: List[Tuple] = []
+        lot_ids = self._holdings.get(holder)
+        while units > 0 and lot_ids:
+            lot_id = lot_ids[0]
+            lot = self._lots.get(lot_id)
+            if lot is None:
+                lot_ids.popleft()
+                continue
+            used = min(units, lot[1])
+            lot[1] -= used
+            units -= used
+            emptied = lot[1] == 0
+            if emptied:
+                lot_ids.popleft()
+                del self._lots[lot_id]
+            changes.append(("spend", holder, lot_id, lot, used, emptied))
+        if lot_ids is not None and not lot_ids:
+            del self._holdings[holder]
+        return changes
+        
+    def _tick_of(self, timestamp: float) -> int:
+        return math.floor(timestamp / self._tick_seconds)
+        
+    def _due_tick(self, expires_at: float) -> int:
+        """First tick at or after the expiry, so that lots never expire early"""
+        return math.ceil(expires_at / self._tick_seconds)
@@ -0,0 +1,171 @@
+from decimal import Decimal, ROUND_FLOOR
+from typing import Any, Dict, List, Optional, Union
+import logging
+import time
+
+from .amount import from_units, mul_ratio, ratio, to_units
+
+logger = logging.getLogger(__name__)
+
+# Names of the shared store counters holding the window
+_COUNTER_PREFIX = "supply_growth:"
+
+class SupplyGrowthLimiter:
+    """
+    Caps issuance over a sliding window at a fraction of the supply
+    
+    The window is split into fixed buckets of issued units, kept in a ring
+    with a running total. Moving the window forward clears the buckets that
+    fell out of it, so a check is O(1) amortized and memory is fixed at
+    num_buckets counters however many issuances there are. The window slides
+    one bucket at a time, so its effective length is between window_seconds
+    minus one bucket and window_seconds.
+    
+    Times are wall-clock epoch seconds so that exported state stays valid
+    across restarts and agrees between processes. With a SharedStateStore
+    the ring lives in its counters, read before and written after each
+    change, so every worker counts against one window; callers hold
+    store.atomic() across a check and the matching record.
+    """
+    
+    def __init__(
+        self,
+        max_growth_rate: Union[Decimal, float],
+        window_seconds: float = 86400.0,
+        num_buckets: int = 24,
+        min_allowance: Union[Decimal, float] = 0,
+        store=None
+    ):
+        """
+        Args:
+            max_growth_rate: Largest allowed issuance in a window, as a
+                fraction of the supply before that issuance
+            window_seconds: Length of the sliding window
+            num_buckets: Number of buckets the window is split into
+            min_allowance: Issuance always allowed per window, in DAC, so a
+                new deployment with no supply can get started
+            store: Optional SharedStateStore holding the window, so that
+                several worker processes share one limit
+        """
+        if num_buckets < 1 or window_seconds <= 0:
+            raise ValueError("window_seconds and num_buckets must be positive")
+        self._rate = ratio(max_growth_rate)
+        self._bucket_seconds = window_seconds / num_buckets
+        self._min_allowance = to_units(Decimal(str(min_allowance)))
+        self._buckets: List[int] = [0] * num_buckets  # Issued units per bucket
+        self._head: Optional[int] = None  # Absolute index of the newest bucket
+        self._window_total = 0
+        self._store = store
+        
+    def allows(self, units: int, supply: int, now: Optional[float] = None) -> bool:
+        """
+        Checks whether issuing more units stays within the growth limit
+        
+        Args:
+            units: Amount to issue, in units
+            supply: Current total supply, in units
+            now: Epoch seconds, defaults to the current time
+            
+        Returns:
+            bool: Whether the issuance is allowed
+        """
+        self._load()
+        self._advance(self._bucket_index(now))
+        baseline = max(supply - self._window_total, 0)
+        numerator, denominator = self._rate
+        allowance = max(mul_ratio(baseline, numerator, denominator, ROUND_FLOOR), self._min_allowance)
+        return self._window_total + units <= allowance
+        
+    def record(self, units: int, now: Optional[float] = None) -> None:
+        """Counts issued units in the bucket for the given time"""
+        index = self._bucket_index(now)
+        self._load()
+        self._advance(index)
+        if index <= self._head - len(self._buckets):
+            # Older than the window, e.g. a transaction replayed after a long outage
+            return
+        self._buckets[index % len(self._buckets)] += units
+        self._window_total += units
+        self._save()
+        
+    def release(self, units: int, now: Optional[float] = None) -> None:
+        """
+        Uncounts recently recorded units, e.g. of an issuance that was rolled back
+        
+        The units are taken from the newest buckets first, which hold them
+        unless the window has moved on by more than a bucket since.
+        """
+        self._load()
+        self._advance(self._bucket_index(now))
+        for offset in range(len(self._buckets)):
+            if units <= 0:
+                break
+            slot = (self._head - offset) % len(self._buckets)
+            taken = min(units, self._buckets[slot])
+            self._buckets[slot] -= taken
+            self._window_total -= taken
+            units -= taken
+        self._save()
+        
+    def issued(self, now: Optional[float] = None) -> Decimal:
+        """Returns the amount issued within the current window"""
+        self._load()
+        self._advance(self._bucket_index(now))
+        return from_units(self._window_total)
+        
+    def export_state(self) -> Dict[str, Any]:
+        """Returns a serializable snapshot of the window"""
+        self._load()
+        return {
+            "bucket_seconds": self._bucket_seconds,
+            "head": self._head,
+            "buckets": [str(from_units(units)) for units in self._buckets]
+        }
+        
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """Restores the window from a snapshot taken with the same bucket layout"""
+        buckets = [to_units(Decimal(units)) for units in state["buckets"]]
+        if len(buckets) != len(self._buckets) or state["bucket_seconds"] != self._bucket_seconds:
+            logger.error("Supply growth window layout changed; starting with an empty window")
+            return
+        self._buckets = buckets
+        self._head = state["head"]
+        self._window_total = sum(buckets)
+        self._save()
+        
+    def _load(self) -> None:
+        """Reads the ring from the shared store, if there is one"""
+        if not self._store:
+            return
+        counters = self._store.get_counters(_COUNTER_PREFIX)
+        head = counters.get(f"{_COUNTER_PREFIX}head")
+        self._head = int(head) if head is not None else None
+        self._buckets = [
+            to_units(counters.get(f"{_COUNTER_PREFIX}{slot}", Decimal('0'))) for slot in range(len(self._buckets))
+        ]
+        self._window_total = sum(self._buckets)
+        
+    def _save(self) -> None:
+        """Writes the ring back to the shared store, if there is one"""
+        if not self._store:
+            return
+        with self._store.atomic():
+            self._store.set_counter(f"{_COUNTER_PREFIX}head", Decimal(self._head))
+            for slot, units in enumerate(self._buckets):
+                self._store.set_counter(f"{_COUNTER_PREFIX}{slot}", from_units(units))
+                
+    def _bucket_index(self, now: Optional[float]) -> int:
+        return int((time.time() if now is None else now) // self._bucket_seconds)
+        
+    def _advance(self, index: int) -> None:
+        """Moves the newest bucket to index, clearing the buckets that left the window"""
+        if self._head is None:
+            self._head = index
+            return
+        steps = min(index - self._head, len(self._buckets))
+        for offset in range(1, steps + 1):
+            slot = (self._head + offset) % len(self._buckets)
+            self._window_total -= self._buckets[slot]
+            self._buckets[slot] = 0
+        # A clock that steps back never moves the window backwards
+        self._head = max(self._head, index)
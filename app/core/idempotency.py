@@ -0,0 +1,242 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+from pydantic import BaseModel
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+class IdempotencyRecord(BaseModel):
+    fingerprint: str
+    response: Optional[str] = None  # None while the original request is in flight
+    expires_at: float
+
+class IdempotencyConflict(Exception):
+    """The key is in use by a different request, or its original request is still running"""
+
+class IdempotencyBackend(ABC):
+    """
+    Storage for idempotency records
+    
+    Implementations backed by shared storage let several workers see each
+    other's keys. claim must be atomic across everything sharing the backend,
+    and a claim must not be evicted while its request is in flight.
+    """
+    
+    @abstractmethod
+    async def get(self, key: str) -> Optional[IdempotencyRecord]:
+        """Returns the unexpired record of a key, if any"""
+        
+    @abstractmethod
+    async def claim(self, key: str, fingerprint: str, lease: float) -> bool:
+        """Reserves a key for a new request; returns False if it is already taken"""
+        
+    @abstractmethod
+    async def complete(self, key: str, response: str, ttl: float) -> None:
+        """Stores the response of the request that claimed the key"""
+        
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        """Drops a claim whose request failed, so it can be retried"""
+
+class InMemoryIdempotencyBackend(IdempotencyBackend):
+    """
+    Per-process backend with TTL expiry and LRU eviction
+    
+    In-flight claims are kept apart from completed records and only expire
+    with their lease; max_entries bounds the completed records, which are
+    evicted least recently used first.
+    """
+    
+    def __init__(self, max_entries: int = 100000):
+        self._max_entries = max_entries
+        self._claims: Dict[str, IdempotencyRecord] = {}
+        self._records: "OrderedDict[str, IdempotencyRecord]" = OrderedDict()
+        
+    async def get(self, key: str) -> Optional[IdempotencyRecord]:
+        claim = self._claims.get(key)
+        if claim is not None:
+            if claim.expires_at > time.time():
+                return claim
+            del self._claims[key]
+        record = self._records.get(key)
+        if record is None:
+            return None
+        if record.expires_at <= time.time():
+            del self._records[key]
+            return None
+        self._records.move_to_end(key)
+        return record
+        
+    async def claim(self, key: str, fingerprint: str, lease: float) -> bool:
+        if await self.get(key) is not None:
+            return False
+        self._claims[key] = IdempotencyRecord(fingerprint=fingerprint, expires_at=time.time() + lease)
+        return True
+        
+    async def complete(self, key: str, response: str, ttl: float) -> None:
+        record = self._claims.pop(key, None)
+        if record is not None:
+            record.response = response
+            record.expires_at = time.time() + ttl
+            self._records[key] = record
+            while len(self._records) > self._max_entries:
+                self._records.popitem(last=False)
+                
+    async def release(self, key: str) -> None:
+        self._claims.pop(key, None)
+
+class SQLiteIdempotencyBackend(IdempotencyBackend):
+    """Backend in a SQLite WAL database, shareable by workers on one host"""
+    
+    def __init__(self, path: str, max_entries: int = 100000, prune_every: int = 1000):
+        self._path = path
+        self._max_entries = max_entries
+        self._prune_every = prune_every
+        self._claims = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+                "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, response TEXT, "
+                "expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_idempotency_keys_last_used "
+                "ON idempotency_keys (last_used)"
+            )
+            
+    async def get(self, key: str) -> Optional[IdempotencyRecord]:
+        return await asyncio.to_thread(self._get, key)
+        
+    async def claim(self, key: str, fingerprint: str, lease: float) -> bool:
+        self._claims += 1
+        if self._claims % self._prune_every == 0:
+            await asyncio.to_thread(self._prune)
+        return await asyncio.to_thread(self._claim, key, fingerprint, lease)
+        
+    async def complete(self, key: str, response: str, ttl: float) -> None:
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE idempotency_keys SET response = ?, expires_at = ?, last_used = ? WHERE key = ?",
+            (response, time.time() + ttl, time.time(), key)
+        )
+        
+    async def release(self, key: str) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM idempotency_keys WHERE key = ?", (key,))
+        
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=5)
+        
+    def _execute(self, sql: str, params: tuple) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(sql, params)
+        finally:
+            conn.close()
+            
+    def _get(self, key: str) -> Optional[IdempotencyRecord]:
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute(
+                    "SELECT fingerprint, response, expires_at FROM idempotency_keys "
+                    "WHERE key = ? AND expires_at > ?",
+                    (key, time.time())
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE idempotency_keys SET last_used = ? WHERE key = ?", (time.time(), key))
+            return IdempotencyRecord(fingerprint=row[0], response=row[1], expires_at=row[2])
+        finally:
+            conn.close()
+            
+    def _claim(self, key: str, fingerprint: str, lease: float) -> bool:
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM idempotency_keys WHERE key = ? AND expires_at <= ?", (key, now))
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO idempotency_keys "
+                    "(key, fingerprint, response, expires_at, last_used) VALUES (?, ?, NULL, ?, ?)",
+                    (key, fingerprint, now + lease, now)
+                )
+                return cursor.rowcount == 1
+        finally:
+            conn.close()
+            
+    def _prune(self) -> None:
+        """Drops expired keys, then the least recently used completed keys beyond max_entries"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (time.time(),))
+                conn.execute(
+                    "DELETE FROM idempotency_keys WHERE key IN ("
+                    "SELECT key FROM idempotency_keys WHERE response IS NOT NULL "
+                    "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self._max_entries,)
+                )
+        finally:
+            conn.close()
+
+class IdempotencyCache:
+    """Replays the stored result of a request retried with the same idempotency key"""
+    
+    def __init__(self, backend: IdempotencyBackend, ttl: float = 86400, lease: float = 60):
+        """
+        Args:
+            backend: Where records are stored
+            ttl: Seconds a completed result is kept
+            lease: Seconds a key stays reserved while its first request runs
+        """
+        self._backend = backend
+        self._ttl = ttl
+        self._lease = lease
+        
+    async def execute(
+        self,
+        key: str,
+        fingerprint: str,
+        func: Callable[[], Awaitable[BaseModel]]
+    ) -> Any:
+        """
+        Runs func once per key and returns its result, or the stored result on a retry
+        
+        Args:
+            key: Idempotency key, already scoped to the caller and endpoint
+            fingerprint: Digest of the request body; a key reused with another body is rejected
+            func: Performs the request and returns a pydantic model
+            
+        Returns:
+            The model returned by func, or the stored result as a dict
+            
+        Raises:
+            IdempotencyConflict: The key belongs to another request or is still in flight
+        """
+        while True:
+            record = await self._backend.get(key)
+            if record is not None:
+                if record.fingerprint != fingerprint:
+                    raise IdempotencyConflict("Idempotency-Key was already used for a different request")
+                if record.response is None:
+                    raise IdempotencyConflict("A request with this Idempotency-Key is still in progress")
+                logger.info(f"Replayed idempotent response for key {key}")
+                return json.loads(record.response)
+            if await self._backend.claim(key, fingerprint, self._lease):
+                break
+                
+        try:
+            result = await func()
+        except BaseException:
+            # Including cancellation, e.g. a client disconnect, which would otherwise hold the key for the lease
+            await self._backend.release(key)
+            raise
+        await self._backend.complete(key, result.model_dump_json(), self._ttl)
+        return result
@@ -0,0 +1,178 @@
+from contextlib import asynccontextmanager, nullcontext
+from decimal import Decimal
+from typing import Any, AsyncIterator, ContextManager, Dict, Iterator, List, Tuple
+import asyncio
+import logging
+import zlib
+
+from .amount import from_units, positive_units, to_units
+
+logger = logging.getLogger(__name__)
+
+class ShardedLedger:
+    """
+    Address balances partitioned into shards, each guarded by its own lock
+    
+    An address always maps to the same shard (CRC32 of the address), so
+    operations on unrelated accounts take different locks and run
+    concurrently. Operations spanning several addresses lock their shards in
+    ascending shard order, which rules out deadlock between them.
+    
+    Balances are held as integer units (see amount.py) and converted to
+    Decimal only by get_balance and the snapshot methods.
+    
+    The plain credit/debit/transfer methods lock for themselves. Callers that
+    need to await something while balances must stay put (a write-through, a
+    log append) hold locked() and use the apply_* methods inside it.
+    """
+    
+    def __init__(self, num_shards: int = 256):
+        if num_shards < 1 or num_shards & (num_shards - 1):
+            raise ValueError("num_shards must be a power of two")
+        self._mask = num_shards - 1
+        self._balances: List[Dict[str, int]] = [{} for _ in range(num_shards)]
+        self._locks = [asyncio.Lock() for _ in range(num_shards)]
+        
+    @property
+    def num_shards(self) -> int:
+        return len(self._balances)
+        
+    def shard_of(self, address: str) -> int:
+        """Returns the shard an address belongs to"""
+        return zlib.crc32(address.encode()) & self._mask
+        
+    def get_balance(self, address: str) -> Decimal:
+        """Returns the balance of an address, zero if it has never been credited"""
+        return from_units(self.get_units(address))
+        
+    def get_units(self, address: str) -> int:
+        """Returns the balance of an address in integer units"""
+        return self._balances[self.shard_of(address)].get(address, 0)
+        
+    @asynccontextmanager
+    async def locked(self, *addresses: str) -> AsyncIterator[None]:
+        """
+        Holds the locks of every shard the addresses map to
+        
+        Args:
+            addresses: Addresses the caller is about to read or change
+        """
+        shards = sorted({self.shard_of(address) for address in addresses})
+        acquired = []
+        try:
+            for shard in shards:
+                await self._locks[shard].acquire()
+                acquired.append(shard)
+            yield
+        finally:
+            for shard in reversed(acquired):
+                self._locks[shard].release()
+                
+    async def credit(self, address: str, amount: Decimal) -> bool:
+        """
+        Adds to an address balance
+        
+        Args:
+            address: Address to credit
+            amount: Positive amount
+            
+        Returns:
+            bool: Success status
+        """
+        async with self.locked(address):
+            return self.apply_credit(address, amount)
+            
+    async def debit(self, address: str, amount: Decimal) -> bool:
+        """
+        Subtracts from an address balance; fails rather than overdrawing
+        
+        Args:
+            address: Address to debit
+            amount: Positive amount
+            
+        Returns:
+            bool: Success status
+        """
+        async with self.locked(address):
+            return self.apply_debit(address, amount)
+            
+    async def transfer(self, sender: str, recipient: str, amount: Decimal) -> bool:
+        """
+        Moves an amount between two addresses atomically
+        
+        Args:
+            sender: Address to debit
+            recipient: Address to credit
+            amount: Positive amount
+            
+        Returns:
+            bool: Success status
+        """
+        async with self.locked(sender, recipient):
+            return self.apply_transfer(sender, recipient, amount)
+            
+    def atomic(self) -> ContextManager[None]:
+        """
+        Groups balance changes that must be applied together
+        
+        A no-op here, since in-process balances only change on the event loop
+        thread; stores shared between processes make this a transaction.
+        """
+        return nullcontext()
+        
+    def apply_credit(self, address: str, amount: Decimal) -> bool:
+        """Credits without locking; the caller must hold locked(address)"""
+        units = positive_units(amount)
+        if units is None:
+            logger.error(f"Invalid credit amount {amount} for {address}")
+            return False
+        self.apply_adjustment(address, units)
+        return True
+        
+    def apply_debit(self, address: str, amount: Decimal) -> bool:
+        """Debits without locking; the caller must hold locked(address)"""
+        units = positive_units(amount)
+        if units is None:
+            logger.error(f"Invalid debit amount {amount} for {address}")
+            return False
+        with self.atomic():
+            balance = self.get_units(address)
+            if balance < units:
+                logger.error(f"Insufficient balance for {address}: {from_units(balance)} < {amount}")
+                return False
+            self.apply_adjustment(address, -units)
+        return True
+        
+    def apply_transfer(self, sender: str, recipient: str, amount: Decimal) -> bool:
+        """Transfers without locking; the caller must hold locked(sender, recipient)"""
+        with self.atomic():
+            if not self.apply_debit(sender, amount):
+                return False
+            return self.apply_credit(recipient, amount)
+            
+    def apply_adjustment(self, address: str, delta: int) -> None:
+        """
+        Adds signed units without validation; the caller must hold locked(address)
+        
+        For callers that have already checked the change, e.g. against a
+        batch of pending debits, or that are undoing an earlier change.
+        """
+        balances = self._balances[self.shard_of(address)]
+        balances[address] = balances.get(address, 0) + delta
+        
+    def items(self) -> Iterator[Tuple[str, int]]:
+        """Iterates over every (address, balance in units) pair"""
+        for balances in self._balances:
+            yield from balances.items()
+            
+    def export_state(self) -> Dict[str, Any]:
+        """Returns a serializable snapshot of all balances"""
+        return {"balances": {address: str(from_units(units)) for address, units in self.items()}}
+        
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """Restores balances from a snapshot"""
+        for balances in self._balances:
+            balances.clear()
+        for address, balance in state["balances"].items():
+            self._balances[self.shard_of(address)][address] = to_units(Decimal(balance))
+
@@ -0,0 +1,548 @@
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import bisect
+import json
+import logging
+import mmap
+import os
+import struct
+import zlib
+
+from .transactions import Transaction, TransactionType, TransactionStatus
+
+logger = logging.getLogger(__name__)
+
+# Record header: payload length, CRC32 of the payload, sequence number
+RECORD_HEADER = struct.Struct("<IIQ")
+SEGMENT_SUFFIX = ".seg"
+SNAPSHOT_PREFIX = "snapshot-"
+
+class SegmentedLog:
+    """
+    Append-only log of binary records stored in fixed-size segment files
+    
+    If an fsync or a write fails, every record written since the last
+    successful fsync is zeroed and the writer moves back to it, so the
+    sequence numbers are reused and recovery never replays a record whose
+    append reported a failure. Pending appends of those records fail with
+    the error.
+    """
+    
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int = 64 * 1024 * 1024,
+        group_commit_size: int = 256,
+        group_commit_interval: float = 0.002,
+        resume_seq: int = 0,
+        resume_position: Optional[Tuple[int, int]] = None
+    ):
+        """
+        Args:
+            resume_seq: Sequence of a record known to be durable, e.g. from a snapshot
+            resume_position: Log position just after that record, so reopening
+                does not rescan the newest segment from its start
+        """
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._segment_size = segment_size
+        self._group_commit_size = group_commit_size
+        self._group_commit_interval = group_commit_interval
+        
+        # First sequence number of each segment, in order, and the matching paths
+        self._segment_starts: List[int] = []
+        self._segment_paths: List[Path] = []
+        for path in sorted(self._directory.glob(f"*{SEGMENT_SUFFIX}")):
+            self._segment_starts.append(int(path.stem))
+            self._segment_paths.append(path)
+            
+        self._file = None
+        self._offset = 0
+        self._next_seq = 1
+        # Log position and next sequence just after the last record known to be durable
+        self._durable: Tuple[int, int, int] = (0, 0, 1)
+        self._rewinds = 0
+        # (last sequence written, future) of each append waiting for a group
+        # commit, and of those in the fsync under way
+        self._waiters: List[Tuple[int, asyncio.Future]] = []
+        self._committing: List[Tuple[int, asyncio.Future]] = []
+        self._commit_requested: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._open_tail(resume_seq, resume_position)
+        
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the last appended record, 0 if the log is empty"""
+        return self._next_seq - 1
+        
+    @property
+    def position(self) -> Tuple[int, int]:
+        """(segment first sequence, byte offset) just after the last record"""
+        return self._segment_starts[-1], self._offset
+        
+    async def start(self) -> None:
+        """Starts the group commit task that batches fsyncs across appends"""
+        if self._task is None:
+            self._commit_requested = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            
+    async def close(self) -> None:
+        """Commits outstanding records and closes the active segment"""
+        if self._task is not None:
+            self._stopping = True
+            self._commit_requested.set()
+            await self._task
+            self._task = None
+            self._stopping = False
+        self._commit()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            
+    def flush(self) -> None:
+        """Makes everything written so far durable, inline"""
+        self._commit()
+        
+    def write(self, payloads: List[bytes]) -> int:
+        """
+        Writes records without waiting for them to become durable
+        
+        Args:
+            payloads: Encoded records to append
+            
+        Returns:
+            int: Sequence number of the last written record
+            
+        Raises:
+            ValueError: A record does not fit in a segment; nothing is written
+        """
+        for payload in payloads:
+            if RECORD_HEADER.size + len(payload) > self._segment_size:
+                raise ValueError(f"Record of {RECORD_HEADER.size + len(payload)} bytes exceeds the segment size")
+        try:
+            for payload in payloads:
+                self._write(payload)
+        except Exception as e:
+            self._fail(e)
+            raise
+        return self.last_seq
+        
+    async def sync(self) -> None:
+        """
+        Waits until everything written so far is durable
+        
+        The fsync is shared with every other caller in the same group commit
+        window; without a running group commit task it happens inline.
+        """
+        if self._task is None:
+            self._commit()
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((self.last_seq, waiter))
+        if len(self._waiters) >= self._group_commit_size:
+            self._commit_requested.set()
+        await waiter
+        
+    async def append(self, payloads: List[bytes]) -> int:
+        """Appends records and waits until they are durable"""
+        seq = self.write(payloads)
+        await self.sync()
+        return seq
+        
+    def iter_records(
+        self,
+        from_seq: int = 1,
+        position: Optional[Tuple[int, int]] = None
+    ) -> Iterator[Tuple[int, memoryview]]:
+        """
+        Yields (sequence, payload) for every committed record from from_seq on
+        
+        Segments are read through mmap and payloads are memoryviews into the
+        mapping, so nothing is copied. A payload is only valid until the next
+        record is requested.
+        
+        Args:
+            from_seq: First sequence number to yield
+            position: Known position of a record at or before from_seq, which
+                skips scanning the start of its segment
+        """
+        if self._file is not None:
+            self._file.flush()
+        start = max(bisect.bisect_right(self._segment_starts, from_seq) - 1, 0)
+        offset = 0
+        if position and position[0] in self._segment_starts:
+            start = self._segment_starts.index(position[0])
+            offset = position[1]
+        for path in self._segment_paths[start:]:
+            mapped = self._map(path)
+            if mapped is None:
+                offset = 0
+                continue
+            view = memoryview(mapped)
+            try:
+                for seq, payload in self._scan(view, offset):
+                    if seq >= from_seq:
+                        yield seq, payload
+                    else:
+                        payload.release()
+            finally:
+                view.release()
+                try:
+                    mapped.close()
+                except BufferError:
+                    # A caller still holds a payload view; the mapping is freed with it
+                    pass
+            offset = 0
+            
+    def _scan(self, view: memoryview, offset: int = 0) -> Iterator[Tuple[int, memoryview]]:
+        """Walks the records of one mapped segment up to its first invalid header"""
+        while offset + RECORD_HEADER.size <= len(view):
+            length, checksum, seq = RECORD_HEADER.unpack_from(view, offset)
+            end = offset + RECORD_HEADER.size + length
+            if length == 0 or end > len(view):
+                break
+            payload = view[offset + RECORD_HEADER.size:end]
+            if zlib.crc32(payload) != checksum:
+                # Torn write at the tail of the log
+                payload.release()
+                break
+            yield seq, payload
+            offset = end
+            
+    def _open_tail(self, resume_seq: int, resume_position: Optional[Tuple[int, int]]) -> None:
+        """Opens the newest segment and positions the writer after its last record"""
+        if not self._segment_paths:
+            self._roll(1)
+            return
+            
+        path = self._segment_paths[-1]
+        last_seq = self._segment_starts[-1] - 1
+        end = 0
+        if resume_position and resume_position[0] == self._segment_starts[-1]:
+            last_seq = resume_seq
+            end = resume_position[1]
+        mapped = self._map(path)
+        if mapped is None:
+            # Crashed before the segment was preallocated
+            with open(path, "r+b") as f:
+                f.truncate(self._segment_size)
+        else:
+            view = memoryview(mapped)
+            for seq, payload in self._scan(view, end):
+                last_seq = seq
+                end += RECORD_HEADER.size + len(payload)
+                payload.release()
+            view.release()
+            mapped.close()
+            
+        self._file = open(path, "r+b")
+        self._file.seek(end)
+        self._offset = end
+        self._next_seq = last_seq + 1
+        self._durable = self._mark()
+        
+    @staticmethod
+    def _map(path: Path) -> Optional[mmap.mmap]:
+        """Maps a segment read-only; None for an empty file, which mmap refuses"""
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            
+    def _roll(self, first_seq: int) -> None:
+        """Closes the active segment and preallocates the next one"""
+        if self._file is not None:
+            self._commit()
+            self._file.close()
+        path = self._directory / f"{first_seq:020d}{SEGMENT_SUFFIX}"
+        with open(path, "wb") as f:
+            f.truncate(self._segment_size)
+        self._segment_starts.append(first_seq)
+        self._segment_paths.append(path)
+        self._file = open(path, "r+b")
+        self._offset = 0
+        self._next_seq = first_seq
+        self._durable = self._mark()
+        logger.info(f"Opened ledger segment {path.name}")
+        
+    def _write(self, payload: bytes) -> None:
+        size = RECORD_HEADER.size + len(payload)
+        if self._offset + size > self._segment_size:
+            self._roll(self._next_seq)
+        self._file.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload), self._next_seq))
+        self._file.write(payload)
+        self._offset += size
+        self._next_seq += 1
+        
+    def _commit(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except Exception as e:
+            logger.error(f"Ledger commit failed: {str(e)}")
+            self._fail(e)
+            raise
+        self._durable = max(self._durable, self._mark())
+        
+    def _mark(self) -> Tuple[int, int, int]:
+        return self._segment_starts[-1], self._offset, self._next_seq
+        
+    def _fail(self, error: Exception) -> None:
+        """Rewinds to the last durable record and settles every pending append"""
+        self._rewind()
+        waiters = self._committing + self._waiters
+        self._committing, self._waiters = [], []
+        durable_seq = self._durable[2] - 1
+        for seq, waiter in waiters:
+            if waiter.done():
+                continue
+            if seq <= durable_seq:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(error)
+                
+    def _rewind(self) -> None:
+        """Zeroes the records written after the last durable one and moves the writer back to it"""
+        # Rolling commits the old segment first, so the durable mark is always in the active one
+        _, offset, next_seq = self._durable
+        if self._next_seq == next_seq:
+            return
+        try:
+            self._file.seek(offset)
+            self._file.write(bytes(self._offset - offset))
+            self._file.flush()
+            self._file.seek(offset)
+        except Exception as e:
+            # Whatever is left is overwritten by the next records
+            logger.error(f"Failed to clear discarded ledger records: {str(e)}")
+        logger.error(f"Discarded ledger records {next_seq} to {self._next_seq - 1}, which were not made durable")
+        self._offset = offset
+        self._next_seq = next_seq
+        self._rewinds += 1
+        
+    async def _run(self) -> None:
+        """Fsyncs once per group commit window and releases every waiting append"""
+        while not self._stopping or self._waiters:
+            try:
+                await asyncio.wait_for(self._commit_requested.wait(), self._group_commit_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._commit_requested.clear()
+            if not self._waiters:
+                continue
+            self._committing, self._waiters = self._waiters, []
+            rewinds = self._rewinds
+            try:
+                self._file.flush()
+                mark = self._mark()
+                await asyncio.to_thread(os.fsync, self._file.fileno())
+            except Exception as e:
+                logger.error(f"Ledger group commit failed: {str(e)}")
+                self._fail(e)
+                continue
+            # A failure elsewhere during the fsync already settled these appends
+            if self._rewinds == rewinds:
+                self._durable = max(self._durable, mark)
+            waiters, self._committing = self._committing, []
+            for _, waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+class SnapshotStore:
+    """Stores point-in-time snapshots of manager state keyed by log sequence"""
+    
+    def __init__(self, directory: str, retain: int = 3):
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._retain = retain
+        
+    def write(self, seq: int, position: Tuple[int, int], state: Dict[str, Any]) -> None:
+        """Atomically writes a snapshot taken after the record at seq"""
+        path = self._directory / f"{SNAPSHOT_PREFIX}{seq:020d}.json"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"seq": seq, "position": list(position), "state": state}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        
+        for old in self._paths()[:-self._retain]:
+            old.unlink()
+            
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Returns the newest snapshot (seq, position and state), if any"""
+        paths = self._paths()
+        if not paths:
+            return None
+        with open(paths[-1]) as f:
+            return json.load(f)
+            
+    def _paths(self) -> List[Path]:
+        return sorted(self._directory.glob(f"{SNAPSHOT_PREFIX}*.json"))
+
+class LedgerLog:
+    """
+    Durable record of executed transactions with snapshot-based recovery
+    
+    Executed transactions are appended to a SegmentedLog. Every
+    snapshot_interval records, the state of each registered owner (any object
+    with export_state/load_state, e.g. CurrencyManager) is written to a
+    snapshot tagged with the current log sequence. Owners with a
+    log_transactions method are told of each append as it is written, so
+    that they can export the state the log implies rather than live state
+    that runs ahead of it, and of each append that fails through their
+    unlog_transactions method. A snapshot is only written once every record
+    up to its sequence is durable.
+    Recovery loads the newest snapshot and replays only the records after it,
+    which keeps restart time bounded by the snapshot interval rather than the
+    length of the ledger. State that is not derived from transactions, such
+    as reserves, is durable as of the newest snapshot.
+    """
+    
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int = 64 * 1024 * 1024,
+        group_commit_size: int = 256,
+        group_commit_interval: float = 0.002,
+        snapshot_interval: int = 10000
+    ):
+        self._snapshots = SnapshotStore(os.path.join(directory, "snapshots"))
+        self._snapshot = self._snapshots.latest()
+        self._log = SegmentedLog(
+            os.path.join(directory, "segments"),
+            segment_size=segment_size,
+            group_commit_size=group_commit_size,
+            group_commit_interval=group_commit_interval,
+            resume_seq=self._snapshot["seq"] if self._snapshot else 0,
+            resume_position=tuple(self._snapshot["position"]) if self._snapshot else None
+        )
+        self._snapshot_interval = snapshot_interval
+        self._last_snapshot_seq = self._snapshot["seq"] if self._snapshot else 0
+        self._owners: Dict[str, Any] = {}
+        
+    def register_state(self, name: str, owner: Any) -> None:
+        """Includes an owner's export_state() in snapshots under the given name"""
+        self._owners[name] = owner
+        
+    async def start(self) -> None:
+        await self._log.start()
+        
+    async def close(self) -> None:
+        """Takes a final snapshot and closes the log"""
+        if self._owners and self._log.last_seq > self._last_snapshot_seq:
+            self.snapshot()
+        await self._log.close()
+        
+    async def record(self, transaction: Transaction) -> None:
+        await self.record_many([transaction])
+        
+    async def record_many(self, transactions: List[Transaction]) -> None:
+        """Appends executed transactions and snapshots when the interval is reached"""
+        if not transactions:
+            return
+        self._log.write([self._encode(tx) for tx in transactions])
+        # Told before the sync, as a snapshot taken meanwhile includes the records
+        owners = [owner for owner in self._owners.values() if hasattr(owner, "log_transactions")]
+        for owner in owners:
+            owner.log_transactions(transactions)
+        try:
+            await self._log.sync()
+        except Exception:
+            # The log discarded the records, so the owners must not count them either
+            for owner in owners:
+                if hasattr(owner, "unlog_transactions"):
+                    owner.unlog_transactions(transactions)
+            raise
+        if self._log.last_seq - self._last_snapshot_seq >= self._snapshot_interval:
+            try:
+                self.snapshot()
+            except Exception as e:
+                # The records are durable; the next append tries the snapshot again
+                logger.error(f"Failed to write ledger snapshot: {str(e)}")
+                
+    def snapshot(self) -> int:
+        """Writes a snapshot of every registered owner at the current log sequence"""
+        # Records written since the last group commit must not be lost behind the snapshot
+        self._log.flush()
+        seq = self._log.last_seq
+        state = {name: owner.export_state() for name, owner in self._owners.items()}
+        self._snapshots.write(seq, self._log.position, state)
+        self._last_snapshot_seq = seq
+        logger.info(f"Wrote ledger snapshot at sequence {seq}")
+        return seq
+        
+    async def recover(self, transaction_manager=None) -> int:
+        """
+        Restores registered owners from the newest snapshot and replays the log tail
+        
+        Replayed transactions are passed to each owner's replay_transaction
+        method, if it has one, and restored into the transaction manager.
+        
+        Returns:
+            int: Number of replayed records
+        """
+        snapshot = self._snapshot
+        from_seq = 1
+        position = None
+        if snapshot:
+            for name, owner in self._owners.items():
+                if name in snapshot["state"]:
+                    owner.load_state(snapshot["state"][name])
+            from_seq = snapshot["seq"] + 1
+            position = tuple(snapshot["position"])
+            
+        replayed = 0
+        for transaction in self.iter_transactions(from_seq, position):
+            for owner in self._owners.values():
+                if hasattr(owner, "replay_transaction"):
+                    owner.replay_transaction(transaction)
+            if transaction_manager is not None:
+                transaction_manager.restore_transaction(transaction)
+            replayed += 1
+        logger.info(f"Recovered ledger from sequence {from_seq - 1}, replayed {replayed} records")
+        return replayed
+        
+    def iter_transactions(
+        self,
+        from_seq: int = 1,
+        position: Optional[Tuple[int, int]] = None
+    ) -> Iterator[Transaction]:
+        """Yields logged transactions in log order starting at from_seq"""
+        for _, payload in self._log.iter_records(from_seq, position):
+            transaction = self._decode(payload)
+            payload.release()
+            yield transaction
+            
+    @staticmethod
+    def _encode(transaction: Transaction) -> bytes:
+        return json.dumps([
+            transaction.id,
+            transaction.type.value,
+            str(transaction.amount),
+            transaction.sender,
+            transaction.recipient,
+            transaction.timestamp.isoformat(),
+            transaction.status.value,
+            transaction.metadata
+        ], separators=(",", ":")).encode()
+        
+    @staticmethod
+    def _decode(payload: memoryview) -> Transaction:
+        id, type, amount, sender, recipient, timestamp, status, metadata = json.loads(payload.tobytes())
+        return Transaction(
+            id=id,
+            type=TransactionType(type),
+            amount=Decimal(amount),
+            sender=sender,
+            recipient=recipient,
+            timestamp=datetime.fromisoformat(timestamp),
+            status=TransactionStatus(status),
+            metadata=metadata
+        )
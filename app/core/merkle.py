@@ -0,0 +1,228 @@
+import hmac
+from hashlib import sha256
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+HASH_SIZE = 32
+SALT_SIZE = 16
+# Sums are hashed as 32-byte signed integers, so each must stay below this
+MAX_SUM = 1 << 255
+
+def leaf_hash(key: str, value: int, salt: bytes = bytes(SALT_SIZE)) -> bytes:
+    """Hashes one entry: 0x00, its salt, the key's length and UTF-8 bytes, then its value"""
+    encoded = key.encode()
+    return sha256(
+        b"\x00" + salt + len(encoded).to_bytes(4, "big") + encoded + value.to_bytes(32, "big", signed=True)
+    ).digest()
+
+def node_hash(left: bytes, left_sum: int, right: bytes, right_sum: int) -> bytes:
+    """
+    Hashes an inner node: 0x01, then each child's hash followed by its sum
+    
+    Committing to both child sums, rather than only their total, stops a
+    prover from shifting value between siblings so that each of two proofs
+    verifies against an understated root total.
+    """
+    return sha256(
+        b"\x01"
+        + left + left_sum.to_bytes(32, "big", signed=True)
+        + right + right_sum.to_bytes(32, "big", signed=True)
+    ).digest()
+
+def verify_proof(
+    key: str,
+    value: int,
+    index: int,
+    siblings: List[Tuple[bytes, int]],
+    root: bytes,
+    total: int,
+    salt: bytes = bytes(SALT_SIZE)
+) -> bool:
+    """
+    Checks an inclusion proof from MerkleSumTree.proof
+    
+    Args:
+        key: Entry key, e.g. an address
+        value: Entry value in integer units
+        index: Leaf position
+        siblings: (hash, sum) of the sibling at each level, leaf level first
+        root: Published root hash
+        total: Published root sum
+        salt: The entry's leaf salt, from its proof
+        
+    Returns:
+        bool: Whether the entry is part of the tree with that root and total
+    """
+    if not 0 <= value < MAX_SUM:
+        return False
+    if len(salt) != SALT_SIZE:
+        return False
+    current, current_sum = leaf_hash(key, value, salt), value
+    for sibling, sibling_sum in siblings:
+        if not 0 <= sibling_sum < MAX_SUM or current_sum + sibling_sum >= MAX_SUM:
+            return False
+        if index & 1:
+            current = node_hash(sibling, sibling_sum, current, current_sum)
+        else:
+            current = node_hash(current, current_sum, sibling, sibling_sum)
+        current_sum += sibling_sum
+        index >>= 1
+    return current == root and current_sum == total
+
+class MerkleSumTree:
+    """
+    Merkle sum tree over keyed integer values, updated in place
+    
+    A complete binary tree whose leaves are entries in insertion order. Each
+    inner node hashes both children's hashes and sums, so the root commits to
+    every entry and to their total: an inclusion proof shows an entry is
+    counted, and since sums cannot be negative, that the total is at least
+    its value. Unused leaves hold a fixed empty hash.
+    
+    With a salt key, each leaf also hashes a salt derived from its key, so
+    that a sibling hash in someone else's proof cannot be matched against a
+    guessed key and value. The salt is only handed out in the entry's own
+    proof.
+    
+    Setting a value rehashes the O(log n) nodes on its path. Hashes and sums
+    are kept in one list per level; capacity doubles when the leaves run out.
+    """
+    
+    def __init__(self, capacity: int = 1024, salt_key: Optional[bytes] = None):
+        """
+        Args:
+            capacity: Initial leaf capacity, doubled as needed
+            salt_key: Secret the leaf salts are derived from; leaves are
+                unsalted if omitted
+        """
+        self._salt_key = salt_key
+        self._reset(capacity)
+        
+    def __len__(self) -> int:
+        return len(self._keys)
+        
+    @property
+    def root(self) -> bytes:
+        return self._hashes[-1][0]
+        
+    @property
+    def total(self) -> int:
+        return self._sums[-1][0]
+        
+    def get(self, key: str) -> Optional[int]:
+        index = self._index.get(key)
+        return None if index is None else self._sums[0][index]
+        
+    def salt(self, key: str) -> bytes:
+        """Returns the salt hashed into a key's leaf"""
+        if self._salt_key is None:
+            return bytes(SALT_SIZE)
+        return hmac.new(self._salt_key, key.encode(), sha256).digest()[:SALT_SIZE]
+        
+    def update(self, key: str, value: int) -> None:
+        """Sets an entry's value, adding it if new, and rehashes its path"""
+        self.update_many([(key, value)])
+        
+    def update_many(self, entries: Iterable[Tuple[str, int]]) -> None:
+        """
+        Sets many entries' values, adding new ones, and rehashes each affected node once
+        
+        Paths of entries close together share their upper nodes, so a batch
+        of k updates costs fewer than k * log n node hashes.
+        
+        Raises:
+            ValueError: A value is negative; nothing is changed
+        """
+        entries = list(entries)
+        for key, value in entries:
+            if value < 0:
+                raise ValueError(f"Merkle sum tree values cannot be negative: {key}")
+                
+        changed = set()
+        for key, value in entries:
+            index = self._index.get(key)
+            if index is None:
+                index = len(self._keys)
+                if index == len(self._sums[0]):
+                    self._grow()
+                self._index[key] = index
+                self._keys.append(key)
+            elif self._sums[0][index] == value:
+                continue
+            self._hashes[0][index] = leaf_hash(key, value, self.salt(key))
+            self._sums[0][index] = value
+            changed.add(index)
+            
+        for level in range(1, len(self._hashes)):
+            changed = {index >> 1 for index in changed}
+            below, below_sums = self._hashes[level - 1], self._sums[level - 1]
+            for index in changed:
+                left_sum, right_sum = below_sums[2 * index], below_sums[2 * index + 1]
+                self._hashes[level][index] = node_hash(below[2 * index], left_sum, below[2 * index + 1], right_sum)
+                self._sums[level][index] = left_sum + right_sum
+                
+    def load(self, entries: Iterable[Tuple[str, int]]) -> None:
+        """Replaces all entries, building the tree bottom-up in one pass"""
+        entries = list(entries)
+        capacity = 1
+        while capacity < max(len(entries), 1):
+            capacity *= 2
+        self._reset(capacity)
+        leaves, sums = self._hashes[0], self._sums[0]
+        for index, (key, value) in enumerate(entries):
+            if value < 0:
+                raise ValueError(f"Merkle sum tree values cannot be negative: {key}")
+            self._index[key] = index
+            self._keys.append(key)
+            leaves[index] = leaf_hash(key, value, self.salt(key))
+            sums[index] = value
+            
+        for level in range(1, len(self._hashes)):
+            below, below_sums = self._hashes[level - 1], self._sums[level - 1]
+            hashes, level_sums = self._hashes[level], self._sums[level]
+            for index in range(len(level_sums)):
+                left_sum, right_sum = below_sums[2 * index], below_sums[2 * index + 1]
+                level_sums[index] = left_sum + right_sum
+                hashes[index] = node_hash(below[2 * index], left_sum, below[2 * index + 1], right_sum)
+                
+    def proof(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns an inclusion proof for one entry
+        
+        Returns:
+            Optional[Dict[str, Any]]: index, value, salt and siblings
+                ((hash, sum) from the leaf level up), or None for an unknown key
+        """
+        index = self._index.get(key)
+        if index is None:
+            return None
+        result = {"index": index, "value": self._sums[0][index], "salt": self.salt(key), "siblings": []}
+        for level in range(len(self._hashes) - 1):
+            result["siblings"].append((self._hashes[level][index ^ 1], self._sums[level][index ^ 1]))
+            index >>= 1
+        return result
+        
+    def _grow(self) -> None:
+        """Doubles the leaf capacity; the old tree becomes the left half"""
+        for level in range(len(self._hashes)):
+            size = len(self._sums[level])
+            self._hashes[level].extend([self._empty[level]] * size)
+            self._sums[level].extend([0] * size)
+        top = len(self._hashes) - 1
+        self._empty.append(node_hash(self._empty[top], 0, self._empty[top], 0))
+        root, empty = self._hashes[top]
+        total = self._sums[top][0]
+        self._hashes.append([node_hash(root, total, empty, 0)])
+        self._sums.append([total])
+        
+    def _reset(self, capacity: int) -> None:
+        levels = max(capacity - 1, 1).bit_length() + 1
+        self._index: Dict[str, int] = {}
+        self._keys: List[str] = []
+        # Root hash of an empty subtree at each level
+        self._empty: List[bytes] = [bytes(HASH_SIZE)]
+        for _ in range(levels - 1):
+            self._empty.append(node_hash(self._empty[-1], 0, self._empty[-1], 0))
+        self._hashes: List[List[bytes]] = [
+            [self._empty[level]] * (1 << (levels - 1 - level)) for level in range(levels)
+        ]
+        self._sums: List[List[int]] = [[0] * (1 << (levels - 1 - level)) for level in range(levels)]
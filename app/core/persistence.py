@@ -0,0 +1,350 @@
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.orm import Session
+import asyncio
+import json
+import logging
+import os
+
+from .transactions import Transaction, TransactionType, TransactionStatus
+from ..models.currency import Transaction as TransactionRecord
+
+logger = logging.getLogger(__name__)
+
+class DurabilityMode(Enum):
+    SYNC = "sync"
+    BATCHED = "batched"
+
+class LedgerPersistence:
+    """
+    Write-behind persistence of executed transactions to the transactions table
+    
+    In batched mode a transaction the database keeps rejecting, e.g. one
+    whose ID is already taken, would otherwise be retried forever and fail
+    every batch it is in. A failed batch is therefore retried row by row,
+    and a transaction that fails max_attempts flushes is appended to the
+    dead-letter log, a JSON Lines file, and dropped from the buffer.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        mode: DurabilityMode = DurabilityMode.BATCHED,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        max_pending: Optional[int] = None,
+        max_attempts: int = 5,
+        dead_letter_path: Optional[str] = None
+    ):
+        """
+        Args:
+            session_factory: SQLAlchemy session factory
+            mode: Whether writes commit before returning or are buffered
+            batch_size: Buffered transactions that trigger a flush
+            flush_interval: Seconds between flushes of a partial batch
+            max_pending: Buffered transactions before writers wait,
+                10 batches by default
+            max_attempts: Failed flushes before a transaction is dead-lettered
+            dead_letter_path: File dead-lettered transactions are appended to;
+                if omitted they are only logged
+        """
+        self._session_factory = session_factory
+        self._mode = mode
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending or batch_size * 10
+        self._max_attempts = max_attempts
+        self._dead_letter_path = dead_letter_path
+        # Keyed by transaction ID so repeated writes of one transaction coalesce
+        self._buffer: Dict[str, Transaction] = {}
+        # Failed flushes so far of each buffered transaction that has failed one
+        self._attempts: Dict[str, int] = {}
+        self._dead_letter_count = 0
+        self._flush_requested = asyncio.Event()
+        self._flushed = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._persisted_count = 0
+        
+    @property
+    def mode(self) -> DurabilityMode:
+        return self._mode
+        
+    @property
+    def persisted_count(self) -> int:
+        """Number of transactions written to the database so far"""
+        return self._persisted_count
+        
+    @property
+    def pending_count(self) -> int:
+        """Number of transactions waiting for the next flush"""
+        return len(self._buffer)
+        
+    @property
+    def dead_letter_count(self) -> int:
+        """Number of transactions given up on and dead-lettered so far"""
+        return self._dead_letter_count
+        
+    async def start(self) -> None:
+        """Starts the background flusher used in batched mode"""
+        if self._mode == DurabilityMode.BATCHED and self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                f"Started ledger write-behind (batch size {self._batch_size}, "
+                f"interval {self._flush_interval}s)"
+            )
+            
+    async def stop(self) -> None:
+        """
+        Stops the background flusher and writes out anything still buffered
+        
+        Nothing is retried after this, so rows the database still rejects,
+        e.g. because it is unreachable, go to the dead-letter log at once
+        instead of being lost with the process.
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._flush_requested.set()
+            await self._task
+            self._task = None
+            self._stopping = False
+        await self._flush(final=True)
+        
+    async def record(self, transaction: Transaction) -> None:
+        """Records an executed transaction according to the durability mode"""
+        await self.record_many([transaction])
+        
+    async def record_many(self, transactions: Iterable[Transaction]) -> None:
+        """
+        Records executed transactions according to the durability mode
+        
+        In sync mode the call returns once the rows are committed. In batched
+        mode the rows are buffered and written by the background flusher; the
+        call only waits when the buffer is full.
+        """
+        if self._mode == DurabilityMode.SYNC:
+            rows = [self._to_row(tx) for tx in transactions]
+            if rows:
+                await asyncio.to_thread(self._write_rows, rows)
+                self._persisted_count += len(rows)
+            return
+            
+        while len(self._buffer) >= self._max_pending:
+            if self._task is None:
+                await self.flush()
+                break
+            # Backpressure: let the flusher drain before accepting more
+            self._flushed.clear()
+            self._flush_requested.set()
+            await self._flushed.wait()
+            
+        for transaction in transactions:
+            self._buffer[transaction.id] = transaction
+        if len(self._buffer) >= self._batch_size:
+            self._flush_requested.set()
+            
+    async def flush(self) -> int:
+        """
+        Writes all buffered transactions in a single bulk insert
+        
+        If the insert fails, the rows are written one at a time so that the
+        ones the database accepts are not held back by the others. Failed
+        rows go back into the buffer, or to the dead-letter log once they
+        have failed max_attempts flushes.
+        
+        Returns:
+            int: Number of transactions written
+            
+        Raises:
+            Exception: The error of the bulk insert, if any row failed
+        """
+        return await self._flush()
+        
+    def iter_transactions(
+        self,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        address: Optional[str] = None,
+        type: Optional[TransactionType] = None,
+        status: Optional[TransactionStatus] = None,
+        after: Optional[Tuple[datetime, str]] = None,
+        chunk_size: int = 1000
+    ) -> Iterator[Transaction]:
+        """
+        Yields persisted transactions in (timestamp, id) order
+        
+        All filters are applied in SQL and rows are fetched with keyset
+        pagination, one chunk per query, so memory stays constant. In batched
+        mode, transactions still waiting for a flush are not included.
+        
+        Args:
+            after: (timestamp, id) of a previously returned transaction to resume after
+        """
+        while True:
+            query = select(TransactionRecord)
+            if start_time:
+                query = query.where(TransactionRecord.timestamp >= start_time)
+            if end_time:
+                query = query.where(TransactionRecord.timestamp <= end_time)
+            if address is not None:
+                query = query.where(or_(
+                    TransactionRecord.sender == address,
+                    TransactionRecord.recipient == address
+                ))
+            if type:
+                query = query.where(TransactionRecord.type == type)
+            if status:
+                query = query.where(TransactionRecord.status == status)
+            if after:
+                timestamp, transaction_id = after
+                query = query.where(or_(
+                    TransactionRecord.timestamp > timestamp,
+                    and_(TransactionRecord.timestamp == timestamp, TransactionRecord.id > transaction_id)
+                ))
+            query = query.order_by(TransactionRecord.timestamp, TransactionRecord.id).limit(chunk_size)
+            
+            session = self._session_factory()
+            try:
+                chunk = [self._from_record(record) for record in session.scalars(query)]
+            finally:
+                session.close()
+            if not chunk:
+                return
+            yield from chunk
+            after = (chunk[-1].timestamp, chunk[-1].id)
+            
+    async def _flush(self, final: bool = False) -> int:
+        """Writes the buffer as flush does; when final, dead-letters failed rows rather than raising"""
+        async with self._flush_lock:
+            if not self._buffer:
+                return 0
+            buffered, self._buffer = self._buffer, {}
+            rows = [self._to_row(tx) for tx in buffered.values()]
+            try:
+                await asyncio.to_thread(self._write_rows, rows)
+                errors = {}
+            except Exception as e:
+                logger.error(f"Failed to flush {len(rows)} transactions: {str(e)}")
+                errors = await asyncio.to_thread(self._write_each, rows)
+                if errors:
+                    await self._retry_later(buffered, errors, final)
+                    self._persisted_count += len(rows) - len(errors)
+                    if not final:
+                        raise
+                    return len(rows) - len(errors)
+            for transaction_id in buffered:
+                self._attempts.pop(transaction_id, None)
+            self._persisted_count += len(rows)
+            return len(rows)
+            
+    async def _run(self) -> None:
+        """Flushes on the size threshold or the time threshold, whichever comes first"""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception:
+                await asyncio.sleep(self._flush_interval)
+            finally:
+                self._flushed.set()
+                
+    async def _retry_later(self, buffered: Dict[str, Transaction], errors: Dict[str, str], final: bool) -> None:
+        """Puts failed transactions back in the buffer, dead-lettering those out of attempts, or all if final"""
+        retried: Dict[str, Transaction] = {}
+        dead: List[Dict] = []
+        for transaction_id, transaction in buffered.items():
+            if transaction_id not in errors:
+                self._attempts.pop(transaction_id, None)
+                continue
+            attempts = self._attempts.get(transaction_id, 0) + 1
+            if attempts < self._max_attempts and not final:
+                self._attempts[transaction_id] = attempts
+                retried[transaction_id] = transaction
+                continue
+            self._attempts.pop(transaction_id, None)
+            dead.append({
+                "failed_at": datetime.now(timezone.utc).isoformat(),
+                "attempts": attempts,
+                "error": errors[transaction_id],
+                "transaction": transaction.model_dump(mode="json")
+            })
+            
+        # Writes buffered since the flush started are newer, so they win
+        retried.update(self._buffer)
+        self._buffer = retried
+        if dead:
+            self._dead_letter_count += len(dead)
+            for record in dead:
+                logger.error(
+                    f"Dead-lettered transaction {record['transaction']['id']} after "
+                    f"{record['attempts']} failed flushes: {record['error']}"
+                )
+            if self._dead_letter_path:
+                try:
+                    await asyncio.to_thread(self._append_dead_letters, dead)
+                except Exception as e:
+                    # The log is the last copy, so keep the transactions there
+                    logger.error(f"Failed to write dead-letter log: {str(e)}")
+                    for record in dead:
+                        logger.error(f"Dead-lettered transaction: {json.dumps(record)}")
+                        
+    def _append_dead_letters(self, records: List[Dict]) -> None:
+        with open(self._dead_letter_path, "a") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+            f.flush()
+            os.fsync(f.fileno())
+            
+    def _write_each(self, rows: List[Dict]) -> Dict[str, str]:
+        """Inserts rows one per commit, returning the error of each failed row by transaction ID"""
+        errors: Dict[str, str] = {}
+        for row in rows:
+            try:
+                self._write_rows([row])
+            except Exception as e:
+                errors[row["id"]] = str(e)
+        return errors
+        
+    def _write_rows(self, rows: List[Dict]) -> None:
+        """Inserts rows with one executemany statement and one commit"""
+        session = self._session_factory()
+        try:
+            session.execute(insert(TransactionRecord), rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+            
+    @staticmethod
+    def _to_row(transaction: Transaction) -> Dict:
+        return {
+            "id": transaction.id,
+            "type": transaction.type,
+            "amount": transaction.amount,
+            "sender": transaction.sender,
+            "recipient": transaction.recipient,
+            "timestamp": transaction.timestamp,
+            "status": transaction.status,
+            "meta": transaction.metadata
+        }
+        
+    @staticmethod
+    def _from_record(record: TransactionRecord) -> Transaction:
+        return Transaction(
+            id=record.id,
+            type=record.type,
+            amount=record.amount,
+            sender=record.sender,
+            recipient=record.recipient,
+            timestamp=record.timestamp,
+            status=record.status,
+            metadata=record.meta or {}
+        )
@@ -0,0 +1,212 @@
+from datetime import datetime, timedelta
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+import asyncio
+import logging
+
+from .amount import from_units, mul_ratio, to_units
+from .rollups import RESOLUTIONS, ROLLUP_RESOLUTIONS, bucket_start, choose_resolution
+from ..models.currency import Reserve, ReserveRollup
+
+logger = logging.getLogger(__name__)
+
+class ReserveHistoryStore:
+    """
+    Reserve levels over time, in the reserves table plus minute, hour and day rollups
+    
+    Every change writes one raw row per reserve type it touched and folds
+    the new level into that type's current rollup buckets, all in one
+    commit. Reads over long ranges come from the coarsest rollup that still
+    gives enough points, so they never scan raw rows. Each resolution has its
+    own retention, applied every prune_every writes.
+    
+    The tables are a projection of ReserveManager, so a failed write is
+    logged rather than failing the reserve change.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        retention: Optional[Dict[str, Optional[float]]] = None,
+        max_points: int = 500,
+        prune_every: int = 1000,
+        max_raw_rows: int = 10000
+    ):
+        """
+        Args:
+            session_factory: Creates database sessions
+            retention: Seconds to keep each resolution ("raw", "minute",
+                "hour", "day"); missing or None keeps it forever
+            max_points: Most buckets per reserve type a history read returns
+            prune_every: Writes between retention passes
+            max_raw_rows: Most raw rows a history read returns; the newest
+                ones in the range are kept
+        """
+        self._session_factory = session_factory
+        self._retention = retention or {}
+        self._max_points = max_points
+        self._prune_every = prune_every
+        self._max_raw_rows = max_raw_rows
+        self._writes = 0
+        # Rollup rows are read-modify-write, so writes run one at a time
+        self._write_lock = asyncio.Lock()
+        
+    async def record(self, levels: Dict[str, int], timestamp: Optional[datetime] = None) -> None:
+        """
+        Records new reserve levels
+        
+        Args:
+            levels: Level in units per reserve type that changed
+            timestamp: Naive UTC time of the change, defaults to now
+        """
+        if not levels:
+            return
+        timestamp = timestamp or datetime.utcnow()
+        async with self._write_lock:
+            self._writes += 1
+            prune = self._writes % self._prune_every == 0
+            await asyncio.to_thread(self._write, levels, timestamp, prune)
+            
+    async def history(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        reserve_type: Optional[str] = None,
+        resolution: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns reserve levels between two naive UTC times
+        
+        Args:
+            start_time: Start of the range
+            end_time: End of the range
+            reserve_type: Only this reserve type if given
+            resolution: A key of RESOLUTIONS; by default the finest one
+                whose retention covers start_time and that needs at most
+                max_points buckets
+                
+        Returns:
+            List[Dict[str, Any]]: Points in time order; rollup points carry
+                min, max and avg, and amount is the bucket's last level
+        """
+        if resolution is None:
+            resolution = choose_resolution(
+                start_time, end_time, self._max_points, self._retention, datetime.utcnow()
+            )
+        return await asyncio.to_thread(self._read, start_time, end_time, reserve_type, resolution)
+        
+    def prune(self, now: Optional[datetime] = None) -> None:
+        """Deletes raw rows and rollups older than their retention"""
+        now = now or datetime.utcnow()
+        session = self._session_factory()
+        try:
+            self._prune(session, now)
+            session.commit()
+        finally:
+            session.close()
+            
+    def _write(self, levels: Dict[str, int], timestamp: datetime, prune: bool) -> None:
+        session = self._session_factory()
+        try:
+            for reserve_type, units in levels.items():
+                amount = from_units(units)
+                session.add(Reserve(type=reserve_type, amount=amount, timestamp=timestamp))
+                for resolution in ROLLUP_RESOLUTIONS:
+                    key = (reserve_type, resolution, bucket_start(timestamp, resolution))
+                    rollup = session.get(ReserveRollup, key)
+                    if rollup is None:
+                        session.add(ReserveRollup(
+                            type=reserve_type,
+                            resolution=resolution,
+                            bucket_start=key[2],
+                            min=amount,
+                            max=amount,
+                            sum=amount,
+                            count=1,
+                            last=amount
+                        ))
+                        continue
+                    rollup.min = min(rollup.min, amount)
+                    rollup.max = max(rollup.max, amount)
+                    rollup.sum = rollup.sum + amount
+                    rollup.count += 1
+                    rollup.last = amount
+            if prune:
+                self._prune(session, timestamp)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Failed to record reserve history: {str(e)}")
+        finally:
+            session.close()
+            
+    def _prune(self, session: Session, now: datetime) -> None:
+        for resolution in RESOLUTIONS:
+            kept = self._retention.get(resolution)
+            if kept is None:
+                continue
+            cutoff = now - timedelta(seconds=kept)
+            if resolution == "raw":
+                session.execute(delete(Reserve).where(Reserve.timestamp < cutoff))
+            else:
+                session.execute(delete(ReserveRollup).where(
+                    ReserveRollup.resolution == resolution,
+                    ReserveRollup.bucket_start < cutoff
+                ))
+                
+    def _read(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        reserve_type: Optional[str],
+        resolution: str
+    ) -> List[Dict[str, Any]]:
+        session = self._session_factory()
+        try:
+            if resolution == "raw":
+                query = select(Reserve).where(
+                    Reserve.timestamp >= start_time,
+                    Reserve.timestamp <= end_time
+                )
+                if reserve_type:
+                    query = query.where(Reserve.type == reserve_type)
+                query = query.order_by(Reserve.timestamp.desc(), Reserve.id.desc()).limit(self._max_raw_rows)
+                rows = list(session.scalars(query))
+                rows.reverse()
+                return [
+                    {
+                        "reserve_type": row.type,
+                        "amount": row.amount,
+                        "timestamp": row.timestamp,
+                        "resolution": resolution
+                    }
+                    for row in rows
+                ]
+                
+            # Include the bucket that holds start_time
+            query = select(ReserveRollup).where(
+                ReserveRollup.resolution == resolution,
+                ReserveRollup.bucket_start >= bucket_start(start_time, resolution),
+                ReserveRollup.bucket_start <= end_time
+            )
+            if reserve_type:
+                query = query.where(ReserveRollup.type == reserve_type)
+            query = query.order_by(ReserveRollup.bucket_start, ReserveRollup.type)
+            return [
+                {
+                    "reserve_type": row.type,
+                    "amount": row.last,
+                    "timestamp": row.bucket_start,
+                    "resolution": resolution,
+                    "min": row.min,
+                    "max": row.max,
+                    "avg": from_units(mul_ratio(
+                        to_units(Decimal(row.sum), rounding=ROUND_HALF_EVEN), 1, row.count
+                    ))
+                }
+                for row in session.scalars(query)
+            ]
+        finally:
+            session.close()
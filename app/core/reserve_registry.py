@@ -0,0 +1,175 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+class ReserveRegistry:
+    """
+    Reserve line items (GPU pools, storage clusters, ...) held in NumPy arrays
+    
+    Each item has a quantity, a USD price per unit and a weight, stored in
+    parallel float64 arrays indexed by a dense slot number. Revaluation and
+    totals are single vectorized passes, and a batch of price updates is one
+    fancy-indexed assignment, so thousands of items cost about as much as a
+    few. Removing an item moves the last item into its slot to keep the
+    arrays dense.
+    
+    Valuations are float64, so they carry about 15 significant digits; they
+    are meant for pricing assets, while DAC balances stay exact elsewhere.
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        self._reset(capacity)
+        
+    def __len__(self) -> int:
+        return len(self._ids)
+        
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._slots
+        
+    def ids(self) -> List[str]:
+        return list(self._ids)
+        
+    def upsert(
+        self,
+        item_id: str,
+        quantity: float,
+        price: float,
+        weight: float,
+        category: Optional[str] = None
+    ) -> None:
+        """
+        Adds an item or replaces its quantity, price, weight and category
+        
+        Raises:
+            ValueError: A value is negative or not finite
+        """
+        values = np.array([quantity, price, weight], dtype=float)
+        if not np.all(np.isfinite(values)) or np.any(values < 0):
+            raise ValueError(f"Invalid reserve item values for {item_id}: {quantity}, {price}, {weight}")
+            
+        slot = self._slots.get(item_id)
+        if slot is None:
+            slot = len(self._ids)
+            if slot == len(self._quantities):
+                self._grow()
+            self._slots[item_id] = slot
+            self._ids.append(item_id)
+            self._categories.append(category)
+        else:
+            self._categories[slot] = category
+        self._quantities[slot], self._prices[slot], self._weights[slot] = values
+        
+    def remove(self, item_id: str) -> bool:
+        """Removes an item; returns whether it existed"""
+        slot = self._slots.pop(item_id, None)
+        if slot is None:
+            return False
+        last = len(self._ids) - 1
+        if slot != last:
+            moved = self._ids[last]
+            self._ids[slot] = moved
+            self._categories[slot] = self._categories[last]
+            self._slots[moved] = slot
+            for array in (self._quantities, self._prices, self._weights):
+                array[slot] = array[last]
+        self._ids.pop()
+        self._categories.pop()
+        for array in (self._quantities, self._prices, self._weights):
+            array[last] = 0
+        return True
+        
+    def update_prices(self, item_ids: Sequence[str], prices: Sequence[float]) -> None:
+        """
+        Sets the prices of many items in one vectorized assignment
+        
+        Raises:
+            KeyError: An item is not registered; no price is changed
+            ValueError: The lengths differ or a price is negative or not finite
+        """
+        values = np.asarray(prices, dtype=float)
+        if len(item_ids) != len(values):
+            raise ValueError("item_ids and prices must have the same length")
+        if not np.all(np.isfinite(values)) or np.any(values < 0):
+            raise ValueError("Prices must be finite and non-negative")
+        slots = np.fromiter((self._slots[item_id] for item_id in item_ids), dtype=np.intp, count=len(values))
+        self._prices[slots] = values
+        
+    def values(self) -> np.ndarray:
+        """Returns the USD value (quantity times price) of every item, in slot order"""
+        count = len(self._ids)
+        return self._quantities[:count] * self._prices[:count]
+        
+    def weighted_value(self, item_id: str) -> float:
+        """Returns one item's value times its weight"""
+        return float(self.weighted_values([item_id])[0])
+        
+    def weighted_values(self, item_ids: Sequence[str]) -> np.ndarray:
+        """
+        Returns the value times weight of many items in one vectorized pass
+        
+        Raises:
+            KeyError: An item is not registered
+        """
+        slots = np.fromiter((self._slots[item_id] for item_id in item_ids), dtype=np.intp, count=len(item_ids))
+        return self._quantities[slots] * self._prices[slots] * self._weights[slots]
+        
+    def total_value(self) -> float:
+        return float(self.values().sum())
+        
+    def weighted_total(self) -> float:
+        """Returns the sum of value times weight over all items"""
+        count = len(self._ids)
+        return float(np.dot(self.values(), self._weights[:count]))
+        
+    def totals_by_category(self) -> Dict[Optional[str], float]:
+        """Returns the weighted value per category"""
+        count = len(self._ids)
+        if not count:
+            return {}
+        categories, inverse = np.unique(
+            np.array([category or "" for category in self._categories], dtype=object),
+            return_inverse=True
+        )
+        sums = np.bincount(inverse, weights=self.values() * self._weights[:count], minlength=len(categories))
+        return {category or None: float(total) for category, total in zip(categories, sums)}
+        
+    def items(self) -> Iterable[Dict[str, Any]]:
+        """Yields every item with its current value"""
+        values = self.values()
+        for slot, item_id in enumerate(self._ids):
+            yield {
+                "item_id": item_id,
+                "category": self._categories[slot],
+                "quantity": float(self._quantities[slot]),
+                "price": float(self._prices[slot]),
+                "weight": float(self._weights[slot]),
+                "value": float(values[slot])
+            }
+            
+    def export_state(self) -> Dict[str, Any]:
+        """Returns a serializable snapshot; floats are kept at their shortest repr"""
+        return {
+            item["item_id"]: [repr(item["quantity"]), repr(item["price"]), repr(item["weight"]), item["category"]]
+            for item in self.items()
+        }
+        
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """Replaces all items with a snapshot"""
+        self._reset(max(len(self._quantities), len(state)))
+        for item_id, (quantity, price, weight, category) in state.items():
+            self.upsert(item_id, float(quantity), float(price), float(weight), category)
+            
+    def _grow(self) -> None:
+        capacity = max(len(self._quantities) * 2, 1)
+        for name in ("_quantities", "_prices", "_weights"):
+            array = np.zeros(capacity)
+            array[:len(self._ids)] = getattr(self, name)[:len(self._ids)]
+            setattr(self, name, array)
+            
+    def _reset(self, capacity: int) -> None:
+        self._ids: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._categories: List[Optional[str]] = []
+        self._quantities = np.zeros(capacity)
+        self._prices = np.zeros(capacity)
+        self._weights = np.zeros(capacity)
@@ -1,9 +1,13 @@
 from decimal import Decimal
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 import logging
 
+from .amount import SCALE, floats_to_units, from_units, mul_ratio, positive_units, to_units
+from .merkle import MerkleSumTree
+from .reserve_registry import ReserveRegistry
+
 logger = logging.getLogger(__name__)
 
 class ReserveType(Enum):
@@ -14,17 +18,45 @@ class ReserveType(Enum):
 class ReserveManager:
     """Manages the virtual reserves backing the Digital AI Currency"""
     
-    def __init__(self):
-        self._reserves: Dict[ReserveType, Decimal] = {
-            ReserveType.COMPUTATIONAL: Decimal('0'),
-            ReserveType.STORAGE: Decimal('0'),
-            ReserveType.ENGAGEMENT: Decimal('0')
+    def __init__(
+        self,
+        state_version=None,
+        history=None,
+        weights: Optional[Dict[ReserveType, Decimal]] = None
+    ):
+        """
+        Args:
+            state_version: Optional StateVersion bumped on every reserve change
+            history: Optional ReserveHistoryStore recording every reserve change
+            weights: Weight of each reserve type, defaults to 0.4, 0.3 and 0.3
+        """
+        self._state_version = state_version
+        self._history = history
+        # Balances in 10^-18 units
+        self._reserves: Dict[ReserveType, int] = {
+            ReserveType.COMPUTATIONAL: 0,
+            ReserveType.STORAGE: 0,
+            ReserveType.ENGAGEMENT: 0
         }
-        self._reserve_weights = {
+        self._reserve_weights = weights or {
             ReserveType.COMPUTATIONAL: Decimal('0.4'),
             ReserveType.STORAGE: Decimal('0.3'),
             ReserveType.ENGAGEMENT: Decimal('0.3')
         }
+        self._weight_units = {
+            reserve_type: to_units(weight) for reserve_type, weight in self._reserve_weights.items()
+        }
+        # Sum of balance times weight, both in units, so in 10^-36 units; kept
+        # up to date by every change so that reads are O(1)
+        self._weighted_total: int = 0
+        # Individually valued line items, the weighted value of each in units,
+        # and their total in the same 10^-36 units as _weighted_total
+        self._registry = ReserveRegistry()
+        self._item_units: Dict[str, int] = {}
+        self._registry_weighted: int = 0
+        # Weighted value of each reserve type and line item, for proof of reserves
+        self._merkle_tree = MerkleSumTree(capacity=16)
+        self._prove_types(list(ReserveType))
         
     async def add_to_reserves(self, reserve_type: ReserveType, amount: Decimal) -> bool:
         """
@@ -37,11 +69,12 @@ class ReserveManager:
         Returns:
             bool: Success status
         """
-        if amount <= 0:
+        units = positive_units(amount)
+        if units is None:
             logger.error(f"Invalid amount for reserve addition: {amount}")
             return False
             
-        self._reserves[reserve_type] += amount
+        await self._apply({reserve_type: units})
         logger.info(f"Added {amount} to {reserve_type.value} reserves")
         return True
         
@@ -56,29 +89,163 @@ class ReserveManager:
         Returns:
             bool: Success status
         """
-        if amount <= 0 or amount > self._reserves[reserve_type]:
+        units = positive_units(amount)
+        if units is None or units > self._reserves[reserve_type]:
             logger.error(f"Invalid amount for reserve removal: {amount}")
             return False
             
-        self._reserves[reserve_type] -= amount
+        await self._apply({reserve_type: -units})
         logger.info(f"Removed {amount} from {reserve_type.value} reserves")
         return True
         
+    async def apply_adjustments(self, adjustments: List[Tuple[ReserveType, Decimal]]) -> bool:
+        """
+        Adds to and removes from several reserve types as one change
+        
+        Deltas for the same type are netted. The batch is rejected as a whole
+        if any amount is not representable or any type would go negative;
+        otherwise every level changes before anything else can read them,
+        with one version bump and one history snapshot.
+        
+        Args:
+            adjustments: (reserve type, signed amount) pairs; negative
+                amounts remove from the reserve
+                
+        Returns:
+            bool: Success status
+        """
+        deltas: Dict[ReserveType, int] = {}
+        for reserve_type, amount in adjustments:
+            try:
+                units = to_units(amount)
+            except (ValueError, ArithmeticError):
+                logger.error(f"Invalid amount for reserve adjustment: {amount}")
+                return False
+            deltas[reserve_type] = deltas.get(reserve_type, 0) + units
+            
+        for reserve_type, delta in deltas.items():
+            if self._reserves[reserve_type] + delta < 0:
+                logger.error(f"Reserve adjustment would leave {reserve_type.value} reserves negative")
+                return False
+                
+        await self._apply({reserve_type: delta for reserve_type, delta in deltas.items() if delta})
+        logger.info(f"Applied {len(adjustments)} reserve adjustments")
+        return True
+        
     async def get_total_reserves(self) -> Decimal:
         """Calculates the total value of all reserves in USD equivalent"""
-        total = Decimal('0')
-        for reserve_type in ReserveType:
-            weighted_value = self._reserves[reserve_type] * self._reserve_weights[reserve_type]
-            total += weighted_value
-        return total
+        return from_units(mul_ratio(self.weighted_total(), 1, SCALE))
+        
+    def weighted_total(self) -> int:
+        """Returns the weighted reserve total, including line items, in 10^-36 units"""
+        return self._weighted_total + self._registry_weighted
+        
+    async def upsert_reserve_item(
+        self,
+        item_id: str,
+        quantity: float,
+        price: float,
+        weight: float,
+        category: Optional[str] = None
+    ) -> bool:
+        """
+        Adds or replaces a reserve line item valued at quantity times price in USD
+        
+        Returns:
+            bool: Success status
+        """
+        try:
+            self._registry.upsert(item_id, quantity, price, weight, category)
+        except ValueError as e:
+            logger.error(f"Invalid reserve item: {str(e)}")
+            return False
+        self._revalue([item_id])
+        logger.info(f"Updated reserve item {item_id}")
+        return True
+        
+    async def remove_reserve_item(self, item_id: str) -> bool:
+        """Removes a reserve line item"""
+        if not self._registry.remove(item_id):
+            logger.error(f"Unknown reserve item: {item_id}")
+            return False
+        self._revalue([item_id])
+        logger.info(f"Removed reserve item {item_id}")
+        return True
+        
+    async def update_prices(self, prices: Dict[str, float]) -> bool:
+        """
+        Reprices many line items in one vectorized update; all or nothing
+        
+        Returns:
+            bool: Success status
+        """
+        try:
+            self._registry.update_prices(list(prices), list(prices.values()))
+        except (KeyError, ValueError) as e:
+            logger.error(f"Invalid price update: {str(e)}")
+            return False
+        self._revalue(prices)
+        logger.info(f"Repriced {len(prices)} reserve items")
+        return True
+        
+    @property
+    def merkle_tree(self) -> MerkleSumTree:
+        """Merkle sum tree over the weighted value of each reserve type and line item"""
+        return self._merkle_tree
+        
+    async def get_reserve_items(self) -> List[Dict[str, Any]]:
+        """Returns every line item with its current USD value"""
+        return list(self._registry.items())
+        
+    async def get_history(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        reserve_type: Optional[ReserveType] = None,
+        resolution: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Returns recorded reserve levels, empty when no history store is configured"""
+        if not self._history:
+            return []
+        return await self._history.history(
+            start_time,
+            end_time,
+            reserve_type.value if reserve_type else None,
+            resolution
+        )
         
     async def get_reserve_status(self) -> Dict[str, Decimal]:
         """Returns the current status of all reserves"""
         return {
-            reserve_type.value: amount 
-            for reserve_type, amount in self._reserves.items()
+            reserve_type.value: from_units(units)
+            for reserve_type, units in self._reserves.items()
         }
         
+    def export_state(self) -> Dict[str, Any]:
+        """Returns a serializable snapshot of the reserve balances and line items"""
+        state = {
+            reserve_type.value: str(from_units(units))
+            for reserve_type, units in self._reserves.items()
+        }
+        if len(self._registry):
+            state["items"] = self._registry.export_state()
+        return state
+        
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """Restores reserve balances from a snapshot"""
+        for reserve_type in ReserveType:
+            self._reserves[reserve_type] = to_units(Decimal(state.get(reserve_type.value, '0')))
+        self._weighted_total = sum(
+            self._reserves[reserve_type] * self._weight_units[reserve_type]
+            for reserve_type in ReserveType
+        )
+        self._registry.load_state(state.get("items", {}))
+        self._item_units = {}
+        self._registry_weighted = 0
+        self._merkle_tree.load([])
+        self._prove_types(list(ReserveType))
+        self._revalue(self._registry.ids())
+        
     async def validate_reserves(self) -> bool:
         """
         Validates that reserves meet minimum requirements
@@ -89,3 +256,44 @@ class ReserveManager:
         total_reserves = await self.get_total_reserves()
         # Implement specific validation logic here
         return total_reserves > 0
+        
+    def _revalue(self, item_ids: Iterable[str]) -> None:
+        """Moves the line item total by the change in value of the given items"""
+        item_ids = list(item_ids)
+        present = [item_id for item_id in item_ids if item_id in self._registry]
+        # One vectorized valuation and one conversion for the whole set; each
+        # float64 value is taken at its exact binary value and rounded once
+        units = dict(zip(present, floats_to_units(self._registry.weighted_values(present).tolist())))
+        previous = sum(self._item_units.pop(item_id, 0) for item_id in item_ids)
+        self._item_units.update(units)
+        self._registry_weighted += (sum(units.values()) - previous) * SCALE
+        # A removed item stays in the tree with no value
+        self._merkle_tree.update_many((f"item:{item_id}", units.get(item_id, 0)) for item_id in item_ids)
+        self._changed()
+        
+    def _prove_types(self, reserve_types: List[ReserveType]) -> None:
+        """Updates the proof-of-reserves leaves of reserve types, valued at their weighted amount"""
+        for reserve_type in reserve_types:
+            weighted = self._reserves[reserve_type] * self._weight_units[reserve_type]
+            self._merkle_tree.update(f"type:{reserve_type.value}", mul_ratio(weighted, 1, SCALE))
+            
+    async def _apply(self, deltas: Dict[ReserveType, int]) -> None:
+        """Applies validated unit deltas; nothing awaits until all levels are updated"""
+        if not deltas:
+            return
+        for reserve_type, delta in deltas.items():
+            self._reserves[reserve_type] += delta
+            self._weighted_total += delta * self._weight_units[reserve_type]
+        self._changed()
+        self._prove_types(list(deltas))
+        await self._record_history(list(deltas))
+        
+    def _changed(self) -> None:
+        if self._state_version:
+            self._state_version.bump()
+            
+    async def _record_history(self, reserve_types: List[ReserveType]) -> None:
+        if self._history:
+            await self._history.record({
+                reserve_type.value: self._reserves[reserve_type] for reserve_type in reserve_types
+            })
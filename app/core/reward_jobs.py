@@ -0,0 +1,291 @@
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+import uuid
+
+from .amount import from_units
+from .distribution import DistributionManager, RewardType
+
+logger = logging.getLogger(__name__)
+
+# Per-line parsing dominates a payout; these skip json.loads' input sniffing
+# and the Enum constructor
+_decode = json.JSONDecoder().decode
+_REWARD_TYPES = {reward_type.value: reward_type for reward_type in RewardType}
+
+class JobStatus(Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class RewardDistributionJob:
+    """
+    Pays out the rewards listed in a JSON Lines file, in checkpointed chunks
+    
+    Each line is {"user_id": ..., "reward_type": ..., "metadata": {...}}.
+    A chunk of lines is read and parsed off the event loop, its rewards are
+    calculated together and credited in one pass, and then a checkpoint with
+    the byte offset reached is written atomically. Run again with the same
+    checkpoint, the job resumes after the last completed chunk; once the
+    file is done, running it again pays nothing.
+    
+    Tiers are read at the start of each chunk and updated at its end, so a
+    user listed twice in one chunk is paid both times at the earlier tier.
+    Unparseable lines and invalid metadata are counted as failed and skipped.
+    
+    With checkpoint_state, each checkpoint also holds the distribution state,
+    which is restored on resume so balances always match the offset.
+    Without it, as for the live manager in the app, a crash between a chunk
+    and its checkpoint pays that chunk again on resume.
+    """
+    
+    def __init__(
+        self,
+        distribution: DistributionManager,
+        input_path: str,
+        checkpoint_path: Optional[str] = None,
+        chunk_size: int = 10000,
+        checkpoint_state: bool = False,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        """
+        Args:
+            distribution: Manager whose balances and tiers are updated
+            input_path: JSON Lines file of rewards
+            checkpoint_path: Where progress is saved; defaults to the input
+                path with ".checkpoint" appended
+            chunk_size: Lines per chunk
+            checkpoint_state: Whether checkpoints include the distribution state
+            progress: Optional callback given progress() after every chunk
+        """
+        self.job_id = uuid.uuid4().hex
+        self._distribution = distribution
+        self._input_path = Path(input_path)
+        self._checkpoint_path = Path(checkpoint_path or f"{input_path}.checkpoint")
+        self._chunk_size = chunk_size
+        self._checkpoint_state = checkpoint_state
+        self._progress = progress
+        self._file = None
+        
+        self.status = JobStatus.PENDING
+        self.error: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._total_bytes = 0
+        # Resumed from the checkpoint
+        self._offset = 0
+        self._lines = 0
+        self._paid = 0
+        self._failed = 0
+        self._amount = 0  # In 10^-18 units
+        
+    @property
+    def input_path(self) -> Path:
+        return self._input_path
+        
+    def progress(self) -> Dict[str, Any]:
+        """Returns the job's status and counters"""
+        return {
+            "job_id": self.job_id,
+            "input_file": self._input_path.name,
+            "status": self.status.value,
+            "lines": self._lines,
+            "paid": self._paid,
+            "failed": self._failed,
+            "amount": from_units(self._amount),
+            "bytes_read": self._offset,
+            "total_bytes": self._total_bytes,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+        
+    async def run(self) -> Dict[str, Any]:
+        """
+        Runs the job to the end of the file, resuming from its checkpoint
+        
+        Returns:
+            Dict[str, Any]: Final progress; a failure is reported in its
+                status and error rather than raised
+        """
+        self.status = JobStatus.RUNNING
+        self.started_at = datetime.utcnow()
+        try:
+            checkpoint = await asyncio.to_thread(self._open)
+            if checkpoint and "state" in checkpoint:
+                self._distribution.load_state(checkpoint["state"])
+                
+            while True:
+                records, failed, lines, size = await asyncio.to_thread(self._read_chunk)
+                if not lines:
+                    break
+                    
+                # Nothing is awaited from here until the checkpoint is taken
+                credits: Dict[str, int] = {}
+                rewards = await self._distribution.calculate_rewards(records)
+                for (user_id, reward_type, _), units in zip(records, rewards):
+                    if units is None or units < 0:
+                        failed += 1
+                        logger.error(f"Invalid {reward_type.value} reward metadata for user {user_id}")
+                        continue
+                    credits[user_id] = credits.get(user_id, 0) + units
+                    self._amount += units
+                    self._paid += 1
+                await self._distribution.credit_rewards(credits)
+                self._failed += failed
+                self._lines += lines
+                self._offset += size
+                checkpoint = self._checkpoint()
+                
+                await asyncio.to_thread(self._write_checkpoint, checkpoint)
+                logger.info(
+                    f"Reward job {self.job_id}: {self._lines} lines, {self._paid} paid, "
+                    f"{self._failed} failed"
+                )
+                if self._progress:
+                    self._progress(self.progress())
+                    
+            self.status = JobStatus.COMPLETED
+        except asyncio.CancelledError:
+            self.status = JobStatus.CANCELLED
+            raise
+        except Exception as e:
+            self.status = JobStatus.FAILED
+            self.error = str(e)
+            logger.error(f"Reward job {self.job_id} failed: {str(e)}")
+        finally:
+            self.finished_at = datetime.utcnow()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        return self.progress()
+        
+    def _open(self) -> Optional[Dict[str, Any]]:
+        """Loads the checkpoint, if any, and opens the input at its offset"""
+        checkpoint = None
+        if self._checkpoint_path.exists():
+            with open(self._checkpoint_path) as f:
+                checkpoint = json.load(f)
+            if checkpoint["input"] != self._input_path.name:
+                raise ValueError(f"Checkpoint {self._checkpoint_path} belongs to {checkpoint['input']}")
+            self._offset = checkpoint["offset"]
+            self._lines = checkpoint["lines"]
+            self._paid = checkpoint["paid"]
+            self._failed = checkpoint["failed"]
+            self._amount = int(checkpoint["amount"])
+            logger.info(f"Resuming reward job for {self._input_path.name} at line {self._lines}")
+            
+        self._file = open(self._input_path, "rb")
+        self._total_bytes = os.fstat(self._file.fileno()).st_size
+        self._file.seek(self._offset)
+        return checkpoint
+        
+    def _read_chunk(self) -> Tuple[List[Tuple[str, RewardType, Dict[str, Any]]], int, int, int]:
+        """
+        Reads and parses up to chunk_size lines
+        
+        Returns:
+            Tuple: Parsed rewards, lines that failed to parse, lines read and bytes read
+        """
+        records: List[Tuple[str, RewardType, Dict[str, Any]]] = []
+        failed = lines = size = 0
+        for _ in range(self._chunk_size):
+            line = self._file.readline()
+            if not line:
+                break
+            lines += 1
+            size += len(line)
+            if not line.strip():
+                continue
+            try:
+                record = _decode(line.decode())
+                metadata = record.get("metadata") or {}
+                if not isinstance(metadata, dict):
+                    raise TypeError("metadata must be an object")
+                records.append((str(record["user_id"]), _REWARD_TYPES[record["reward_type"]], metadata))
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                failed += 1
+                logger.error(f"Skipping line {self._lines + lines} of {self._input_path.name}: {str(e)}")
+        return records, failed, lines, size
+        
+    def _checkpoint(self) -> Dict[str, Any]:
+        checkpoint = {
+            "input": self._input_path.name,
+            "offset": self._offset,
+            "lines": self._lines,
+            "paid": self._paid,
+            "failed": self._failed,
+            "amount": str(self._amount)
+        }
+        if self._checkpoint_state:
+            checkpoint["state"] = self._distribution.export_state()
+        return checkpoint
+        
+    def _write_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        tmp_path = self._checkpoint_path.with_name(self._checkpoint_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._checkpoint_path)
+
+class RewardJobRunner:
+    """
+    Runs reward distribution jobs in the background for the admin API
+    
+    Input files are taken from one directory, and each file's checkpoint
+    sits next to it, so submitting a file again resumes it, and a finished file pays nothing
+    twice.
+    """
+    
+    def __init__(self, distribution: DistributionManager, directory: str, chunk_size: int = 10000):
+        self._distribution = distribution
+        self._directory = Path(directory)
+        self._chunk_size = chunk_size
+        self._jobs: Dict[str, RewardDistributionJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        
+    def submit(self, input_file: str, chunk_size: Optional[int] = None) -> RewardDistributionJob:
+        """
+        Starts a job for a file in the job directory
+        
+        Raises:
+            ValueError: The file is outside the directory, missing, or already being paid
+        """
+        directory = self._directory.resolve()
+        path = (directory / input_file).resolve()
+        if path.parent != directory or not path.is_file():
+            raise ValueError(f"No such reward file: {input_file}")
+        for job_id, task in self._tasks.items():
+            if not task.done() and self._jobs[job_id].input_path == path:
+                raise ValueError(f"A job for {input_file} is already running")
+                
+        job = RewardDistributionJob(
+            self._distribution,
+            str(path),
+            chunk_size=chunk_size or self._chunk_size
+        )
+        self._jobs[job.job_id] = job
+        self._tasks[job.job_id] = asyncio.create_task(job.run())
+        logger.info(f"Started reward job {job.job_id} for {input_file}")
+        return job
+        
+    def get(self, job_id: str) -> Optional[RewardDistributionJob]:
+        return self._jobs.get(job_id)
+        
+    def jobs(self) -> List[RewardDistributionJob]:
+        return list(self._jobs.values())
+        
+    async def stop(self) -> None:
+        """Cancels running jobs; they resume from their checkpoints when submitted again"""
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
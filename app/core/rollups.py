@@ -0,0 +1,240 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+EPOCH = datetime(1970, 1, 1)
+
+# Rollup resolutions in bucket seconds, finest first. "raw" stands for the
+# individual samples and counts as one-second buckets when sizing a range.
+RESOLUTIONS: Dict[str, int] = {"raw": 1, "minute": 60, "hour": 3600, "day": 86400}
+ROLLUP_RESOLUTIONS = [resolution for resolution in RESOLUTIONS if resolution != "raw"]
+
+def _seconds(timestamp: datetime) -> int:
+    return int((timestamp - EPOCH).total_seconds())
+
+def bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    """Returns the start of the bucket holding a naive UTC timestamp"""
+    seconds = RESOLUTIONS[resolution]
+    offset = _seconds(timestamp) // seconds * seconds
+    return EPOCH + timedelta(seconds=offset)
+
+def choose_resolution(
+    start_time: datetime,
+    end_time: datetime,
+    max_points: int,
+    retention: Dict[str, Optional[float]],
+    now: datetime
+) -> str:
+    """
+    Picks the finest resolution that still covers a range in at most max_points buckets
+    
+    Args:
+        start_time: Start of the range
+        end_time: End of the range
+        max_points: Most buckets a response should hold
+        retention: Seconds each resolution is kept for, None for forever
+        now: Current time, to tell which resolutions still hold start_time
+        
+    Returns:
+        str: A key of RESOLUTIONS; the coarsest one if none fits
+    """
+    span = (end_time - start_time).total_seconds()
+    for resolution, seconds in RESOLUTIONS.items():
+        kept = retention.get(resolution)
+        if kept is not None and start_time < now - timedelta(seconds=kept):
+            continue
+        if span / seconds <= max_points:
+            return resolution
+    return resolution
+
+class Aggregate:
+    """Count, sum, min, max and last of a run of integer samples"""
+    
+    __slots__ = ("count", "sum", "min", "max", "last")
+    
+    def __init__(self):
+        self.count = 0
+        self.sum = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+        self.last: Optional[int] = None
+        
+    def add(self, value: int) -> None:
+        if not self.count:
+            self.min = self.max = value
+        elif value < self.min:
+            self.min = value
+        elif value > self.max:
+            self.max = value
+        self.count += 1
+        self.sum += value
+        self.last = value
+        
+    def merge(self, other: "Aggregate") -> None:
+        """Folds in the samples of a later run"""
+        if not other.count:
+            return
+        if not self.count:
+            self.min, self.max = other.min, other.max
+        else:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        self.count += other.count
+        self.sum += other.sum
+        self.last = other.last
+
+class RollupStore:
+    """
+    In-memory minute, hour and day buckets, updated as samples arrive
+    
+    Each bucket maps a key to an Aggregate of the values added under it, or
+    to the set of members seen, such as active users. A range is answered
+    from the coarsest buckets that tile it: whole days in the middle, whole
+    hours either side and minutes at the edges, so a query over months
+    reads a few hundred buckets rather than every sample. Edges are rounded
+    out to the finest resolution still retained at the start of the range.
+    Buckets older than their resolution's retention are dropped as newer
+    ones open.
+    """
+    
+    def __init__(self, retention: Optional[Dict[str, Optional[float]]] = None):
+        """
+        Args:
+            retention: Seconds to keep each of ROLLUP_RESOLUTIONS; missing or
+                None keeps it forever
+        """
+        self._retention = retention or {}
+        # Bucket start in seconds since EPOCH to the bucket, per resolution,
+        # with the starts also kept sorted for range lookups
+        self._buckets: Dict[str, Dict[int, Dict[str, Any]]] = {
+            resolution: {} for resolution in ROLLUP_RESOLUTIONS
+        }
+        self._starts: Dict[str, List[int]] = {resolution: [] for resolution in ROLLUP_RESOLUTIONS}
+        
+    def add(self, timestamp: datetime, key: str, value: int) -> None:
+        """Adds a value to the key's aggregate in every bucket holding timestamp"""
+        seconds = _seconds(timestamp)
+        for resolution in ROLLUP_RESOLUTIONS:
+            bucket = self._bucket(resolution, seconds)
+            aggregate = bucket.get(key)
+            if aggregate is None:
+                aggregate = bucket[key] = Aggregate()
+            aggregate.add(value)
+            
+    def add_member(self, timestamp: datetime, key: str, member: str) -> None:
+        """Adds a member to the key's set in every bucket holding timestamp"""
+        seconds = _seconds(timestamp)
+        for resolution in ROLLUP_RESOLUTIONS:
+            bucket = self._bucket(resolution, seconds)
+            members = bucket.get(key)
+            if members is None:
+                members = bucket[key] = set()
+            members.add(member)
+            
+    def tiles(
+        self,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        now: Optional[datetime] = None
+    ) -> List[Tuple[datetime, str, Dict[str, Any]]]:
+        """
+        Returns the coarsest buckets that together cover a range
+        
+        Args:
+            start_time: Start of the range, or None for the earliest bucket
+            end_time: End of the range, or None for the latest bucket
+            now: Current time, to tell which resolutions still hold start_time
+            
+        Returns:
+            List[Tuple[datetime, str, Dict[str, Any]]]: Start, resolution
+                and contents of each bucket, in time order
+        """
+        days = self._starts["day"]
+        if not days:
+            return []
+        low = days[0] if start_time is None else _seconds(start_time)
+        high = days[-1] + RESOLUTIONS["day"] if end_time is None else _seconds(end_time)
+        
+        cutoff = _seconds(now or datetime.utcnow())
+        finest = len(ROLLUP_RESOLUTIONS) - 1
+        for level, resolution in enumerate(ROLLUP_RESOLUTIONS):
+            kept = self._retention.get(resolution)
+            if kept is None or low >= cutoff - kept:
+                finest = level
+                break
+        size = RESOLUTIONS[ROLLUP_RESOLUTIONS[finest]]
+        low -= low % size
+        # Include the bucket holding end_time
+        high = high - high % size + size if end_time is not None else high
+        if low >= high:
+            return []
+            
+        tiles: List[Tuple[datetime, str, Dict[str, Any]]] = []
+        self._tile(low, high, len(ROLLUP_RESOLUTIONS) - 1, finest, tiles)
+        return tiles
+        
+    def buckets(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        resolution: str
+    ) -> List[Tuple[datetime, Dict[str, Any]]]:
+        """Returns the buckets of one resolution from the one holding start_time to end_time"""
+        start = _seconds(start_time)
+        starts = self._starts[resolution]
+        buckets = self._buckets[resolution]
+        first = bisect_left(starts, start - start % RESOLUTIONS[resolution])
+        last = bisect_right(starts, _seconds(end_time))
+        return [
+            (EPOCH + timedelta(seconds=bucket), buckets[bucket])
+            for bucket in starts[first:last]
+        ]
+        
+    def _tile(
+        self,
+        low: int,
+        high: int,
+        level: int,
+        finest: int,
+        tiles: List[Tuple[datetime, str, Dict[str, Any]]]
+    ) -> None:
+        """Appends the buckets covering [low, high), using this level for whole buckets"""
+        resolution = ROLLUP_RESOLUTIONS[level]
+        size = RESOLUTIONS[resolution]
+        if level == finest:
+            first, last = low, high
+        else:
+            first, last = -(-low // size) * size, high // size * size
+            if first >= last:
+                self._tile(low, high, level - 1, finest, tiles)
+                return
+        if low < first:
+            self._tile(low, first, level - 1, finest, tiles)
+        starts = self._starts[resolution]
+        buckets = self._buckets[resolution]
+        for bucket in starts[bisect_left(starts, first):bisect_left(starts, last)]:
+            tiles.append((EPOCH + timedelta(seconds=bucket), resolution, buckets[bucket]))
+        if last < high:
+            self._tile(last, high, level - 1, finest, tiles)
+            
+    def _bucket(self, resolution: str, seconds: int) -> Dict[str, Any]:
+        """Returns the bucket holding a time, opening it and pruning expired ones if new"""
+        start = seconds - seconds % RESOLUTIONS[resolution]
+        buckets = self._buckets[resolution]
+        bucket = buckets.get(start)
+        if bucket is not None:
+            return bucket
+        bucket = buckets[start] = {}
+        starts = self._starts[resolution]
+        if not starts or start > starts[-1]:
+            starts.append(start)
+        else:
+            insort(starts, start)
+            
+        kept = self._retention.get(resolution)
+        if kept is not None:
+            expired = bisect_left(starts, starts[-1] - kept)
+            for old in starts[:expired]:
+                del buckets[old]
+            del starts[:expired]
+        return buckets.get(start, {})
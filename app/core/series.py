@@ -0,0 +1,134 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from .rollups import Aggregate
+
+_INFINITY = float("inf")
+
+class TimeSeries:
+    """
+    Append-only series of timestamped integer values with range aggregates
+    
+    Count, sum, min, max and last over the whole series are kept as running
+    totals, so reading them is O(1). For a time range, the first and last
+    positions are found by bisecting the timestamps; sums come from prefix
+    sums and min/max from two segment trees over the values, so a range
+    costs O(log n) whatever its length. Appending updates the prefix sums
+    and walks up each tree until a node is unchanged, and capacity doubles
+    when the leaves run out.
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        self._timestamps: List[datetime] = []
+        self._prefix: List[int] = [0]  # Sum of the first i values
+        self._last: Optional[int] = None
+        self._reset(capacity)
+        
+    def __len__(self) -> int:
+        return len(self._timestamps)
+        
+    def append(self, timestamp: datetime, value: int) -> None:
+        """Adds a value; one stamped earlier than the last, e.g. after a clock step, is placed at the last"""
+        if self._timestamps and timestamp < self._timestamps[-1]:
+            timestamp = self._timestamps[-1]
+        index = len(self._timestamps)
+        if index == self._capacity:
+            self._grow()
+        self._timestamps.append(timestamp)
+        self._prefix.append(self._prefix[-1] + value)
+        self._last = value
+        
+        position = index + self._capacity
+        while position and self._mins[position] > value:
+            self._mins[position] = value
+            position >>= 1
+        position = index + self._capacity
+        while position and self._maxes[position] < value:
+            self._maxes[position] = value
+            position >>= 1
+            
+    def summary(
+        self,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> Optional[Aggregate]:
+        """
+        Aggregates the values stamped within a range
+        
+        Args:
+            start_time: Inclusive start, or None for the beginning
+            end_time: Inclusive end, or None for the latest value
+            
+        Returns:
+            Optional[Aggregate]: The values' aggregate, or None if no value
+                falls in the range
+        """
+        if start_time is None and end_time is None:
+            if not self._timestamps:
+                return None
+            return self._aggregate(
+                len(self._timestamps),
+                self._prefix[-1],
+                self._mins[1],
+                self._maxes[1],
+                self._last
+            )
+            
+        low = 0 if start_time is None else bisect_left(self._timestamps, start_time)
+        high = len(self._timestamps) if end_time is None else bisect_right(self._timestamps, end_time)
+        if low >= high:
+            return None
+        minimum, maximum = self._range_extremes(low, high)
+        return self._aggregate(
+            high - low,
+            self._prefix[high] - self._prefix[low],
+            minimum,
+            maximum,
+            self._prefix[high] - self._prefix[high - 1]
+        )
+        
+    def _range_extremes(self, low: int, high: int) -> Tuple[int, int]:
+        """Min and max of the values at positions [low, high)"""
+        minimum, maximum = _INFINITY, -_INFINITY
+        low += self._capacity
+        high += self._capacity
+        while low < high:
+            if low & 1:
+                minimum = min(minimum, self._mins[low])
+                maximum = max(maximum, self._maxes[low])
+                low += 1
+            if high & 1:
+                high -= 1
+                minimum = min(minimum, self._mins[high])
+                maximum = max(maximum, self._maxes[high])
+            low >>= 1
+            high >>= 1
+        return minimum, maximum
+        
+    @staticmethod
+    def _aggregate(count: int, total: int, minimum: int, maximum: int, last: int) -> Aggregate:
+        aggregate = Aggregate()
+        aggregate.count, aggregate.sum, aggregate.min, aggregate.max, aggregate.last = (
+            count, total, minimum, maximum, last
+        )
+        return aggregate
+        
+    def _grow(self) -> None:
+        """Doubles the leaf capacity and rebuilds both trees from the values"""
+        count = len(self._timestamps)
+        values = [self._prefix[i + 1] - self._prefix[i] for i in range(count)]
+        self._reset(self._capacity * 2)
+        capacity = self._capacity
+        self._mins[capacity:capacity + count] = values
+        self._maxes[capacity:capacity + count] = values
+        for position in range(capacity - 1, 0, -1):
+            self._mins[position] = min(self._mins[2 * position], self._mins[2 * position + 1])
+            self._maxes[position] = max(self._maxes[2 * position], self._maxes[2 * position + 1])
+            
+    def _reset(self, capacity: int) -> None:
+        self._capacity = capacity
+        # Heap-ordered trees: node i has children 2i and 2i + 1, leaves start
+        # at capacity, and unused leaves hold the identity of each operation
+        self._mins: List[float] = [_INFINITY] * (2 * capacity)
+        self._maxes: List[float] = [-_INFINITY] * (2 * capacity)
@@ -0,0 +1,171 @@
+from contextlib import contextmanager
+from decimal import Decimal
+from typing import ContextManager, Dict, Iterator, Optional, Tuple
+import logging
+import sqlite3
+
+from .amount import from_units, to_units
+from .ledger import ShardedLedger
+
+logger = logging.getLogger(__name__)
+
+class SharedStateStore:
+    """
+    Supply counters and balances in a SQLite WAL file shared by worker processes
+    
+    Every uvicorn worker on a host opens the same file. Read-modify-write
+    sequences run inside atomic(), a BEGIN IMMEDIATE transaction, so writers
+    in different processes take turns while readers are never blocked.
+    Amounts are stored as decimal strings and added in integer 10^-18 units,
+    which keeps them exact however many digits they have.
+    
+    Calls are synchronous; each is a single indexed row access on a local
+    file, short enough to run on the event loop.
+    """
+    
+    def __init__(self, path: str, timeout: float = 5.0):
+        """
+        Args:
+            path: SQLite database file shared by the workers
+            timeout: Seconds to wait for another process's write transaction
+        """
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS balances (address TEXT PRIMARY KEY, amount TEXT NOT NULL)"
+        )
+        self._depth = 0
+        
+    @contextmanager
+    def atomic(self) -> Iterator[None]:
+        """Runs the block as one write transaction; nested blocks join the outer one"""
+        if self._depth:
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+            return
+            
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._depth = 1
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        else:
+            self._conn.execute("COMMIT")
+        finally:
+            self._depth = 0
+            
+    def get_counter(self, name: str) -> Decimal:
+        row = self._conn.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()
+        return Decimal(row[0]) if row else Decimal('0')
+        
+    def get_counters(self, prefix: str) -> Dict[str, Decimal]:
+        """Returns every counter whose name starts with prefix"""
+        rows = self._conn.execute(
+            "SELECT name, value FROM counters WHERE substr(name, 1, ?) = ?", (len(prefix), prefix)
+        ).fetchall()
+        return {name: Decimal(value) for name, value in rows}
+        
+    def set_counter(self, name: str, value: Decimal) -> None:
+        self._conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+            (name, str(value))
+        )
+        
+    def add_to_counter(
+        self,
+        name: str,
+        delta: Decimal,
+        minimum: Optional[Decimal] = None,
+        maximum: Optional[Decimal] = None
+    ) -> bool:
+        """
+        Adds a signed amount to a counter
+        
+        Args:
+            name: Counter name
+            delta: Amount to add, with at most 18 decimal places
+            minimum: If given, the change is refused when the result would fall below it
+            maximum: If given, the change is refused when the result would exceed it
+            
+        Returns:
+            bool: Whether the change was applied
+        """
+        with self.atomic():
+            value = to_units(self.get_counter(name)) + to_units(delta)
+            if minimum is not None and value < to_units(minimum):
+                return False
+            if maximum is not None and value > to_units(maximum):
+                return False
+            self.set_counter(name, from_units(value))
+        return True
+        
+    def get_balance(self, address: str) -> Decimal:
+        row = self._conn.execute("SELECT amount FROM balances WHERE address = ?", (address,)).fetchone()
+        return Decimal(row[0]) if row else Decimal('0')
+        
+    def adjust_balance(self, address: str, delta: Decimal) -> None:
+        with self.atomic():
+            self._conn.execute(
+                "INSERT INTO balances (address, amount) VALUES (?, ?) "
+                "ON CONFLICT (address) DO UPDATE SET amount = excluded.amount",
+                (address, str(from_units(to_units(self.get_balance(address)) + to_units(delta))))
+            )
+            
+    def balances(self) -> Iterator[Tuple[str, Decimal]]:
+        for address, amount in self._conn.execute("SELECT address, amount FROM balances").fetchall():
+            yield address, Decimal(amount)
+            
+    def replace_balances(self, balances: Dict[str, Decimal]) -> None:
+        with self.atomic():
+            self._conn.execute("DELETE FROM balances")
+            self._conn.executemany(
+                "INSERT INTO balances (address, amount) VALUES (?, ?)",
+                [(address, str(amount)) for address, amount in balances.items()]
+            )
+            
+    def data_version(self) -> int:
+        """Returns a number that changes whenever another connection commits to the file"""
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+        
+    def close(self) -> None:
+        self._conn.close()
+
+class SharedLedger(ShardedLedger):
+    """
+    ShardedLedger whose balances live in a SharedStateStore
+    
+    Shard locks still order work within a process; atomic() makes each
+    check-and-apply a store transaction, which orders it across processes.
+    """
+    
+    def __init__(self, store: SharedStateStore, num_shards: int = 256):
+        super().__init__(num_shards)
+        self._store = store
+        
+    def get_units(self, address: str) -> int:
+        return to_units(self._store.get_balance(address))
+        
+    def atomic(self) -> ContextManager[None]:
+        return self._store.atomic()
+        
+    def apply_adjustment(self, address: str, delta: int) -> None:
+        self._store.adjust_balance(address, from_units(delta))
+        
+    def items(self) -> Iterator[Tuple[str, int]]:
+        for address, balance in self._store.balances():
+            yield address, to_units(balance)
+            
+    def load_state(self, state: Dict) -> None:
+        self._store.replace_balances({
+            address: Decimal(balance) for address, balance in state["balances"].items()
+        })
@@ -0,0 +1,189 @@
+from typing import Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import asyncio
+import hashlib
+import json
+
+from fastapi import Response
+
+class StateVersion:
+    """
+    Counter bumped on every supply or reserve change
+    
+    Waiters are plain futures created on the running loop when they wait,
+    so one instance can be built before the event loop starts.
+    """
+    
+    def __init__(self):
+        self._value = 0
+        self._waiters: List[asyncio.Future] = []
+        
+    @property
+    def value(self) -> int:
+        return self._value
+        
+    def bump(self) -> None:
+        self._value += 1
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(self._value)
+                
+    async def wait(self, since: int, timeout: float) -> bool:
+        """
+        Waits until the version moves past since
+        
+        Returns:
+            bool: Whether it changed before the timeout
+        """
+        if self._value != since:
+            return True
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+class Snapshot(NamedTuple):
+    body: bytes
+    etag: str
+
+class SnapshotCache:
+    """
+    Pre-serialized response bodies, rebuilt only when the state version changes
+    
+    Each named snapshot is rebuilt on the first read after a change and
+    served as-is until the next one. The ETag is a hash of the body without
+    its volatile fields, such as the build timestamp, so it only changes
+    when the state does and stays meaningful across restarts, when the
+    version starts over.
+    
+    In shared-state mode other worker processes change the supply without
+    bumping this process's version; external_version (the shared store's
+    data version) is then part of the cache key, and long polls re-check it
+    every poll_interval seconds.
+    """
+    
+    def __init__(
+        self,
+        version: StateVersion,
+        external_version: Optional[Callable[[], int]] = None,
+        poll_interval: float = 0.5,
+        volatile_fields: Iterable[str] = ("timestamp",)
+    ):
+        """
+        Args:
+            version: StateVersion bumped on every change
+            external_version: Optional data version of state changed by other processes
+            poll_interval: Seconds between re-checks of external_version in a long poll
+            volatile_fields: Top-level fields of JSON object bodies left out of the ETag
+        """
+        self._version = version
+        self._external_version = external_version
+        self._poll_interval = poll_interval
+        self._volatile_fields = frozenset(volatile_fields)
+        self._snapshots: Dict[str, Tuple[Tuple[int, int], Snapshot]] = {}
+        
+    async def get(self, name: str, build: Callable[[], Awaitable[bytes]]) -> Snapshot:
+        """
+        Returns the current snapshot, building it if the state changed since the last one
+        
+        Args:
+            name: Snapshot name, one per endpoint
+            build: Returns the serialized response body
+        """
+        key = self._key()
+        cached = self._snapshots.get(name)
+        if cached and cached[0] == key:
+            return cached[1]
+            
+        body = await build()
+        snapshot = Snapshot(body, self._etag(body))
+        self._snapshots[name] = (key, snapshot)
+        return snapshot
+        
+    async def poll(
+        self,
+        name: str,
+        build: Callable[[], Awaitable[bytes]],
+        if_none_match: Optional[str] = None,
+        wait: Optional[float] = None
+    ) -> Snapshot:
+        """
+        Returns the snapshot for a request, long polling if the client asked to wait
+        
+        Args:
+            name: Snapshot name, one per endpoint
+            build: Returns the serialized response body
+            if_none_match: The request's If-None-Match header
+            wait: Seconds to wait for a change when the client already has the current snapshot
+        """
+        snapshot = await self.get(name, build)
+        if wait and etag_matches(if_none_match, snapshot.etag):
+            snapshot = await self.wait_for_change(name, build, snapshot.etag, wait)
+        return snapshot
+        
+    async def wait_for_change(
+        self,
+        name: str,
+        build: Callable[[], Awaitable[bytes]],
+        etag: str,
+        timeout: float
+    ) -> Snapshot:
+        """
+        Long poll: waits up to timeout seconds for a snapshot whose ETag differs from etag
+        
+        Returns:
+            Snapshot: The new snapshot, or the unchanged one on timeout
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            version = self._version.value
+            snapshot = await self.get(name, build)
+            remaining = deadline - loop.time()
+            if snapshot.etag != etag or remaining <= 0:
+                return snapshot
+            if self._external_version:
+                remaining = min(remaining, self._poll_interval)
+            await self._version.wait(version, remaining)
+            
+    def _key(self) -> Tuple[int, int]:
+        external = self._external_version() if self._external_version else 0
+        return self._version.value, external
+        
+    def _etag(self, body: bytes) -> str:
+        """Hashes a body, leaving out the volatile fields of a JSON object"""
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        if isinstance(payload, dict):
+            body = json.dumps(
+                {field: value for field, value in payload.items() if field not in self._volatile_fields},
+                sort_keys=True
+            ).encode()
+        return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Checks an If-None-Match header against an ETag, using weak comparison"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return any(
+        (candidate[2:] if candidate.startswith("W/") else candidate) == etag
+        for candidate in candidates
+    )
+
+def snapshot_response(snapshot: Snapshot, if_none_match: Optional[str]) -> Response:
+    """Serves a snapshot as JSON, or as 304 Not Modified if the client already has it"""
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(snapshot.body, media_type="application/json", headers=headers)
@@ -0,0 +1,244 @@
+from decimal import Decimal
+from typing import Optional
+import logging
+import secrets
+
+from .analytics import AnalyticsManager
+from .balances import BalanceBook
+from .compact_store import CompactTransactionStore
+from .currency import CurrencyManager
+from .distribution import DistributionManager
+from .expiry import ExpiryManager
+from .governance import GovernanceManager
+from .growth import SupplyGrowthLimiter
+from .idempotency import IdempotencyCache, InMemoryIdempotencyBackend, SQLiteIdempotencyBackend
+from .ledger import ShardedLedger
+from .ledger_log import LedgerLog
+from .merkle import MerkleSumTree
+from .persistence import DurabilityMode, LedgerPersistence
+from .reserve_history import ReserveHistoryStore
+from .reserves import ReserveManager, ReserveType
+from .reward_jobs import RewardJobRunner
+from .reward_queue import RewardQueue
+from .shared_state import SharedLedger, SharedStateStore
+from .snapshots import SnapshotCache, StateVersion
+from .transactions import TransactionManager, TransactionType
+from ..models.base import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+class StateRegistry:
+    """
+    Holds the one instance of each manager for the life of the app
+    
+    Built from settings once per process; start() and stop() run from the
+    application lifespan. With SHARED_STATE_ENABLED, the supply counter and
+    balances live in a SQLite file shared by all worker processes on the host.
+    """
+    
+    def __init__(self, settings):
+        self._settings = settings
+        if settings.SHARED_STATE_ENABLED and settings.LEDGER_LOG_ENABLED:
+            # Each worker would append to the same segment files
+            raise ValueError("LEDGER_LOG_ENABLED cannot be combined with SHARED_STATE_ENABLED")
+        if settings.SHARED_STATE_ENABLED and settings.DAC_EXPIRY_ENABLED:
+            # Each worker would only see the lots credited through it
+            raise ValueError("DAC_EXPIRY_ENABLED cannot be combined with SHARED_STATE_ENABLED")
+        if settings.DAC_EXPIRY_ENABLED and not settings.LEDGER_LOG_ENABLED:
+            # Lots are rebuilt from the log on restart and would otherwise be lost
+            raise ValueError("DAC_EXPIRY_ENABLED requires LEDGER_LOG_ENABLED")
+        if settings.SHARED_STATE_ENABLED and settings.RESERVE_RATIO_ENFORCED:
+            # Reserves are per worker, so each would cap the shared supply by its own reserves
+            raise ValueError("RESERVE_RATIO_ENFORCED cannot be combined with SHARED_STATE_ENABLED")
+            
+        self.shared_store: Optional[SharedStateStore] = None
+        if settings.SHARED_STATE_ENABLED:
+            self.shared_store = SharedStateStore(settings.SHARED_STATE_PATH)
+            
+        self.persistence: Optional[LedgerPersistence] = None
+        if settings.LEDGER_PERSISTENCE_ENABLED:
+            self.persistence = LedgerPersistence(
+                SessionLocal,
+                mode=DurabilityMode(settings.LEDGER_DURABILITY_MODE),
+                batch_size=settings.LEDGER_FLUSH_BATCH_SIZE,
+                flush_interval=settings.LEDGER_FLUSH_INTERVAL_SECONDS,
+                max_attempts=settings.LEDGER_FLUSH_MAX_ATTEMPTS,
+                dead_letter_path=settings.LEDGER_DEAD_LETTER_PATH
+            )
+            
+        self.ledger_log: Optional[LedgerLog] = None
+        if settings.LEDGER_LOG_ENABLED:
+            self.ledger_log = LedgerLog(
+                settings.LEDGER_LOG_DIR,
+                segment_size=settings.LEDGER_SEGMENT_SIZE_BYTES,
+                group_commit_size=settings.LEDGER_GROUP_COMMIT_SIZE,
+                group_commit_interval=settings.LEDGER_GROUP_COMMIT_INTERVAL_SECONDS,
+                snapshot_interval=settings.LEDGER_SNAPSHOT_INTERVAL
+            )
+            
+        if self.shared_store:
+            ledger = SharedLedger(self.shared_store, num_shards=settings.BALANCE_NUM_SHARDS)
+        else:
+            ledger = ShardedLedger(num_shards=settings.BALANCE_NUM_SHARDS)
+        # Other workers' balance changes would never reach this process's tree.
+        # Leaf salts only need to stay secret, not stable, as the tree is rebuilt on start.
+        merkle_tree = None
+        if settings.BALANCE_MERKLE_PROOFS_ENABLED and not self.shared_store:
+            merkle_tree = MerkleSumTree(salt_key=secrets.token_bytes(32))
+        self.balances = BalanceBook(
+            ledger,
+            session_factory=SessionLocal if settings.BALANCE_WRITE_THROUGH_ENABLED else None,
+            merkle_tree=merkle_tree
+        )
+        
+        # Bumped on every supply or reserve change; keys the cached responses
+        self.state_version = StateVersion()
+        self.snapshots = SnapshotCache(
+            self.state_version,
+            external_version=self.shared_store.data_version if self.shared_store else None
+        )
+        self.reserve_history: Optional[ReserveHistoryStore] = None
+        if settings.RESERVE_HISTORY_ENABLED:
+            self.reserve_history = ReserveHistoryStore(
+                SessionLocal,
+                retention={
+                    "raw": settings.RESERVE_HISTORY_RAW_RETENTION_SECONDS,
+                    "minute": settings.RESERVE_HISTORY_MINUTE_RETENTION_SECONDS,
+                    "hour": settings.RESERVE_HISTORY_HOUR_RETENTION_SECONDS,
+                    "day": settings.RESERVE_HISTORY_DAY_RETENTION_SECONDS
+                },
+                max_points=settings.RESERVE_HISTORY_MAX_POINTS,
+                max_raw_rows=settings.RESERVE_HISTORY_MAX_RAW_ROWS
+            )
+        self.reserves = ReserveManager(
+            state_version=self.state_version,
+            history=self.reserve_history,
+            weights={
+                ReserveType.COMPUTATIONAL: Decimal(str(settings.COMPUTATIONAL_RESERVE_WEIGHT)),
+                ReserveType.STORAGE: Decimal(str(settings.STORAGE_RESERVE_WEIGHT)),
+                ReserveType.ENGAGEMENT: Decimal(str(settings.ENGAGEMENT_RESERVE_WEIGHT))
+            }
+        )
+        growth_limiter = None
+        if settings.MAX_SUPPLY_GROWTH_RATE is not None:
+            growth_limiter = SupplyGrowthLimiter(
+                settings.MAX_SUPPLY_GROWTH_RATE,
+                window_seconds=settings.SUPPLY_GROWTH_WINDOW_SECONDS,
+                num_buckets=settings.SUPPLY_GROWTH_BUCKETS,
+                min_allowance=settings.SUPPLY_GROWTH_MIN_ALLOWANCE,
+                store=self.shared_store
+            )
+        self.currency = CurrencyManager(
+            shared_store=self.shared_store,
+            # A ratio of one worker's reserves to the shared supply would mean nothing
+            reserves=self.reserves if not self.shared_store else None,
+            min_reserve_ratio=(
+                Decimal(str(settings.MIN_RESERVE_RATIO)) if settings.RESERVE_RATIO_ENFORCED else None
+            ),
+            growth_limiter=growth_limiter,
+            state_version=self.state_version
+        )
+        self.expiry: Optional[ExpiryManager] = None
+        if settings.DAC_EXPIRY_ENABLED:
+            self.expiry = ExpiryManager(
+                self.currency,
+                # Rewards are credited to DistributionManager balances, not
+                # by transactions, so only issued DAC has lots
+                {TransactionType.ISSUANCE: settings.DAC_EXPIRY_ISSUANCE_SECONDS},
+                tick_seconds=settings.DAC_EXPIRY_TICK_SECONDS,
+                batch_size=settings.DAC_EXPIRY_BATCH_SIZE
+            )
+        self.transactions = TransactionManager(
+            persistence=self.persistence,
+            ledger_log=self.ledger_log,
+            store=CompactTransactionStore() if settings.TRANSACTION_STORE_COMPACT else None,
+            balances=self.balances,
+            pending_ttl=settings.PENDING_TRANSACTION_TTL_SECONDS,
+            expiry=self.expiry
+        )
+        self.distribution = DistributionManager()
+        self.reward_queue = RewardQueue(
+            self.distribution,
+            flush_interval=settings.REWARD_QUEUE_FLUSH_INTERVAL_SECONDS,
+            max_pending=settings.REWARD_QUEUE_MAX_PENDING
+        )
+        self.reward_jobs = RewardJobRunner(
+            self.distribution,
+            settings.REWARD_JOB_DIR,
+            chunk_size=settings.REWARD_JOB_CHUNK_SIZE
+        )
+        self.analytics = AnalyticsManager(
+            retention={
+                "minute": settings.ANALYTICS_MINUTE_RETENTION_SECONDS,
+                "hour": settings.ANALYTICS_HOUR_RETENTION_SECONDS,
+                "day": settings.ANALYTICS_DAY_RETENTION_SECONDS
+            },
+            max_points=settings.ANALYTICS_MAX_POINTS
+        )
+        self.governance = GovernanceManager()
+        
+        if settings.IDEMPOTENCY_BACKEND == "sqlite":
+            backend = SQLiteIdempotencyBackend(
+                settings.IDEMPOTENCY_SQLITE_PATH,
+                max_entries=settings.IDEMPOTENCY_MAX_ENTRIES
+            )
+        else:
+            backend = InMemoryIdempotencyBackend(max_entries=settings.IDEMPOTENCY_MAX_ENTRIES)
+        self.idempotency = IdempotencyCache(
+            backend,
+            ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+            lease=settings.IDEMPOTENCY_LEASE_SECONDS
+        )
+        
+    async def start(self) -> None:
+        """Recovers state from the ledger log and starts background services"""
+        if self.ledger_log:
+            self.ledger_log.register_state("currency", self.currency)
+            self.ledger_log.register_state("balances", self.balances)
+            self.ledger_log.register_state("reserves", self.reserves)
+            self.ledger_log.register_state("distribution", self.distribution)
+            if self.expiry:
+                self.ledger_log.register_state("expiry", self.expiry)
+            await self.ledger_log.recover(self.transactions)
+            await self.ledger_log.start()
+        if self.persistence:
+            await self.persistence.start()
+        await self.transactions.start(self._settings.PENDING_SWEEP_INTERVAL_SECONDS)
+        await self.reward_queue.start()
+        if self.expiry:
+            await self.expiry.start(self.transactions)
+        logger.info("Started application state")
+        
+    async def stop(self) -> None:
+        """
+        Stops background services and flushes buffered state
+        
+        Every component is stopped even if an earlier one fails, so that the
+        ledger log still takes its final snapshot and files are closed; the
+        first error is raised once all have been stopped.
+        """
+        steps = []
+        if self.expiry:
+            steps.append(("DAC expiry", self.expiry.stop))
+        steps += [
+            ("reward jobs", self.reward_jobs.stop),
+            ("reward queue", self.reward_queue.stop),
+            ("transactions", self.transactions.stop)
+        ]
+        if self.persistence:
+            steps.append(("ledger persistence", self.persistence.stop))
+        if self.ledger_log:
+            steps.append(("ledger log", self.ledger_log.close))
+            
+        error: Optional[Exception] = None
+        for name, step in steps:
+            try:
+                await step()
+            except Exception as e:
+                logger.error(f"Failed to stop {name}: {str(e)}")
+                error = error or e
+        if self.shared_store:
+            self.shared_store.close()
+        if error:
+            raise error
+        logger.info("Stopped application state")
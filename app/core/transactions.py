@@ -1,13 +1,31 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from array import array
 from pydantic import BaseModel
+import asyncio
+import bisect
+import heapq
+import time
 import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+def to_epoch_micros(timestamp: datetime) -> int:
+    """Converts a naive UTC datetime to integer microseconds since the epoch"""
+    return (timestamp - EPOCH) // MICROSECOND
+
+@asynccontextmanager
+async def _unlocked():
+    yield
+
 class TransactionType(Enum):
     ISSUANCE = "issuance"
     TRANSFER = "transfer"
@@ -30,12 +48,132 @@ class Transaction(BaseModel):
     status: TransactionStatus
     metadata: Dict[str, str]
 
+class BatchResult(BaseModel):
+    index: int
+    transaction: Optional[Transaction] = None
+    error: Optional[str] = None
+
+class TimeIndex:
+    """
+    Transaction references kept in (timestamp, reference) order for O(log N + k) range scans
+    
+    Ties on the timestamp, e.g. a batch executed with one shared timestamp,
+    are ordered by reference, so a cursor inside them is found by bisection
+    rather than a scan. With transaction IDs as references this is the
+    (timestamp, id) order the persisted ledger is paged in.
+    """
+    
+    def __init__(self, compact: bool = False):
+        """
+        Args:
+            compact: Keep keys as epoch microseconds and references as row
+                numbers in typed arrays, for use with CompactTransactionStore
+        """
+        self._compact = compact
+        self.keys = array('q') if compact else []
+        self.ids = array('q') if compact else []
+        
+    def __len__(self) -> int:
+        return len(self.ids)
+        
+    def insert(self, timestamp: datetime, ref: Union[str, int]) -> None:
+        # Transactions usually execute in creation order, so this is an append
+        key = self._key(timestamp)
+        if not self.keys or (self.keys[-1], self.ids[-1]) < (key, ref):
+            self.keys.append(key)
+            self.ids.append(ref)
+            return
+        first_tie = bisect.bisect_left(self.keys, key)
+        position = self._bisect_ref(ref, first_tie, bisect.bisect_right(self.keys, key, first_tie))
+        self.keys.insert(position, key)
+        self.ids.insert(position, ref)
+        
+    def range(
+        self,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, Union[str, int]]] = None
+    ) -> Tuple[int, int]:
+        """
+        Returns the [lo, hi) positions of entries within a time range
+        
+        Args:
+            start_time: Inclusive lower bound
+            end_time: Inclusive upper bound
+            after: (timestamp, reference) of an entry to resume after
+        """
+        lo = bisect.bisect_left(self.keys, self._key(start_time)) if start_time else 0
+        hi = bisect.bisect_right(self.keys, self._key(end_time)) if end_time else len(self.keys)
+        if after:
+            timestamp, ref = after
+            key = self._key(timestamp)
+            first_tie = bisect.bisect_left(self.keys, key)
+            resume = bisect.bisect_right(self.keys, key, first_tie)
+            if ref is not None:
+                # Past the cursor, or where it would be if it has since gone
+                resume = self._bisect_ref(ref, first_tie, resume)
+                if resume < len(self.ids) and self.ids[resume] == ref:
+                    resume += 1
+            lo = max(lo, resume)
+        return lo, hi
+        
+    def _key(self, timestamp: datetime):
+        return to_epoch_micros(timestamp) if self._compact else timestamp
+        
+    def _bisect_ref(self, ref: Union[str, int], lo: int, hi: int) -> int:
+        """Returns the first position in [lo, hi), a run of equal keys, whose reference is not below ref"""
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if self.ids[middle] < ref:
+                lo = middle + 1
+            else:
+                hi = middle
+        return lo
+
 class TransactionManager:
     """Manages DAC transactions and maintains transaction history"""
     
-    def __init__(self):
-        self._transactions: Dict[str, Transaction] = {}
+    def __init__(
+        self,
+        persistence=None,
+        ledger_log=None,
+        store=None,
+        balances=None,
+        pending_ttl: Optional[float] = None,
+        expiry=None
+    ):
+        """
+        Args:
+            persistence: Optional LedgerPersistence that executed transactions are written to
+            ledger_log: Optional LedgerLog that executed transactions are appended to
+            store: Optional CompactTransactionStore holding executed transactions
+                instead of a dict of models
+            balances: Optional BalanceBook that executed transactions are applied to;
+                transactions that would overdraw an address are rejected
+            pending_ttl: Seconds a created transaction may stay pending before
+                expire_pending() marks it failed; None keeps it indefinitely
+            expiry: Optional ExpiryManager that executed transactions are recorded
+                in, to track expiring lots of DAC
+        """
+        self._persistence = persistence
+        self._expiry = expiry
+        self._balances = balances
+        self._ledger_log = ledger_log
+        self._compact = store is not None
+        self._transactions = store if self._compact else {}
         self._pending_transactions: Dict[str, Transaction] = {}
+        # Secondary indexes over executed transactions, referencing entries in
+        # self._transactions by ID, or by row in a compact store
+        self._address_index: Dict[str, TimeIndex] = defaultdict(lambda: TimeIndex(self._compact))
+        self._time_index = TimeIndex(self._compact)
+        
+        # Min-heap of (deadline, transaction ID). Entries for transactions
+        # executed before their deadline are dropped when they reach the top.
+        self._pending_ttl = pending_ttl
+        self._deadlines: List[Tuple[float, str]] = []
+        self._expired_count = 0
+        self._sweeper: Optional[asyncio.Task] = None
+        self._sweeper_stopping: Optional[asyncio.Event] = None
         
     async def create_transaction(
         self,
@@ -58,6 +196,8 @@ class TransactionManager:
         )
         
         self._pending_transactions[transaction.id] = transaction
+        if self._pending_ttl is not None:
+            heapq.heappush(self._deadlines, (time.monotonic() + self._pending_ttl, transaction.id))
         logger.info(f"Created transaction {transaction.id} of type {type.value}")
         return transaction
         
@@ -67,20 +207,173 @@ class TransactionManager:
             logger.error(f"Transaction {transaction_id} not found")
             return False
             
-        transaction = self._pending_transactions[transaction_id]
+        # Taken out of the pending set while executing, so neither a second
+        # execute nor the expiry sweep can act on it concurrently
+        transaction = self._pending_transactions.pop(transaction_id)
         
         try:
-            # Implement transaction-specific logic here
-            transaction.status = TransactionStatus.COMPLETED
-            self._transactions[transaction_id] = transaction
-            del self._pending_transactions[transaction_id]
+            async with self._lock_balances(transaction):
+                if self._balances:
+                    error = self._balances.reserve([transaction])[0]
+                    if error:
+                        transaction.status = TransactionStatus.FAILED
+                        logger.error(f"Rejected transaction {transaction_id}: {error}")
+                        return False
+                transaction.status = TransactionStatus.COMPLETED
+                await self._commit([transaction])
+            self._store(transaction)
             logger.info(f"Executed transaction {transaction_id}")
             return True
         except Exception as e:
             transaction.status = TransactionStatus.FAILED
+            self._pending_transactions[transaction_id] = transaction
             logger.error(f"Failed to execute transaction {transaction_id}: {str(e)}")
             return False
             
+    async def create_and_execute_batch(
+        self,
+        sender: str,
+        transfers: List[Any],
+        type: TransactionType = TransactionType.TRANSFER
+    ) -> List[BatchResult]:
+        """
+        Validates and executes a batch of transfers from a single sender
+        
+        Every item is validated in one pass before anything is applied, then
+        the accepted items are committed together with a shared timestamp.
+        Rejected items, including those the sender's balance cannot cover,
+        do not prevent the rest of the batch from executing.
+        
+        Args:
+            sender: Address the transfers originate from
+            transfers: Items exposing amount, recipient and metadata (e.g. TransferRequest)
+            type: Transaction type recorded for every item
+            
+        Returns:
+            List[BatchResult]: One result per item, in input order
+        """
+        results: List[Optional[BatchResult]] = [None] * len(transfers)
+        candidates: List[Tuple[int, Transaction]] = []
+        accepted: List[Transaction] = []
+        timestamp = datetime.utcnow()
+        
+        for index, item in enumerate(transfers):
+            error = self._validate_transfer(item.amount, item.recipient)
+            if error:
+                results[index] = BatchResult(index=index, error=error)
+                continue
+                
+            # Fields were validated above, so skip per-item model validation
+            transaction = Transaction.model_construct(
+                id=str(uuid.uuid4()),
+                type=type,
+                amount=item.amount,
+                sender=sender,
+                recipient=item.recipient,
+                timestamp=timestamp,
+                status=TransactionStatus.COMPLETED,
+                metadata=item.metadata or {}
+            )
+            candidates.append((index, transaction))
+            
+        errors = await self.execute_batch([transaction for _, transaction in candidates])
+        for (index, transaction), error in zip(candidates, errors):
+            if error:
+                results[index] = BatchResult(index=index, error=error)
+            else:
+                accepted.append(transaction)
+                results[index] = BatchResult.model_construct(index=index, transaction=transaction, error=None)
+                
+        logger.info(
+            f"Executed batch of {len(accepted)} {type.value} transactions from {sender} "
+            f"({len(results) - len(accepted)} rejected)"
+        )
+        return results
+        
+    async def execute_batch(self, transactions: List[Transaction]) -> List[Optional[str]]:
+        """
+        Executes already built transactions together, possibly from several senders
+        
+        Balances are checked in order and the accepted transactions are
+        committed in one write; the rest are marked failed. Used for batches
+        the system issues itself, such as expiry burns.
+        
+        Returns:
+            List[Optional[str]]: One error per transaction, None where executed
+        """
+        async with self._lock_balances(*transactions):
+            if self._balances:
+                errors = self._balances.reserve(transactions)
+            else:
+                errors = [None] * len(transactions)
+            accepted = []
+            for transaction, error in zip(transactions, errors):
+                if error:
+                    transaction.status = TransactionStatus.FAILED
+                else:
+                    transaction.status = TransactionStatus.COMPLETED
+                    accepted.append(transaction)
+            await self._commit(accepted)
+        # In index order, so that each insert lands at the end
+        for transaction in sorted(accepted, key=lambda transaction: (transaction.timestamp, transaction.id)):
+            self._store(transaction)
+        return errors
+        
+    def expire_pending(self, now: Optional[float] = None) -> int:
+        """
+        Marks pending transactions past their deadline as failed and drops them
+        
+        Only heap entries whose deadline has passed are visited, so the cost
+        is proportional to the number of expired entries, not the pending set.
+        
+        Args:
+            now: time.monotonic() value to expire against, defaults to the current time
+            
+        Returns:
+            int: Number of transactions expired
+        """
+        if now is None:
+            now = time.monotonic()
+        expired = 0
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, transaction_id = heapq.heappop(self._deadlines)
+            transaction = self._pending_transactions.pop(transaction_id, None)
+            if transaction is None:
+                continue
+            transaction.status = TransactionStatus.FAILED
+            expired += 1
+            
+        if expired:
+            self._expired_count += expired
+            logger.info(f"Expired {expired} pending transactions")
+        return expired
+        
+    async def start(self, sweep_interval: float = 5.0) -> None:
+        """Starts the background sweep that expires pending transactions"""
+        if self._pending_ttl is not None and self._sweeper is None:
+            self._sweeper_stopping = asyncio.Event()
+            self._sweeper = asyncio.create_task(self._sweep(sweep_interval))
+            logger.info(
+                f"Started pending transaction sweep (ttl {self._pending_ttl}s, "
+                f"interval {sweep_interval}s)"
+            )
+            
+    async def stop(self) -> None:
+        """Stops the background sweep"""
+        if self._sweeper is not None:
+            self._sweeper_stopping.set()
+            await self._sweeper
+            self._sweeper = None
+            
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending_transactions)
+        
+    @property
+    def expired_count(self) -> int:
+        """Total pending transactions expired since startup"""
+        return self._expired_count
+        
     async def get_transaction(self, transaction_id: str) -> Optional[Transaction]:
         """Retrieves a transaction by ID"""
         return (
@@ -95,27 +388,127 @@ class TransactionManager:
         status: Optional[TransactionStatus] = None
     ) -> List[Transaction]:
         """Retrieves transactions for a specific address"""
-        transactions = []
-        for tx in self._transactions.values():
-            if (tx.sender == address or tx.recipient == address):
-                if type and tx.type != type:
-                    continue
-                if status and tx.status != status:
-                    continue
-                transactions.append(tx)
-        return transactions
+        return list(self.iter_transactions(address=address, type=type, status=status))
         
     async def get_transaction_history(
         self,
         start_time: Optional[datetime] = None,
-        end_time: Optional[datetime] = None
+        end_time: Optional[datetime] = None,
+        type: Optional[TransactionType] = None,
+        status: Optional[TransactionStatus] = None
     ) -> List[Transaction]:
         """Retrieves transaction history within a time range"""
-        transactions = []
-        for tx in self._transactions.values():
-            if start_time and tx.timestamp < start_time:
-                continue
-            if end_time and tx.timestamp > end_time:
-                continue
-            transactions.append(tx)
-        return sorted(transactions, key=lambda x: x.timestamp)
+        return list(self.iter_transactions(start_time, end_time, type=type, status=status))
+        
+    def iter_transactions(
+        self,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        address: Optional[str] = None,
+        type: Optional[TransactionType] = None,
+        status: Optional[TransactionStatus] = None,
+        after: Optional[Tuple[datetime, str]] = None,
+        chunk_size: int = 1000
+    ) -> Iterator[Transaction]:
+        """
+        Yields executed transactions in timestamp order
+        
+        The time range and address are resolved on the indexes, so only
+        matching entries are visited. Entries are read in chunks and the
+        position is re-resolved from the last entry between chunks, which
+        keeps memory constant and tolerates inserts while iterating.
+        
+        Args:
+            start_time: Inclusive lower bound on the timestamp
+            end_time: Inclusive upper bound on the timestamp
+            address: Only transactions sent or received by this address
+            type: Only transactions of this type
+            status: Only transactions with this status
+            after: (timestamp, id) of a previously returned transaction to resume after
+            chunk_size: Number of index entries read at a time
+        """
+        if after and self._compact:
+            after = (after[0], self._transactions.row_of(after[1]))
+            
+        if address is not None:
+            if address not in self._address_index:
+                return
+            index = self._address_index[address]
+        else:
+            index = self._time_index
+            
+        while True:
+            lo, hi = index.range(start_time, end_time, after)
+            chunk = index.ids[lo:min(hi, lo + chunk_size)]
+            if not chunk:
+                return
+            for ref in chunk:
+                tx = self._transactions[ref]
+                if type and tx.type != type:
+                    continue
+                if status and tx.status != status:
+                    continue
+                yield tx
+            after = (self._transactions[chunk[-1]].timestamp, chunk[-1])
+            
+    async def _sweep(self, interval: float) -> None:
+        while not self._sweeper_stopping.is_set():
+            try:
+                await asyncio.wait_for(self._sweeper_stopping.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            self.expire_pending()
+            
+    async def _commit(self, transactions: List[Transaction]) -> None:
+        """
+        Records transactions whose balance effects were reserved
+        
+        The caller must hold the balance locks of the transactions. If
+        recording fails the balance effects are rolled back.
+        """
+        if not transactions:
+            return
+        # Before the ledger log, so that a snapshot it takes includes the lots
+        lot_changes = self._expiry.record(transactions) if self._expiry else None
+        try:
+            if self._ledger_log:
+                await self._ledger_log.record_many(transactions)
+            if self._persistence:
+                await self._persistence.record_many(transactions)
+        except Exception:
+            if self._balances:
+                self._balances.revert(transactions)
+            if lot_changes:
+                self._expiry.undo(lot_changes)
+            raise
+        if self._balances:
+            await self._balances.write_through(transactions)
+            
+    def _lock_balances(self, *transactions: Transaction):
+        """Holds the balance locks of the transactions, if balances are tracked"""
+        return self._balances.locked(*transactions) if self._balances else _unlocked()
+        
+    def restore_transaction(self, transaction: Transaction) -> None:
+        """Adds an already executed transaction, e.g. one replayed from the ledger log"""
+        self._store(transaction)
+        
+    def _validate_transfer(self, amount: Decimal, recipient: str) -> Optional[str]:
+        """Returns a validation error for a transfer, or None if it is valid"""
+        if not isinstance(amount, Decimal) or not amount.is_finite() or amount <= 0:
+            return f"Invalid transfer amount: {amount}"
+        if not recipient:
+            return "Missing recipient"
+        return None
+        
+    def _store(self, transaction: Transaction) -> None:
+        """Stores an executed transaction and adds it to the address and time indexes"""
+        if self._compact:
+            ref = self._transactions.add(transaction)
+        else:
+            self._transactions[transaction.id] = transaction
+            ref = transaction.id
+            
+        self._address_index[transaction.recipient].insert(transaction.timestamp, ref)
+        if transaction.sender and transaction.sender != transaction.recipient:
+            self._address_index[transaction.sender].insert(transaction.timestamp, ref)
+        self._time_index.insert(transaction.timestamp, ref)
@@ -1,15 +1,25 @@
-from typing import Generator
+from typing import Generator, Optional
+from functools import lru_cache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from datetime import datetime
 
 from .core.config import get_settings
+from .core.state import StateRegistry
 from .core.currency import CurrencyManager
 from .core.transactions import TransactionManager
 from .core.distribution import DistributionManager
 from .core.analytics import AnalyticsManager
 from .core.governance import GovernanceManager
+from .core.reserves import ReserveManager
+from .core.persistence import LedgerPersistence
+from .core.ledger_log import LedgerLog
+from .core.balances import BalanceBook
+from .core.idempotency import IdempotencyCache
+from .core.snapshots import SnapshotCache
+from .core.reward_jobs import RewardJobRunner
+from .core.reward_queue import RewardQueue
 from .models.base import SessionLocal
 
 settings = get_settings()
@@ -25,21 +35,50 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+# Process-wide application state, started and stopped by the app lifespan
+@lru_cache()
+def get_state() -> StateRegistry:
+    return StateRegistry(settings)
+
 # Core managers as dependencies
 def get_currency_manager() -> CurrencyManager:
-    return CurrencyManager()
+    return get_state().currency
+
+def get_ledger_persistence() -> Optional[LedgerPersistence]:
+    return get_state().persistence
+
+def get_ledger_log() -> Optional[LedgerLog]:
+    return get_state().ledger_log
+
+def get_balance_book() -> BalanceBook:
+    return get_state().balances
+
+def get_idempotency_cache() -> IdempotencyCache:
+    return get_state().idempotency
+
+def get_snapshot_cache() -> SnapshotCache:
+    return get_state().snapshots
 
 def get_transaction_manager() -> TransactionManager:
-    return TransactionManager()
+    return get_state().transactions
+
+def get_reserve_manager() -> ReserveManager:
+    return get_state().reserves
 
 def get_distribution_manager() -> DistributionManager:
-    return DistributionManager()
+    return get_state().distribution
+
+def get_reward_queue() -> RewardQueue:
+    return get_state().reward_queue
+
+def get_reward_job_runner() -> RewardJobRunner:
+    return get_state().reward_jobs
 
 def get_analytics_manager() -> AnalyticsManager:
-    return AnalyticsManager()
+    return get_state().analytics
 
 def get_governance_manager() -> GovernanceManager:
-    return GovernanceManager()
+    return get_state().governance
 
 # Authentication dependency
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> str:
@@ -60,3 +99,11 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> str:
         return username
     except JWTError:
         raise credentials_exception
+
+async def get_admin_user(current_user: str = Depends(get_current_user)) -> str:
+    if current_user not in settings.ADMIN_USERS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
@@ -1,12 +1,14 @@
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Optional
 import logging
 import os
 
-from .routers import currency, reserves, governance, analytics, auth
+from .routers import currency, reserves, governance, analytics, auth, admin
 from .core.config import get_settings
+from .deps import get_state
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,11 +17,20 @@ logger = logging.getLogger(__name__)
 # Load settings
 settings = get_settings()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Builds the shared manager state on startup and flushes it on shutdown"""
+    state = get_state()
+    await state.start()
+    yield
+    await state.stop()
+
 # Create FastAPI app
 app = FastAPI(
     title="Digital AI Currency Reserve (DACR)",
     description="API for managing the Digital AI Currency (DAC) system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -57,6 +68,11 @@ app.include_router(
     prefix="/api/v1/analytics",
     tags=["analytics"]
 )
+app.include_router(
+    admin.router,
+    prefix="/api/v1/admin",
+    tags=["admin"]
+)
 
 @app.get("/")
 async def root():
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, Enum as SQLEnum, JSON
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, Enum as SQLEnum, JSON, Index
 from sqlalchemy.sql import func
 from datetime import datetime
 
@@ -15,7 +15,14 @@ class Transaction(Base):
     recipient = Column(String, nullable=False)
     timestamp = Column(DateTime, default=func.now())
     status = Column(SQLEnum(TransactionStatus))
-    metadata = Column(JSON, nullable=True)
+    # "metadata" is reserved on declarative classes, so map the column under another name
+    meta = Column("metadata", JSON, nullable=True)
+
+    __table_args__ = (
+        Index("ix_transactions_timestamp_id", "timestamp", "id"),
+        Index("ix_transactions_sender_timestamp", "sender", "timestamp"),
+        Index("ix_transactions_recipient_timestamp", "recipient", "timestamp"),
+    )
 
 class Balance(Base):
     __tablename__ = "balances"
@@ -31,3 +38,25 @@ class Reserve(Base):
     type = Column(String, nullable=False)
     amount = Column(Numeric(precision=36, scale=18), nullable=False)
     timestamp = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        Index("ix_reserves_type_timestamp", "type", "timestamp"),
+    )
+
+class ReserveRollup(Base):
+    """Min, max, sum, count and last reserve level per type and time bucket"""
+    __tablename__ = "reserve_rollups"
+
+    type = Column(String, primary_key=True)
+    resolution = Column(String, primary_key=True)  # "minute", "hour" or "day"
+    bucket_start = Column(DateTime, primary_key=True)
+    min = Column(Numeric(precision=36, scale=18), nullable=False)
+    max = Column(Numeric(precision=36, scale=18), nullable=False)
+    # Sum of the samples, wider than one level
+    sum = Column(Numeric(precision=48, scale=18), nullable=False)
+    count = Column(Integer, nullable=False)
+    last = Column(Numeric(precision=36, scale=18), nullable=False)
+
+    __table_args__ = (
+        Index("ix_reserve_rollups_resolution_bucket", "resolution", "bucket_start"),
+    )
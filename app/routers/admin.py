@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+
+from ..core.distribution import DistributionManager
+from ..core.reward_jobs import RewardJobRunner
+from ..core.reward_queue import RewardQueue
+from ..deps import get_admin_user, get_distribution_manager, get_reward_job_runner, get_reward_queue
+from ..schemas.admin import QueuedReward, RewardJobRequest, RewardJobStatus, RewardRequest
+
+router = APIRouter()
+
+@router.post("/rewards", response_model=QueuedReward, status_code=202)
+async def queue_reward(
+    request: RewardRequest,
+    distribution: DistributionManager = Depends(get_distribution_manager),
+    queue: RewardQueue = Depends(get_reward_queue),
+    admin_user: str = Depends(get_admin_user)
+):
+    """
+    Reward a user for one activity
+    
+    The reward is calculated at the user's current tier and queued; the
+    reward queue's next flush credits it together with the user's other
+    queued rewards.
+    """
+    try:
+        amount = await distribution.calculate_reward(request.user_id, request.reward_type, request.metadata)
+    except (ArithmeticError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Invalid {request.reward_type.value} reward metadata")
+    if amount < 0 or not await queue.submit(request.user_id, amount):
+        raise HTTPException(status_code=400, detail="Invalid reward amount")
+    return {"user_id": request.user_id, "amount": amount}
+
+@router.post("/rewards/jobs", response_model=RewardJobStatus, status_code=202)
+async def start_reward_job(
+    request: RewardJobRequest,
+    runner: RewardJobRunner = Depends(get_reward_job_runner),
+    admin_user: str = Depends(get_admin_user)
+):
+    """
+    Start paying out the rewards listed in a file
+    
+    The file must be in REWARD_JOB_DIR. A file that was partly paid resumes
+    from its checkpoint, and a finished one pays nothing again.
+    """
+    try:
+        job = runner.submit(request.input_file, request.chunk_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job.progress()
+
+@router.get("/rewards/jobs", response_model=List[RewardJobStatus])
+async def list_reward_jobs(
+    runner: RewardJobRunner = Depends(get_reward_job_runner),
+    admin_user: str = Depends(get_admin_user)
+):
+    """List reward jobs started since startup"""
+    return [job.progress() for job in runner.jobs()]
+
+@router.get("/rewards/jobs/{job_id}", response_model=RewardJobStatus)
+async def get_reward_job(
+    job_id: str,
+    runner: RewardJobRunner = Depends(get_reward_job_runner),
+    admin_user: str = Depends(get_admin_user)
+):
+    """Get a reward job's progress"""
+    job = runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Reward job not found")
+    return job.progress()
@@ -1,34 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Dict, List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, List, Optional
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, timezone
 
 from ..core.analytics import AnalyticsManager
-from ..deps import get_current_user
+from ..deps import get_current_user, get_analytics_manager
 from ..schemas.analytics import SupplyMetrics, TransactionMetrics, ReserveMetrics
 
 router = APIRouter()
 
 @router.get("/supply", response_model=SupplyMetrics)
 async def get_supply_metrics(
-    analytics_manager: AnalyticsManager = Depends(AnalyticsManager),
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    resolution: Optional[str] = Query(None, description="minute, hour or day, to add one point per bucket"),
+    analytics_manager: AnalyticsManager = Depends(get_analytics_manager),
     current_user: str = Depends(get_current_user)
 ):
-    """Get supply metrics"""
-    return await analytics_manager.get_supply_metrics()
+    """Get supply metrics, over all recorded history unless a range is given"""
+    try:
+        return await analytics_manager.get_supply_metrics(
+            _to_naive_utc(start_time), _to_naive_utc(end_time), resolution
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/transactions", response_model=TransactionMetrics)
 async def get_transaction_metrics(
-    analytics_manager: AnalyticsManager = Depends(AnalyticsManager),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    resolution: Optional[str] = Query(None, description="minute, hour or day, to add one point per bucket"),
+    analytics_manager: AnalyticsManager = Depends(get_analytics_manager),
     current_user: str = Depends(get_current_user)
 ):
-    """Get transaction metrics"""
-    return await analytics_manager.get_transaction_metrics()
+    """Get transaction metrics, over all recorded history unless a range is given"""
+    try:
+        return await analytics_manager.get_transaction_metrics(
+            _to_naive_utc(start_date), _to_naive_utc(end_date), resolution
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/reserves", response_model=ReserveMetrics)
 async def get_reserve_metrics(
-    analytics_manager: AnalyticsManager = Depends(AnalyticsManager),
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    resolution: Optional[str] = Query(None, description="minute, hour or day, to add one point per bucket"),
+    analytics_manager: AnalyticsManager = Depends(get_analytics_manager),
     current_user: str = Depends(get_current_user)
 ):
-    """Get reserve metrics"""
-    return await analytics_manager.get_reserve_metrics()
+    """Get reserve metrics, over all recorded history unless a range is given"""
+    try:
+        return await analytics_manager.get_reserve_metrics(
+            _to_naive_utc(start_time), _to_naive_utc(end_time), resolution
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Analytics are recorded in naive UTC"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
@@ -1,28 +1,79 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Awaitable, Callable, Iterator, List, Optional, Tuple
+from pydantic import BaseModel
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, timezone
+from itertools import islice
+import asyncio
+import base64
+import binascii
+import hashlib
 
+from ..core.config import get_settings
 from ..core.currency import CurrencyManager
-from ..core.transactions import TransactionManager, TransactionType
+from ..core.balances import BalanceBook
+from ..core.idempotency import IdempotencyCache, IdempotencyConflict
+from ..core.snapshots import SnapshotCache, snapshot_response
+from ..core.transactions import Transaction, TransactionManager, TransactionType
 from ..schemas.currency import (
     CurrencyInfo,
+    BalanceResponse,
     IssuanceRequest,
     TransferRequest,
-    TransactionResponse
+    TransactionResponse,
+    BatchTransferRequest,
+    BatchTransferResponse,
+    TransactionPage
+)
+from ..deps import (
+    get_current_user,
+    get_currency_manager,
+    get_transaction_manager,
+    get_ledger_persistence,
+    get_idempotency_cache,
+    get_balance_book,
+    get_snapshot_cache
 )
-from ..deps import get_current_user, get_currency_manager, get_transaction_manager
 
 router = APIRouter()
+settings = get_settings()
 
 @router.get("/info", response_model=CurrencyInfo)
 async def get_currency_info(
-    currency_manager: CurrencyManager = Depends(get_currency_manager)
+    wait: Optional[float] = Query(None, gt=0, le=settings.SNAPSHOT_MAX_WAIT_SECONDS),
+    if_none_match: Optional[str] = Header(None),
+    currency_manager: CurrencyManager = Depends(get_currency_manager),
+    snapshot_cache: SnapshotCache = Depends(get_snapshot_cache)
+):
+    """
+    Get current currency information
+    
+    Served from a snapshot rebuilt only when the supply or reserves change.
+    Returns 304 when If-None-Match holds the current ETag; with wait, first
+    blocks up to that many seconds for a change.
+    """
+    async def build() -> bytes:
+        info = CurrencyInfo(
+            total_supply=await currency_manager.get_supply(),
+            reserve_ratio=await currency_manager.get_reserve_ratio(),
+            timestamp=datetime.utcnow()
+        )
+        return info.model_dump_json().encode()
+        
+    snapshot = await snapshot_cache.poll("currency_info", build, if_none_match, wait)
+    return snapshot_response(snapshot, if_none_match)
+
+@router.get("/balance/{address}", response_model=BalanceResponse)
+async def get_balance(
+    address: str,
+    balance_book: BalanceBook = Depends(get_balance_book),
+    current_user: str = Depends(get_current_user)
 ):
-    """Get current currency information"""
-    supply = await currency_manager.get_supply()
+    """Get the current balance of an address"""
     return {
-        "total_supply": supply,
+        "address": address,
+        "balance": balance_book.get_balance(address),
         "timestamp": datetime.utcnow()
     }
 
@@ -31,37 +82,188 @@ async def issue_currency(
     request: IssuanceRequest,
     currency_manager: CurrencyManager = Depends(get_currency_manager),
     transaction_manager: TransactionManager = Depends(get_transaction_manager),
+    idempotency_cache: IdempotencyCache = Depends(get_idempotency_cache),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     current_user: str = Depends(get_current_user)
 ):
     """Issue new currency"""
-    if not await currency_manager.issue_currency(request.amount, request.reason):
-        raise HTTPException(status_code=400, detail="Currency issuance failed")
+    async def issue() -> Transaction:
+        if not await currency_manager.issue_currency(request.amount, request.reason):
+            raise HTTPException(status_code=400, detail="Currency issuance failed")
+            
+        try:
+            transaction = await transaction_manager.create_transaction(
+                type=TransactionType.ISSUANCE,
+                amount=request.amount,
+                recipient=request.recipient,
+                sender="DACR",
+                metadata={"reason": request.reason}
+            )
+            executed = await transaction_manager.execute_transaction(transaction.id)
+        except BaseException:
+            await currency_manager.revert_issuance(request.amount, request.reason)
+            raise
+        if not executed:
+            # Nothing was credited, so the supply must not grow either
+            await currency_manager.revert_issuance(request.amount, request.reason)
+            raise HTTPException(status_code=500, detail="Issued currency could not be credited")
+        return transaction
         
-    transaction = await transaction_manager.create_transaction(
-        type=TransactionType.ISSUANCE,
-        amount=request.amount,
-        recipient=request.recipient,
-        sender="DACR",
-        metadata={"reason": request.reason}
-    )
-    
-    await transaction_manager.execute_transaction(transaction.id)
-    return transaction
+    return await _idempotent(idempotency_cache, idempotency_key, f"{current_user}:issue", request, issue)
 
 @router.post("/transfer", response_model=TransactionResponse)
 async def transfer_currency(
     request: TransferRequest,
     transaction_manager: TransactionManager = Depends(get_transaction_manager),
+    idempotency_cache: IdempotencyCache = Depends(get_idempotency_cache),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     current_user: str = Depends(get_current_user)
 ):
     """Transfer currency between addresses"""
-    transaction = await transaction_manager.create_transaction(
-        type=TransactionType.TRANSFER,
-        amount=request.amount,
+    async def transfer() -> Transaction:
+        transaction = await transaction_manager.create_transaction(
+            type=TransactionType.TRANSFER,
+            amount=request.amount,
+            sender=current_user,
+            recipient=request.recipient,
+            metadata=request.metadata
+        )
+        
+        if not await transaction_manager.execute_transaction(transaction.id):
+            raise HTTPException(status_code=400, detail="Transfer failed")
+        return transaction
+        
+    return await _idempotent(idempotency_cache, idempotency_key, f"{current_user}:transfer", request, transfer)
+
+@router.post("/transfer/batch", response_model=BatchTransferResponse)
+async def transfer_currency_batch(
+    request: BatchTransferRequest,
+    transaction_manager: TransactionManager = Depends(get_transaction_manager),
+    current_user: str = Depends(get_current_user)
+):
+    """Transfer currency to many recipients in a single request"""
+    if len(request.transfers) > settings.MAX_TRANSFER_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.MAX_TRANSFER_BATCH_SIZE} transfers"
+        )
+        
+    results = await transaction_manager.create_and_execute_batch(
         sender=current_user,
-        recipient=request.recipient,
-        metadata=request.metadata
+        transfers=request.transfers
     )
-    
-    await transaction_manager.execute_transaction(transaction.id)
-    return transaction
+    succeeded = sum(1 for result in results if result.error is None)
+    return {
+        "results": [
+            {
+                "index": result.index,
+                "success": result.error is None,
+                "transaction": result.transaction,
+                "error": result.error
+            }
+            for result in results
+        ],
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded
+    }
+
+@router.get("/transactions", response_model=TransactionPage)
+async def list_transactions(
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    address: Optional[str] = None,
+    type: Optional[TransactionType] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    transaction_manager: TransactionManager = Depends(get_transaction_manager),
+    current_user: str = Depends(get_current_user)
+):
+    """List executed transactions in timestamp order, one page at a time"""
+    persistence = get_ledger_persistence()
+    transactions = (persistence or transaction_manager).iter_transactions(
+        start_time=_to_naive_utc(start_time),
+        end_time=_to_naive_utc(end_time),
+        address=address,
+        type=type,
+        after=_decode_cursor(cursor) if cursor else None,
+        chunk_size=limit + 1
+    )
+    if persistence:
+        page = await asyncio.to_thread(lambda: list(islice(transactions, limit + 1)))
+    else:
+        page = list(islice(transactions, limit + 1))
+        
+    next_cursor = _encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return {
+        "transactions": page[:limit],
+        "next_cursor": next_cursor
+    }
+
+@router.get("/transactions/export")
+async def export_transactions(
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    address: Optional[str] = None,
+    type: Optional[TransactionType] = None,
+    transaction_manager: TransactionManager = Depends(get_transaction_manager),
+    current_user: str = Depends(get_current_user)
+):
+    """Stream executed transactions as newline-delimited JSON"""
+    persistence = get_ledger_persistence()
+    transactions = (persistence or transaction_manager).iter_transactions(
+        start_time=_to_naive_utc(start_time),
+        end_time=_to_naive_utc(end_time),
+        address=address,
+        type=type
+    )
+    chunks = _ndjson_chunks(transactions)
+    if not persistence:
+        # In-memory reads stay on the event loop, yielding to it between chunks
+        chunks = _yield_between(chunks)
+    return StreamingResponse(chunks, media_type="application/x-ndjson")
+
+async def _idempotent(
+    cache: IdempotencyCache,
+    key: Optional[str],
+    scope: str,
+    request: BaseModel,
+    execute: Callable[[], Awaitable[Transaction]]
+):
+    """Runs execute at most once per Idempotency-Key, scoped to the caller and endpoint"""
+    if key is None:
+        return await execute()
+    fingerprint = hashlib.sha256(request.model_dump_json().encode()).hexdigest()
+    try:
+        return await cache.execute(f"{scope}:{key}", fingerprint, execute)
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+def _ndjson_chunks(transactions: Iterator[Transaction], lines_per_chunk: int = 1000) -> Iterator[bytes]:
+    """Serializes transactions as NDJSON, batching lines into larger writes"""
+    while True:
+        lines = [tx.model_dump_json() for tx in islice(transactions, lines_per_chunk)]
+        if not lines:
+            return
+        yield ("\n".join(lines) + "\n").encode()
+
+async def _yield_between(chunks: Iterator[bytes]):
+    for chunk in chunks:
+        yield chunk
+        await asyncio.sleep(0)
+
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Ledger timestamps are naive UTC; convert aware query parameters to match"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _encode_cursor(transaction: Transaction) -> str:
+    token = f"{transaction.timestamp.isoformat()}|{transaction.id}"
+    return base64.urlsafe_b64encode(token.encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        timestamp, transaction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(timestamp), transaction_id
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
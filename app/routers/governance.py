@@ -3,7 +3,7 @@ from typing import List
 from decimal import Decimal
 
 from ..core.governance import GovernanceManager, ProposalType, ProposalStatus
-from ..deps import get_current_user
+from ..deps import get_current_user, get_governance_manager
 from ..schemas.governance import (
     ProposalCreate,
     ProposalResponse,
@@ -16,7 +16,7 @@ router = APIRouter()
 @router.post("/proposals", response_model=ProposalResponse)
 async def create_proposal(
     request: ProposalCreate,
-    governance_manager: GovernanceManager = Depends(GovernanceManager),
+    governance_manager: GovernanceManager = Depends(get_governance_manager),
     current_user: str = Depends(get_current_user)
 ):
     """Create a new proposal"""
@@ -32,7 +32,7 @@ async def create_proposal(
 @router.get("/proposals", response_model=List[ProposalResponse])
 async def list_proposals(
     status: ProposalStatus = None,
-    governance_manager: GovernanceManager = Depends(GovernanceManager),
+    governance_manager: GovernanceManager = Depends(get_governance_manager),
     current_user: str = Depends(get_current_user)
 ):
     """List all proposals"""
@@ -41,7 +41,7 @@ async def list_proposals(
 @router.post("/vote", response_model=VoteResponse)
 async def vote_on_proposal(
     request: VoteRequest,
-    governance_manager: GovernanceManager = Depends(GovernanceManager),
+    governance_manager: GovernanceManager = Depends(get_governance_manager),
     current_user: str = Depends(get_current_user)
 ):
     """Vote on a proposal"""
@@ -1,34 +1,193 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Dict, List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from typing import Dict, List, Optional
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
+from ..core.config import get_settings
+from ..core.amount import from_units
+from ..core.balances import BalanceBook
+from ..core.merkle import MerkleSumTree
 from ..core.reserves import ReserveManager, ReserveType
-from ..deps import get_current_user
-from ..schemas.reserves import ReserveStatus, ReserveHistory
+from ..core.rollups import RESOLUTIONS
+from ..core.snapshots import SnapshotCache, snapshot_response
+from ..deps import get_admin_user, get_balance_book, get_current_user, get_reserve_manager, get_snapshot_cache
+from ..schemas.reserves import (
+    ReserveStatus,
+    ReserveHistory,
+    ReserveItem,
+    ReserveItemUpdate,
+    PriceUpdate,
+    ReserveAdjustmentBatch,
+    ReserveProof,
+    InclusionProof
+)
 
 router = APIRouter()
+settings = get_settings()
 
 @router.get("/status", response_model=ReserveStatus)
 async def get_reserve_status(
-    reserve_manager: ReserveManager = Depends(ReserveManager),
+    wait: Optional[float] = Query(None, gt=0, le=settings.SNAPSHOT_MAX_WAIT_SECONDS),
+    if_none_match: Optional[str] = Header(None),
+    reserve_manager: ReserveManager = Depends(get_reserve_manager),
+    snapshot_cache: SnapshotCache = Depends(get_snapshot_cache),
     current_user: str = Depends(get_current_user)
 ):
-    """Get current reserve status"""
-    reserves = await reserve_manager.get_reserve_status()
-    total = await reserve_manager.get_total_reserves()
+    """
+    Get current reserve status
     
+    Cached and validated like /currency/info: ETag, If-None-Match and wait.
+    """
+    async def build() -> bytes:
+        return ReserveStatus(**await _status(reserve_manager)).model_dump_json().encode()
+        
+    snapshot = await snapshot_cache.poll("reserve_status", build, if_none_match, wait)
+    return snapshot_response(snapshot, if_none_match)
+
+@router.post("/adjustments", response_model=ReserveStatus)
+async def apply_reserve_adjustments(
+    request: ReserveAdjustmentBatch,
+    reserve_manager: ReserveManager = Depends(get_reserve_manager),
+    current_user: str = Depends(get_admin_user)
+):
+    """Add to and remove from several reserves at once; nothing changes if any adjustment is invalid"""
+    if len(request.adjustments) > settings.MAX_RESERVE_ADJUSTMENT_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.MAX_RESERVE_ADJUSTMENT_BATCH_SIZE} adjustments"
+        )
+        
+    if not await reserve_manager.apply_adjustments(
+        [(adjustment.reserve_type, adjustment.amount) for adjustment in request.adjustments]
+    ):
+        raise HTTPException(status_code=400, detail="Reserve adjustment failed")
+    return await _status(reserve_manager)
+
+@router.get("/history", response_model=List[ReserveHistory])
+async def get_reserve_history(
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    reserve_type: Optional[ReserveType] = None,
+    resolution: Optional[str] = Query(None, description="raw, minute, hour or day; chosen from the range by default"),
+    reserve_manager: ReserveManager = Depends(get_reserve_manager),
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Get reserve history
+    
+    Defaults to the last 24 hours. Long ranges are answered from minute,
+    hour or day rollups rather than individual changes.
+    """
+    if resolution is not None and resolution not in RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown resolution: {resolution}")
+    end_time = _to_naive_utc(end_time) or datetime.utcnow()
+    start_time = _to_naive_utc(start_time) or end_time - timedelta(days=1)
+    if start_time > end_time:
+        raise HTTPException(status_code=400, detail="start_time must not be after end_time")
+    return await reserve_manager.get_history(start_time, end_time, reserve_type, resolution)
+
+@router.get("/items", response_model=List[ReserveItem])
+async def list_reserve_items(
+    reserve_manager: ReserveManager = Depends(get_reserve_manager),
+    current_user: str = Depends(get_current_user)
+):
+    """List reserve line items with their current USD value"""
+    return await reserve_manager.get_reserve_items()
+
+@router.put("/items/{item_id}", response_model=ReserveStatus)
+async def upsert_reserve_item(
+    item_id: str,
+    request: ReserveItemUpdate,
+    reserve_manager: ReserveManager = Depends(get_reserve_manager),
+    current_user: str = Depends(get_admin_user)
+):
+    """Add or replace a reserve line item"""
+    if not await reserve_manager.upsert_reserve_item(
+        item_id, request.quantity, request.price, request.weight, request.category
+    ):
+        raise HTTPException(status_code=400, detail="Invalid reserve item")
+    return await _status(reserve_manager)
+
+@router.delete("/items/{item_id}", response_model=ReserveStatus)
+async def remove_reserve_item(
+    item_id: str,
+    reserve_manager: ReserveManager = Depends(get_reserve_manager),
+    current_user: str = Depends(get_admin_user)
+):
+    """Remove a reserve line item"""
+    if not await reserve_manager.remove_reserve_item(item_id):
+        raise HTTPException(status_code=404, detail="Reserve item not found")
+    return await _status(reserve_manager)
+
+@router.post("/prices", response_model=ReserveStatus)
+async def update_prices(
+    request: PriceUpdate,
+    reserve_manager: ReserveManager = Depends(get_reserve_manager),
+    current_user: str = Depends(get_admin_user)
+):
+    """Reprice many reserve line items at once; nothing changes if any item is unknown"""
+    if not await reserve_manager.update_prices(request.prices):
+        raise HTTPException(status_code=400, detail="Price update failed")
+    return await _status(reserve_manager)
+
+@router.get("/proof", response_model=ReserveProof)
+async def get_reserve_proof(
+    reserve_manager: ReserveManager = Depends(get_reserve_manager),
+    balance_book: BalanceBook = Depends(get_balance_book),
+    current_user: str = Depends(get_current_user)
+):
+    """Get the Merkle roots committing to every reserve entry and every balance"""
+    liabilities = balance_book.merkle_tree
     return {
-        "reserves": reserves,
-        "total": total,
+        "reserves": _merkle_root(reserve_manager.merkle_tree),
+        "liabilities": _merkle_root(liabilities) if liabilities is not None else None,
         "timestamp": datetime.utcnow()
     }
 
-@router.get("/history", response_model=List[ReserveHistory])
-async def get_reserve_history(
-    reserve_manager: ReserveManager = Depends(ReserveManager),
+@router.get("/proof/{address}", response_model=InclusionProof)
+async def get_inclusion_proof(
+    address: str,
+    balance_book: BalanceBook = Depends(get_balance_book),
     current_user: str = Depends(get_current_user)
 ):
-    """Get reserve history"""
-    # This would typically fetch from a database
-    return []
+    """
+    Get a proof that an address's balance is included in the liabilities root
+    
+    Users may only fetch the proof for their own address; admins may fetch
+    any. Sibling leaves are salted, so the sums in a proof cannot be tied to
+    other addresses.
+    """
+    if address != current_user and current_user not in settings.ADMIN_USERS:
+        raise HTTPException(status_code=403, detail="Not allowed to view this proof")
+    tree = balance_book.merkle_tree
+    if tree is None:
+        raise HTTPException(status_code=503, detail="Liability proofs are not enabled")
+    proof = tree.proof(address)
+    if proof is None:
+        raise HTTPException(status_code=404, detail="Address not found")
+    return {
+        "address": address,
+        "balance": from_units(proof["value"]),
+        "units": proof["value"],
+        "salt": proof["salt"].hex(),
+        "index": proof["index"],
+        "siblings": [{"hash": digest.hex(), "sum": total} for digest, total in proof["siblings"]],
+        "root": tree.root.hex(),
+        "total_units": tree.total
+    }
+
+def _merkle_root(tree: MerkleSumTree) -> dict:
+    return {"root": tree.root.hex(), "total": from_units(tree.total), "entries": len(tree)}
+
+async def _status(reserve_manager: ReserveManager) -> dict:
+    return {
+        "reserves": await reserve_manager.get_reserve_status(),
+        "total": await reserve_manager.get_total_reserves(),
+        "timestamp": datetime.utcnow()
+    }
+
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """History is stored as naive UTC"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
@@ -0,0 +1,33 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+from decimal import Decimal
+from datetime import datetime
+
+from ..core.distribution import RewardType
+
+class RewardRequest(BaseModel):
+    user_id: str
+    reward_type: RewardType
+    metadata: Dict[str, Any] = {}
+
+class QueuedReward(BaseModel):
+    user_id: str
+    amount: Decimal  # Credited by the reward queue's next flush
+
+class RewardJobRequest(BaseModel):
+    input_file: str  # JSON Lines file in REWARD_JOB_DIR
+    chunk_size: Optional[int] = Field(None, gt=0)
+
+class RewardJobStatus(BaseModel):
+    job_id: str
+    input_file: str
+    status: str
+    lines: int  # Lines processed, including any before a resume
+    paid: int
+    failed: int
+    amount: Decimal  # Total DAC paid
+    bytes_read: int
+    total_bytes: int
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -1,8 +1,17 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Dict
+from typing import Dict, List
 from decimal import Decimal
 from datetime import datetime
 
+class SupplyPoint(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    
+    timestamp: datetime  # Start of the bucket
+    current_supply: Decimal  # Last level in the bucket
+    max_supply: Decimal
+    min_supply: Decimal
+    average_supply: Decimal
+
 class SupplyMetrics(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
     
@@ -10,6 +19,15 @@ class SupplyMetrics(BaseModel):
     max_supply: Decimal
     min_supply: Decimal
     average_supply: Decimal
+    history: List[SupplyPoint] = []  # One point per bucket when a resolution is requested
+
+class TransactionPoint(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    
+    timestamp: datetime  # Start of the bucket
+    volume: Decimal
+    transaction_count: int
+    active_users: int
 
 class TransactionMetrics(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -18,6 +36,16 @@ class TransactionMetrics(BaseModel):
     average_daily_volume: Decimal
     total_active_users: int
     average_daily_users: float
+    history: List[TransactionPoint] = []  # One point per bucket when a resolution is requested
+
+class ReservePoint(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    
+    timestamp: datetime  # Start of the bucket
+    current_reserves: Dict[str, Decimal]  # Last level of each type in the bucket
+    average_reserves: Dict[str, Decimal]
+    min_reserves: Dict[str, Decimal]
+    max_reserves: Dict[str, Decimal]
 
 class ReserveMetrics(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -26,3 +54,4 @@ class ReserveMetrics(BaseModel):
     average_reserves: Dict[str, Decimal]
     min_reserves: Dict[str, Decimal]
     max_reserves: Dict[str, Decimal]
+    history: List[ReservePoint] = []  # One point per bucket when a resolution is requested
@@ -1,10 +1,16 @@
 from pydantic import BaseModel, Field
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from decimal import Decimal
 from datetime import datetime
 
 class CurrencyInfo(BaseModel):
     total_supply: Decimal
+    reserve_ratio: Optional[Decimal] = None
+    timestamp: datetime
+
+class BalanceResponse(BaseModel):
+    address: str
+    balance: Decimal
     timestamp: datetime
 
 class IssuanceRequest(BaseModel):
@@ -26,3 +32,21 @@ class TransactionResponse(BaseModel):
     timestamp: datetime
     status: str
     metadata: Dict[str, str]
+
+class BatchTransferRequest(BaseModel):
+    transfers: List[TransferRequest] = Field(..., min_length=1)
+
+class BatchTransferResult(BaseModel):
+    index: int
+    success: bool
+    transaction: Optional[TransactionResponse] = None
+    error: Optional[str] = None
+
+class BatchTransferResponse(BaseModel):
+    results: List[BatchTransferResult]
+    succeeded: int
+    failed: int
+
+class TransactionPage(BaseModel):
+    transactions: List[TransactionResponse]
+    next_cursor: Optional[str] = None
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Dict
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, List, Optional
 from decimal import Decimal
 from datetime import datetime
 
+from ..core.reserves import ReserveType
+
 class ReserveStatus(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
     
@@ -14,5 +16,53 @@ class ReserveHistory(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
     
     reserve_type: str
-    amount: Decimal
+    amount: Decimal  # Level at timestamp; for rollups, the last level in the bucket
+    timestamp: datetime  # For rollups, the start of the bucket
+    resolution: str = "raw"
+    min: Optional[Decimal] = None
+    max: Optional[Decimal] = None
+    avg: Optional[Decimal] = None
+
+class ReserveItemUpdate(BaseModel):
+    quantity: float = Field(..., ge=0)
+    price: float = Field(..., ge=0)  # USD per unit
+    weight: float = Field(..., ge=0)
+    category: Optional[str] = None
+
+class ReserveItem(ReserveItemUpdate):
+    item_id: str
+    value: float  # quantity times price, in USD
+
+class PriceUpdate(BaseModel):
+    prices: Dict[str, float]  # item_id to new USD price per unit
+
+class ReserveAdjustment(BaseModel):
+    reserve_type: ReserveType
+    amount: Decimal  # Negative to remove from the reserve
+
+class ReserveAdjustmentBatch(BaseModel):
+    adjustments: List[ReserveAdjustment] = Field(..., min_length=1)
+
+class MerkleRoot(BaseModel):
+    root: str  # Hex SHA-256
+    total: Decimal  # Sum of all leaf values
+    entries: int
+
+class ReserveProof(BaseModel):
+    reserves: MerkleRoot  # Leaves are the weighted value of each reserve type and line item
+    liabilities: Optional[MerkleRoot] = None  # Leaves are address balances
     timestamp: datetime
+
+class ProofNode(BaseModel):
+    hash: str  # Hex SHA-256
+    sum: int  # Subtree total in 10^-18 units
+
+class InclusionProof(BaseModel):
+    address: str
+    balance: Decimal
+    units: int  # The balance in 10^-18 units, as hashed into the leaf
+    salt: str  # Hex; hashed into the leaf, and only given to its owner
+    index: int
+    siblings: List[ProofNode]  # Leaf level first
+    root: str
+    total_units: int
@@ -0,0 +1,149 @@
+"""
+Times the money hot paths through the managers' own methods.
+
+    issue       CurrencyManager.issue_currency
+    transfer    BalanceBook.check and apply of one transfer
+    reward      DistributionManager.calculate_reward, then distribute_reward
+    reserves    ReserveManager.add_to_reserves, then get_total_reserves
+    average     AnalyticsManager.get_supply_metrics over a supply history
+
+Only methods that predate integer amounts are called, so with --baseline the
+same paths are also timed in a temporary git worktree of another revision,
+e.g. the commit before amounts were held as integer 10^-18 units.
+
+Usage:
+    python benchmarks/bench_amounts.py [iterations] [--baseline REV]
+"""
+import argparse
+import asyncio
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+HISTORY = 1_000
+# Activity values a reward is scaled by, cycled through
+IMPACTS = [1 + n / 100 for n in range(100)]
+
+def transaction(type: str, amount: str, sender: Optional[str], recipient: str):
+    from app.core.transactions import Transaction, TransactionStatus, TransactionType
+    return Transaction(
+        id=f"{type}-{recipient}",
+        type=TransactionType(type),
+        amount=Decimal(amount),
+        sender=sender,
+        recipient=recipient,
+        timestamp=datetime.utcnow(),
+        status=TransactionStatus.COMPLETED,
+        metadata={}
+    )
+
+async def issue(iterations: int) -> float:
+    from app.core.currency import CurrencyManager
+    manager, amount = CurrencyManager(), Decimal("1.25")
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await manager.issue_currency(amount, "benchmark")
+    return time.perf_counter() - start
+
+async def transfer(iterations: int) -> float:
+    from app.core.balances import BalanceBook
+    book = BalanceBook()
+    book.apply([transaction("issuance", "1e9", None, "alice")])
+    move = [transaction("transfer", "1.25", "alice", "bob")]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if book.check(move)[0] is None:
+            book.apply(move)
+    return time.perf_counter() - start
+
+async def reward(iterations: int) -> float:
+    from app.core.distribution import DistributionManager, RewardType
+    manager = DistributionManager()
+    metadata = [{"impact": impact} for impact in IMPACTS]
+    start = time.perf_counter()
+    for i in range(iterations):
+        amount = await manager.calculate_reward("alice", RewardType.CONTRIBUTION, metadata[i % len(metadata)])
+        await manager.distribute_reward("alice", amount, RewardType.CONTRIBUTION)
+    return time.perf_counter() - start
+
+async def reserves(iterations: int) -> float:
+    from app.core.reserves import ReserveManager, ReserveType
+    manager, amount = ReserveManager(), Decimal("12345.678901234567")
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await manager.add_to_reserves(ReserveType.COMPUTATIONAL, amount)
+        await manager.get_total_reserves()
+    return time.perf_counter() - start
+
+async def average(iterations: int) -> float:
+    from app.core.analytics import AnalyticsManager
+    analytics = AnalyticsManager()
+    for n in range(HISTORY):
+        await analytics.record_supply_change(Decimal(n) / 8)
+    calls = max(iterations // HISTORY, 1)
+    start = time.perf_counter()
+    for _ in range(calls):
+        await analytics.get_supply_metrics()
+    # Per history entry, like the other paths' per-call figures
+    return (time.perf_counter() - start) * iterations / calls
+
+PATHS = {"issue": issue, "transfer": transfer, "reward": reward, "reserves": reserves, "average": average}
+
+def run(iterations: int) -> Dict[str, float]:
+    """Returns the microseconds per operation of each path in the imported tree"""
+    return {
+        name: asyncio.run(path(iterations)) / iterations * 1e6
+        for name, path in PATHS.items()
+    }
+
+def run_at(revision: str, iterations: int) -> Dict[str, float]:
+    """Runs this script against a git worktree of another revision"""
+    repo = Path(__file__).resolve().parent.parent
+    with tempfile.TemporaryDirectory() as directory:
+        worktree = str(Path(directory) / "baseline")
+        subprocess.run(
+            ["git", "-C", str(repo), "worktree", "add", "--detach", "--quiet", worktree, revision],
+            check=True
+        )
+        try:
+            output = subprocess.run(
+                [sys.executable, __file__, str(iterations), "--root", worktree],
+                check=True, capture_output=True, text=True
+            ).stdout
+        finally:
+            subprocess.run(["git", "-C", str(repo), "worktree", "remove", "--force", worktree], check=True)
+    return {name: float(micros) for name, micros in (line.split() for line in output.splitlines())}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("iterations", type=int, nargs="?", default=100_000)
+    parser.add_argument("--baseline", help="Revision to compare against")
+    parser.add_argument("--root", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    sys.path.insert(0, args.root or str(Path(__file__).parent.parent))
+    
+    if args.root:
+        for name, micros in run(args.iterations).items():
+            print(name, micros)
+        return
+        
+    baseline = run_at(args.baseline, args.iterations) if args.baseline else None
+    current = run(args.iterations)
+    print(f"{args.iterations} iterations per path, us per operation")
+    if baseline is None:
+        for name, micros in current.items():
+            print(f"  {name:<10} {micros:>8.2f}")
+        return
+    print(f"  {'path':<10} {args.baseline[:12]:>12} {'current':>12} {'speedup':>8}")
+    for name, micros in current.items():
+        print(f"  {name:<10} {baseline[name]:>12.2f} {micros:>12.2f} {baseline[name] / micros:>7.2f}x")
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    main()
@@ -0,0 +1,81 @@
+"""
+Measures reserve analytics over long ranges with rollups.
+
+Records a reserve state every `interval` seconds for D days, then times
+get_reserve_metrics over a random week, and the whole period with hourly
+history, next to the scan of every raw state that the metrics used to be
+computed from. Also reports the cost of recording a state.
+
+Usage:
+    python benchmarks/bench_analytics_rollups.py [days] [interval] [queries]
+"""
+import asyncio
+import logging
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.analytics import AnalyticsManager
+
+RESERVE_TYPES = ["compute", "storage", "bandwidth"]
+
+def scan(history, start_time, end_time):
+    filtered = [reserves for ts, reserves in history.items() if start_time <= ts <= end_time]
+    return {
+        reserve_type: (
+            min(reserves[reserve_type] for reserves in filtered),
+            max(reserves[reserve_type] for reserves in filtered),
+            sum(reserves[reserve_type] for reserves in filtered) / len(filtered)
+        )
+        for reserve_type in RESERVE_TYPES
+    }
+
+async def main(days: int, interval: int, queries: int) -> None:
+    analytics = AnalyticsManager(max_points=24 * days)
+    start = datetime(2024, 1, 1)
+    history = {}
+    samples = days * 86400 // interval
+    begin = time.perf_counter()
+    for i in range(samples):
+        timestamp = start + timedelta(seconds=i * interval)
+        reserves = {reserve_type: Decimal(random.randrange(10 ** 6)) for reserve_type in RESERVE_TYPES}
+        await analytics.record_reserve_state(reserves, timestamp)
+        history[timestamp] = reserves
+    record = (time.perf_counter() - begin) / samples
+    
+    weeks = []
+    for _ in range(queries):
+        offset = timedelta(seconds=random.randrange((days - 7) * 86400))
+        weeks.append((start + offset, start + offset + timedelta(days=7)))
+    end = start + timedelta(days=days, seconds=-1)
+    
+    timings = {}
+    begin = time.perf_counter()
+    for start_time, end_time in weeks:
+        await analytics.get_reserve_metrics(start_time, end_time)
+    timings["rollups, week"] = (time.perf_counter() - begin) / queries
+    begin = time.perf_counter()
+    await analytics.get_reserve_metrics(start, end, resolution="hour")
+    timings["rollups, all hourly"] = time.perf_counter() - begin
+    begin = time.perf_counter()
+    for start_time, end_time in weeks[:3]:
+        scan(history, start_time, end_time)
+    timings["scan, week"] = (time.perf_counter() - begin) / 3
+    
+    print(f"{samples} reserve states over {days} days, {record * 1e6:.1f} us to record each")
+    for name, elapsed in timings.items():
+        print(f"  {name:<22} {elapsed * 1e3:>10.3f} ms")
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 30,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    ))
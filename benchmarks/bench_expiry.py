@@ -0,0 +1,97 @@
+"""
+Measures DAC expiry ticks as the number of holders grows.
+
+Credits one issued lot to each of H holders, expiring in a year, plus
+`expiring` reward lots spread over the next `ticks` one-minute ticks. Then
+runs those ticks through ExpiryManager.expire, which burns the due lots
+with BURN transactions, and compares the time per tick with a scan of every
+lot for expired ones. The wheel's cost should stay flat as H grows.
+
+Usage:
+    python benchmarks/bench_expiry.py [holders,...] [expiring] [ticks]
+"""
+import asyncio
+import logging
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.balances import BalanceBook
+from app.core.currency import CurrencyManager
+from app.core.expiry import ExpiryManager
+from app.core.transactions import Transaction, TransactionManager, TransactionStatus, TransactionType
+
+TICK = 60.0
+LIFETIMES = {TransactionType.ISSUANCE: 365 * 86400, TransactionType.REWARD: 86400}
+
+def credit(type, recipient, timestamp) -> Transaction:
+    return Transaction.model_construct(
+        id=str(uuid.uuid4()),
+        type=type,
+        amount=Decimal("10"),
+        sender="DACR",
+        recipient=recipient,
+        timestamp=timestamp,
+        status=TransactionStatus.PENDING,
+        metadata={}
+    )
+
+async def bench(holders: int, expiring: int, ticks: int):
+    currency_manager = CurrencyManager()
+    await currency_manager.issue_currency(Decimal(10 * (holders + expiring)), "bench")
+    expiry = ExpiryManager(currency_manager, LIFETIMES, tick_seconds=TICK)
+    transaction_manager = TransactionManager(balances=BalanceBook(), expiry=expiry)
+    
+    base = time.time()
+    now = datetime.utcfromtimestamp(base)
+    credits = [credit(TransactionType.ISSUANCE, f"holder-{i}", now) for i in range(holders)]
+    # Reward lots whose day-long lifetime runs out during the measured ticks
+    credits += [
+        credit(
+            TransactionType.REWARD,
+            f"holder-{i % holders}",
+            now - timedelta(seconds=LIFETIMES[TransactionType.REWARD] - TICK * (i * ticks // expiring))
+        )
+        for i in range(expiring)
+    ]
+    for start in range(0, len(credits), 10000):
+        await transaction_manager.execute_batch(credits[start:start + 10000])
+    expiries = [
+        (credit.recipient, credit.timestamp.replace(tzinfo=timezone.utc).timestamp() + LIFETIMES[credit.type])
+        for credit in credits
+    ]
+    
+    start = time.perf_counter()
+    burned = Decimal(0)
+    for tick in range(1, ticks + 1):
+        burned += await expiry.expire(transaction_manager, now=base + tick * TICK)
+    wheel = time.perf_counter() - start
+    
+    # A scan finds the same lots but visits every one on every tick
+    start = time.perf_counter()
+    for tick in range(1, min(ticks, 10) + 1):
+        cutoff = base + tick * TICK
+        [holder for holder, expires_at in expiries if expires_at <= cutoff]
+    scan = (time.perf_counter() - start) / min(ticks, 10)
+    return wheel / ticks, scan, burned
+
+async def main(sizes, expiring: int, ticks: int) -> None:
+    print(f"{expiring} lots expiring over {ticks} ticks of {TICK:.0f}s")
+    print(f"  {'holders':>9}  {'wheel tick':>12}  {'scan tick':>12}  burned")
+    for holders in sizes:
+        wheel, scan, burned = await bench(holders, expiring, ticks)
+        print(f"  {holders:>9}  {wheel * 1e3:>9.3f} ms  {scan * 1e3:>9.3f} ms  {burned}")
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    asyncio.run(main(
+        [int(size) for size in sys.argv[1].split(",")] if len(sys.argv) > 1 else [10_000, 100_000, 1_000_000],
+        int(sys.argv[2]) if len(sys.argv) > 2 else 6000,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 60
+    ))
@@ -0,0 +1,73 @@
+"""
+Measures transfer throughput of the sharded ledger under contention.
+
+Each transfer holds its shard locks across a simulated write-through (an
+awaited sleep), which is where a single global lock serializes everything.
+Two workloads are run against a single lock and against the sharded ledger:
+
+    uniform  sender and recipient drawn uniformly from all accounts
+    hot      every transfer touches one hot account
+
+Uniform throughput should grow with the shard count; the hot workload is
+bounded by its one lock either way.
+
+Usage:
+    python benchmarks/bench_ledger_contention.py [num_transfers]
+"""
+import asyncio
+import logging
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.ledger import ShardedLedger
+
+NUM_ACCOUNTS = 10_000
+WORKERS = 256
+WRITE_THROUGH_SECONDS = 0.001
+
+def make_pairs(workload: str, count: int):
+    pairs = []
+    for _ in range(count):
+        sender, recipient = random.sample(range(NUM_ACCOUNTS), 2)
+        if workload == "hot":
+            if random.random() < 0.5:
+                sender = 0
+            else:
+                recipient = 0
+            if sender == recipient:
+                recipient = 1
+        pairs.append((f"addr-{sender}", f"addr-{recipient}"))
+    return pairs
+
+async def bench(num_shards: int, workload: str, count: int) -> float:
+    ledger = ShardedLedger(num_shards=num_shards)
+    for account in range(NUM_ACCOUNTS):
+        ledger.apply_credit(f"addr-{account}", Decimal(1_000_000))
+    pairs = make_pairs(workload, count)
+    
+    async def worker(offset: int) -> None:
+        for sender, recipient in pairs[offset::WORKERS]:
+            async with ledger.locked(sender, recipient):
+                ledger.apply_transfer(sender, recipient, Decimal("1.25"))
+                await asyncio.sleep(WRITE_THROUGH_SECONDS)
+                
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(WORKERS)))
+    return count / (time.perf_counter() - start)
+
+async def main(count: int) -> None:
+    print(f"{count} transfers, {WORKERS} concurrent workers, {WRITE_THROUGH_SECONDS * 1000:.0f} ms write-through")
+    for workload in ("uniform", "hot"):
+        for num_shards in (1, 16, 256):
+            throughput = await bench(num_shards, workload, count)
+            print(f"  {workload:<8} {num_shards:>4} shards   {throughput:>10.0f} transfers/s")
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000))
@@ -0,0 +1,57 @@
+"""
+Measures the Merkle sum tree behind proof of reserves and liabilities.
+
+Builds a tree over N account balances, then times random balance updates
+(each rehashes one leaf-to-root path), inclusion proof generation, and
+proof verification as an auditor would run it.
+
+Usage:
+    python benchmarks/bench_merkle.py [num_accounts] [num_operations]
+"""
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.merkle import MerkleSumTree, verify_proof
+
+SCALE = 10 ** 18
+
+def main(num_accounts: int, count: int) -> None:
+    tree = MerkleSumTree()
+    start = time.perf_counter()
+    tree.load((f"addr-{i}", random.randrange(1000 * SCALE)) for i in range(num_accounts))
+    build = time.perf_counter() - start
+    
+    addresses = [f"addr-{random.randrange(num_accounts)}" for _ in range(count)]
+    start = time.perf_counter()
+    for address in addresses:
+        tree.update(address, random.randrange(1000 * SCALE))
+    update = (time.perf_counter() - start) / count
+    
+    start = time.perf_counter()
+    proofs = [tree.proof(address) for address in addresses]
+    prove = (time.perf_counter() - start) / count
+    
+    root, total = tree.root, tree.total
+    start = time.perf_counter()
+    for address, proof in zip(addresses, proofs):
+        assert verify_proof(address, proof["value"], proof["index"], proof["siblings"], root, total)
+    verify = (time.perf_counter() - start) / count
+    
+    print(f"{num_accounts} accounts, tree depth {len(proofs[0]['siblings'])}")
+    print(f"  bulk build     {build:>9.2f} s")
+    print(f"  update         {update * 1e6:>9.1f} us")
+    print(f"  proof          {prove * 1e6:>9.1f} us")
+    print(f"  verify         {verify * 1e6:>9.1f} us")
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    )
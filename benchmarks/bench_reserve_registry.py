@@ -0,0 +1,70 @@
+"""
+Measures revaluation of many reserve line items.
+
+Registers N items, then repeatedly applies a batch of price updates to a
+tenth of them and recomputes the weighted total. The NumPy-backed
+ReserveRegistry is compared with the same work done over a dict of
+per-item Decimal records, which is how the reserve types were valued
+before.
+
+Usage:
+    python benchmarks/bench_reserve_registry.py [num_items] [rounds]
+"""
+import logging
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.reserve_registry import ReserveRegistry
+
+def bench_registry(items, batches) -> float:
+    registry = ReserveRegistry()
+    for item_id, quantity, price, weight in items:
+        registry.upsert(item_id, quantity, price, weight)
+        
+    start = time.perf_counter()
+    for ids, prices in batches:
+        registry.update_prices(ids, prices)
+        registry.weighted_total()
+    return (time.perf_counter() - start) / len(batches)
+
+def bench_dict(items, batches) -> float:
+    records = {
+        item_id: [Decimal(repr(quantity)), Decimal(repr(price)), Decimal(repr(weight))]
+        for item_id, quantity, price, weight in items
+    }
+    
+    start = time.perf_counter()
+    for ids, prices in batches:
+        for item_id, price in zip(ids, prices):
+            records[item_id][1] = Decimal(repr(price))
+        sum(quantity * price * weight for quantity, price, weight in records.values())
+    return (time.perf_counter() - start) / len(batches)
+
+def main(num_items: int, rounds: int) -> None:
+    items = [
+        (f"item-{i}", random.uniform(1, 1000), random.uniform(0.01, 100), random.uniform(0, 1))
+        for i in range(num_items)
+    ]
+    batches = []
+    for _ in range(rounds):
+        ids = random.sample([item[0] for item in items], max(num_items // 10, 1))
+        batches.append((ids, [random.uniform(0.01, 100) for _ in ids]))
+        
+    registry = bench_registry(items, batches)
+    baseline = bench_dict(items, batches)
+    print(f"{num_items} items, {len(batches[0][0])} price updates + weighted total per round")
+    print(f"  Decimal dict   {baseline * 1000:>9.3f} ms/round")
+    print(f"  NumPy registry {registry * 1000:>9.3f} ms/round   {baseline / registry:.1f}x")
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    )
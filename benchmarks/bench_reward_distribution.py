@@ -0,0 +1,77 @@
+"""
+Measures a bulk reward payout.
+
+Writes N rewards spread over the reward types to a JSON Lines file, then
+pays them out twice: reading the file line by line and making one
+calculate_reward and distribute_reward call per user, and with a
+RewardDistributionJob reading it in checkpointed chunks. Both times
+include reading and parsing the file; logging is disabled, so the
+per-user path's two log lines per reward are not counted.
+
+Usage:
+    python benchmarks/bench_reward_distribution.py [num_rewards] [chunk_size]
+"""
+import asyncio
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.distribution import DistributionManager, RewardType
+from app.core.reward_jobs import RewardDistributionJob
+
+METADATA = {
+    RewardType.TASK_COMPLETION: lambda: {"complexity": random.choice([1, 1.5, 2, 3])},
+    RewardType.ENGAGEMENT: lambda: {"duration": random.randrange(0, 7200, 60)},
+    RewardType.MILESTONE: lambda: {"importance": random.randint(1, 5)},
+    RewardType.CONTRIBUTION: lambda: {"impact": random.choice([0.5, 1, 2])}
+}
+
+async def bench_per_user(path: Path) -> float:
+    distribution = DistributionManager()
+    start = time.perf_counter()
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            user_id, reward_type = record["user_id"], RewardType(record["reward_type"])
+            amount = await distribution.calculate_reward(user_id, reward_type, record["metadata"])
+            await distribution.distribute_reward(user_id, amount, reward_type)
+    return time.perf_counter() - start
+
+async def bench_job(path: Path, chunk_size: int) -> float:
+    start = time.perf_counter()
+    result = await RewardDistributionJob(DistributionManager(), str(path), chunk_size=chunk_size).run()
+    assert result["status"] == "completed", result["error"]
+    return time.perf_counter() - start
+
+async def main(num_rewards: int, chunk_size: int) -> None:
+    rewards = []
+    for i in range(num_rewards):
+        reward_type = random.choice(list(RewardType))
+        rewards.append((f"user-{i}", reward_type, METADATA[reward_type]()))
+        
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "rewards.jsonl"
+        with open(path, "w") as f:
+            for user_id, reward_type, metadata in rewards:
+                f.write(json.dumps({"user_id": user_id, "reward_type": reward_type.value, "metadata": metadata}) + "\n")
+                
+        per_user = await bench_per_user(path)
+        job = await bench_job(path, chunk_size)
+        
+    print(f"{num_rewards} rewards, chunks of {chunk_size}")
+    print(f"  per-user calls  {per_user:>8.2f} s   {num_rewards / per_user:>10.0f} rewards/s")
+    print(f"  bulk job        {job:>8.2f} s   {num_rewards / job:>10.0f} rewards/s   {per_user / job:.1f}x")
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    ))
@@ -0,0 +1,93 @@
+"""
+Measures reward calculation and tier resolution per call.
+
+Computes N rewards with typical metadata (complexities, durations in whole
+minutes, small importance and impact factors) and resolves N tiers from
+random balances, first the way DistributionManager did per call (a linear
+walk over the thresholds, and an exact ratio conversion and rounded
+multiplication per reward), then with the compiled RewardEngine.
+
+Usage:
+    python benchmarks/bench_reward_engine.py [num_calls]
+"""
+import logging
+import random
+import sys
+import time
+from decimal import ROUND_HALF_EVEN
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.amount import SCALE, mul_ratio, ratio
+from app.core.distribution import DistributionManager, RewardTier, RewardType
+
+METADATA = {
+    RewardType.TASK_COMPLETION: lambda: {"complexity": random.choice([0.5, 1, 1.5, 2, 2.5, 3])},
+    RewardType.ENGAGEMENT: lambda: {"duration": random.randrange(0, 4 * 3600, 60)},
+    RewardType.MILESTONE: lambda: {"importance": random.randint(1, 10)},
+    RewardType.CONTRIBUTION: lambda: {"impact": random.choice([0.25, 0.5, 1, 2, 4])}
+}
+
+def per_call_multiplier(reward_type, metadata):
+    if reward_type == RewardType.TASK_COMPLETION:
+        return ratio(metadata.get('complexity', 1))
+    if reward_type == RewardType.ENGAGEMENT:
+        numerator, denominator = ratio(metadata.get('duration', 0))
+        return 3600 * denominator + numerator, 3600 * denominator
+    if reward_type == RewardType.MILESTONE:
+        numerator, denominator = ratio(metadata.get('importance', 1))
+        return 2 * numerator, denominator
+    if reward_type == RewardType.CONTRIBUTION:
+        numerator, denominator = ratio(metadata.get('impact', 1))
+        return 3 * numerator, 2 * denominator
+    return 1, 1
+
+def per_call_tier(threshold_units, balance):
+    new_tier = RewardTier.BASIC
+    for tier, threshold in threshold_units.items():
+        if balance >= threshold:
+            new_tier = tier
+        else:
+            break
+    return new_tier
+
+def main(count: int) -> None:
+    engine = DistributionManager()._engine
+    rate_units = engine._rate_units
+    threshold_units = dict(zip(engine._tiers, engine._thresholds))
+    calls = []
+    for _ in range(count):
+        reward_type = random.choice(list(RewardType))
+        calls.append((random.choice(list(RewardTier)), reward_type, METADATA[reward_type]()))
+    balances = [random.randrange(20000 * SCALE) for _ in range(count)]
+    
+    start = time.perf_counter()
+    expected = [
+        mul_ratio(rate_units[tier], *per_call_multiplier(reward_type, metadata), ROUND_HALF_EVEN)
+        for tier, reward_type, metadata in calls
+    ]
+    per_call_reward = (time.perf_counter() - start) / count
+    start = time.perf_counter()
+    rewards = [engine.reward(tier, reward_type, metadata) for tier, reward_type, metadata in calls]
+    engine_reward = (time.perf_counter() - start) / count
+    assert rewards == expected
+    
+    start = time.perf_counter()
+    expected = [per_call_tier(threshold_units, balance) for balance in balances]
+    per_call_resolve = (time.perf_counter() - start) / count
+    start = time.perf_counter()
+    tiers = [engine.tier_for(balance) for balance in balances]
+    engine_resolve = (time.perf_counter() - start) / count
+    assert tiers == expected
+    
+    print(f"{count} calls")
+    print(f"  reward   per call {per_call_reward * 1e6:>6.2f} us   engine {engine_reward * 1e6:>6.2f} us   "
+          f"{per_call_reward / engine_reward:.1f}x")
+    print(f"  tier     per call {per_call_resolve * 1e6:>6.2f} us   engine {engine_resolve * 1e6:>6.2f} us   "
+          f"{per_call_resolve / engine_resolve:.1f}x")
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
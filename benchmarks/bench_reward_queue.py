@@ -0,0 +1,62 @@
+"""
+Measures high-frequency engagement credits through the reward queue.
+
+Sends N small engagement rewards spread over U users, interleaved as they
+would arrive, once with one distribute_reward call per reward and once
+through a RewardQueue flushed every `flush_every` rewards. Reports the time
+per reward and the number of balance updates each way.
+
+Usage:
+    python benchmarks/bench_reward_queue.py [num_rewards] [num_users] [flush_every]
+"""
+import asyncio
+import logging
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.distribution import DistributionManager, RewardType
+from app.core.reward_queue import RewardQueue
+
+async def bench_direct(rewards) -> float:
+    distribution = DistributionManager()
+    start = time.perf_counter()
+    for user_id, amount in rewards:
+        await distribution.distribute_reward(user_id, amount, RewardType.ENGAGEMENT)
+    return time.perf_counter() - start
+
+async def bench_queue(rewards, flush_every: int):
+    queue = RewardQueue(DistributionManager(), max_pending=len(rewards))
+    start = time.perf_counter()
+    for i, (user_id, amount) in enumerate(rewards, 1):
+        await queue.submit(user_id, amount)
+        if i % flush_every == 0:
+            await queue.flush()
+    await queue.flush()
+    return time.perf_counter() - start, queue.applied_count
+
+async def main(num_rewards: int, num_users: int, flush_every: int) -> None:
+    amounts = [Decimal(f"0.{random.randrange(1, 10 ** 6):06d}") for _ in range(1000)]
+    rewards = [
+        (f"user-{random.randrange(num_users)}", random.choice(amounts))
+        for _ in range(num_rewards)
+    ]
+    direct = await bench_direct(rewards)
+    queued, updates = await bench_queue(rewards, flush_every)
+    
+    print(f"{num_rewards} rewards over {num_users} users, flushed every {flush_every}")
+    print(f"  distribute_reward  {direct / num_rewards * 1e6:>7.2f} us/reward   {num_rewards:>9} balance updates")
+    print(f"  reward queue       {queued / num_rewards * 1e6:>7.2f} us/reward   {updates:>9} balance updates")
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10_000,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 100_000
+    ))
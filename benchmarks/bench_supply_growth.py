@@ -0,0 +1,61 @@
+"""
+Measures the per-issue overhead of the supply growth limiter.
+
+Issues many small amounts back to back through CurrencyManager, with and
+without a SupplyGrowthLimiter, and reports the cost each issuance pays for
+the check. A separate run drives the limiter with synthetic timestamps
+that slide the window forward every few issuances, so bucket expiry is
+included as well.
+
+Usage:
+    python benchmarks/bench_supply_growth.py [num_issues]
+"""
+import asyncio
+import logging
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.amount import to_units
+from app.core.currency import CurrencyManager
+from app.core.growth import SupplyGrowthLimiter
+
+def make_limiter() -> SupplyGrowthLimiter:
+    return SupplyGrowthLimiter(0.1, window_seconds=86400, num_buckets=24, min_allowance=10 ** 12)
+
+async def issue_loop(currency_manager: CurrencyManager, count: int) -> float:
+    amount = Decimal("0.5")
+    start = time.perf_counter()
+    for _ in range(count):
+        await currency_manager.issue_currency(amount, "bench")
+    return (time.perf_counter() - start) / count
+
+def sliding_loop(count: int) -> float:
+    limiter = make_limiter()
+    units = to_units(Decimal("0.5"))
+    supply = 0
+    start = time.perf_counter()
+    for i in range(count):
+        # One bucket (an hour) passes every 100 issuances
+        now = i * 36.0
+        if limiter.allows(units, supply, now):
+            limiter.record(units, now)
+            supply += units
+    return (time.perf_counter() - start) / count
+
+async def main(count: int) -> None:
+    print(f"{count} issuances")
+    baseline = await issue_loop(CurrencyManager(), count)
+    limited = await issue_loop(CurrencyManager(growth_limiter=make_limiter()), count)
+    print(f"  issue without limiter   {baseline * 1e6:>8.2f} us/issue")
+    print(f"  issue with limiter      {limited * 1e6:>8.2f} us/issue")
+    print(f"  limiter overhead        {(limited - baseline) * 1e6:>8.2f} us/issue")
+    print(f"  check + record, sliding {sliding_loop(count) * 1e6:>8.2f} us/issue")
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000))
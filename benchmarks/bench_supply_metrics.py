@@ -0,0 +1,76 @@
+"""
+Measures supply metric queries against the length of the supply history.
+
+Records N supply levels one second apart, then times get_supply_metrics
+with no range and over a range covering half the history, next to the
+filter-and-rescan of a plain list that the metrics used to be computed
+with.
+
+Usage:
+    python benchmarks/bench_supply_metrics.py [num_points] [queries]
+"""
+import asyncio
+import logging
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.amount import SCALE
+from app.core.analytics import AnalyticsManager
+
+def scan(history, start_time, end_time):
+    amounts = [
+        amount for ts, amount in history
+        if (not start_time or ts >= start_time) and (not end_time or ts <= end_time)
+    ]
+    return amounts[-1], max(amounts), min(amounts), sum(amounts) // len(amounts)
+
+async def main(num_points: int, queries: int) -> None:
+    analytics = AnalyticsManager()
+    start = datetime(2024, 1, 1)
+    history = [
+        (start + timedelta(seconds=i), random.randrange(10 ** 6, 10 ** 9) * SCALE)
+        for i in range(num_points)
+    ]
+    for timestamp, units in history:
+        analytics._supply_history.append(timestamp, units)
+    ranges = []
+    for _ in range(queries):
+        offset = random.randrange(num_points // 2)
+        ranges.append((start + timedelta(seconds=offset), start + timedelta(seconds=offset + num_points // 2)))
+        
+    timings = {}
+    begin = time.perf_counter()
+    for _ in range(queries):
+        await analytics.get_supply_metrics()
+    timings["series, all"] = time.perf_counter() - begin
+    begin = time.perf_counter()
+    for start_time, end_time in ranges:
+        await analytics.get_supply_metrics(start_time, end_time)
+    timings["series, half range"] = time.perf_counter() - begin
+    
+    scans = max(queries // 100, 1)
+    begin = time.perf_counter()
+    for _ in range(scans):
+        scan(history, None, None)
+    timings["scan, all"] = (time.perf_counter() - begin) * queries / scans
+    begin = time.perf_counter()
+    for start_time, end_time in ranges[:scans]:
+        scan(history, start_time, end_time)
+    timings["scan, half range"] = (time.perf_counter() - begin) * queries / scans
+    
+    print(f"{num_points} supply points, {queries} queries")
+    for name, elapsed in timings.items():
+        print(f"  {name:<20} {elapsed / queries * 1e6:>12.2f} us/query")
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    ))
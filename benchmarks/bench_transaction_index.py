@@ -0,0 +1,82 @@
+"""
+Compares indexed TransactionManager lookups against the previous full scans.
+
+Usage:
+    python benchmarks/bench_transaction_index.py [num_transactions]
+"""
+import asyncio
+import logging
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.transactions import TransactionManager, TransactionType
+
+NUM_ADDRESSES = 10_000
+NUM_QUERIES = 200
+
+def scan_by_address(manager: TransactionManager, address: str):
+    """Baseline: full ledger scan, as done before the indexes existed"""
+    return [
+        tx for tx in manager._transactions.values()
+        if tx.sender == address or tx.recipient == address
+    ]
+
+def scan_history(manager: TransactionManager, start_time, end_time):
+    """Baseline: full ledger scan followed by a sort of the matches"""
+    transactions = [
+        tx for tx in manager._transactions.values()
+        if start_time <= tx.timestamp <= end_time
+    ]
+    return sorted(transactions, key=lambda x: x.timestamp)
+
+def report(label: str, elapsed: float) -> None:
+    print(f"{label:<30} {elapsed / NUM_QUERIES * 1e6:>12.1f} us/query")
+
+async def main(num_transactions: int) -> None:
+    manager = TransactionManager()
+    for _ in range(num_transactions):
+        tx = await manager.create_transaction(
+            type=TransactionType.TRANSFER,
+            amount=Decimal("1"),
+            sender=f"addr-{random.randrange(NUM_ADDRESSES)}",
+            recipient=f"addr-{random.randrange(NUM_ADDRESSES)}"
+        )
+        await manager.execute_transaction(tx.id)
+        
+    first = manager._time_index.keys[0]
+    last = manager._time_index.keys[-1]
+    window = (last - first) / 100
+    addresses = [f"addr-{random.randrange(NUM_ADDRESSES)}" for _ in range(NUM_QUERIES)]
+    starts = [first + (last - first - window) * random.random() for _ in range(NUM_QUERIES)]
+    
+    print(f"{num_transactions} transactions, {NUM_ADDRESSES} addresses")
+    
+    start = time.perf_counter()
+    for address in addresses:
+        scan_by_address(manager, address)
+    report("address lookup (scan)", time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    for address in addresses:
+        await manager.get_transactions_by_address(address)
+    report("address lookup (index)", time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    for s in starts:
+        scan_history(manager, s, s + window)
+    report("1% time range (scan + sort)", time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    for s in starts:
+        await manager.get_transaction_history(s, s + window)
+    report("1% time range (index)", time.perf_counter() - start)
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000))
@@ -0,0 +1,65 @@
+"""
+Measures memory per executed transaction with and without the compact store.
+
+Both figures include the address and time indexes kept by TransactionManager.
+
+Usage:
+    python benchmarks/bench_transaction_memory.py [num_transactions] [model|compact ...]
+
+The default is 10M transactions. The model baseline needs roughly 1 KB per
+transaction, so run it with a smaller count on machines with less memory;
+bytes per transaction are stable across sizes.
+"""
+import gc
+import logging
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.compact_store import CompactTransactionStore
+from app.core.transactions import Transaction, TransactionManager, TransactionType, TransactionStatus
+
+NUM_ADDRESSES = 100_000
+
+def populate(manager: TransactionManager, count: int) -> None:
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        manager.restore_transaction(Transaction(
+            id=str(uuid.uuid4()),
+            type=TransactionType.TRANSFER,
+            amount=Decimal(random.randrange(1, 10_000_000)) / 100,
+            sender=f"addr-{random.randrange(NUM_ADDRESSES)}",
+            recipient=f"addr-{random.randrange(NUM_ADDRESSES)}",
+            timestamp=start + timedelta(milliseconds=i),
+            status=TransactionStatus.COMPLETED,
+            metadata={}
+        ))
+
+def measure(mode: str, count: int) -> None:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    manager = TransactionManager(store=CompactTransactionStore() if mode == "compact" else None)
+    populate(manager, count)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{mode:<8} {count:>10} tx  {current / count:>8.1f} bytes/tx  "
+        f"{current / 2 ** 20:>9.1f} MiB  ({time.perf_counter() - started:.0f}s)"
+    )
+    del manager
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    for mode in sys.argv[2:] or ["model", "compact"]:
+        measure(mode, count)
@@ -0,0 +1,81 @@
+"""
+Pays out a file of rewards in bulk.
+
+Reads a JSON Lines file with one {"user_id", "reward_type", "metadata"}
+object per line and credits the rewards to the distribution state kept in
+--state, in chunks. Each chunk is checkpointed together with the state, so
+an interrupted run started again with the same arguments resumes where it
+stopped, and a finished run pays nothing twice.
+
+Usage:
+    python scripts/distribute_rewards.py rewards.jsonl --state distribution.json
+        [--checkpoint PATH] [--chunk-size N]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.distribution import DistributionManager
+from app.core.reward_jobs import RewardDistributionJob
+from app.core.config import get_settings
+
+def report(progress: dict) -> None:
+    percent = 100 * progress["bytes_read"] / max(progress["total_bytes"], 1)
+    print(
+        f"{percent:6.2f}%  {progress['lines']} lines  {progress['paid']} paid  "
+        f"{progress['failed']} failed  {progress['amount']} DAC",
+        file=sys.stderr
+    )
+
+async def distribute(input_path: str, state_path: str, checkpoint_path: str, chunk_size: int) -> dict:
+    distribution = DistributionManager()
+    if os.path.exists(state_path):
+        with open(state_path) as f:
+            distribution.load_state(json.load(f))
+            
+    # A checkpoint's own copy of the state takes precedence when resuming
+    job = RewardDistributionJob(
+        distribution,
+        input_path,
+        checkpoint_path=checkpoint_path,
+        chunk_size=chunk_size,
+        checkpoint_state=True,
+        progress=report
+    )
+    result = await job.run()
+    if result["status"] == "completed":
+        tmp_path = f"{state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(distribution.export_state(), f)
+        os.replace(tmp_path, state_path)
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pay out a JSON Lines file of rewards")
+    parser.add_argument("input", help="JSON Lines file of rewards")
+    parser.add_argument("--state", required=True, help="Distribution state file, updated when the run completes")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <input>.checkpoint)")
+    parser.add_argument("--chunk-size", type=int, default=get_settings().REWARD_JOB_CHUNK_SIZE)
+    args = parser.parse_args()
+    
+    result = asyncio.run(distribute(
+        args.input,
+        args.state,
+        args.checkpoint or f"{args.input}.checkpoint",
+        args.chunk_size
+    ))
+    if result["status"] != "completed":
+        print(f"Reward distribution failed: {result['error']}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Paid {result['paid']} rewards, {result['amount']} DAC; {result['failed']} failed")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
@@ -0,0 +1,43 @@
+import pytest
+from decimal import Decimal, ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_FLOOR, ROUND_CEILING, ROUND_DOWN
+
+from app.core.amount import floats_to_units, from_units, mul_ratio, positive_units, to_units
+from app.core.distribution import DistributionManager, RewardType
+from app.core.reserves import ReserveManager, ReserveType
+
+def test_units_round_trip():
+    for amount in ("0", "1", "2.5", "0.000000000000000001", "123456789012345678.123456789012345678", "-7.25"):
+        assert from_units(to_units(Decimal(amount))) == Decimal(amount)
+    assert str(from_units(to_units(Decimal("1.500")))) == "1.5"
+
+def test_unrepresentable_amounts_are_rejected():
+    with pytest.raises(ValueError):
+        to_units(Decimal("0.0000000000000000001"))
+    with pytest.raises(ValueError):
+        to_units(Decimal("NaN"))
+    assert to_units(Decimal("0.0000000000000000015"), rounding=ROUND_HALF_EVEN) == 2
+    assert positive_units(Decimal("0.0000000000000000001")) is None
+    assert positive_units(Decimal("-1")) is None
+
+def test_mul_ratio_matches_decimal_rounding():
+    for units in (-7, -5, -3, -1, 1, 3, 5, 7, 10, 15, 25):
+        for rounding in (ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_FLOOR, ROUND_CEILING, ROUND_DOWN):
+            expected = (Decimal(units) / 2).to_integral_value(rounding=rounding)
+            assert mul_ratio(units, 1, 2, rounding) == int(expected)
+
+def test_floats_convert_at_their_exact_value():
+    values = [0.0, 0.1, 2.5e-19, 1.5e-18, 2.5e-18, 1e-30, 123456.789, 3.3 * 0.7 * 0.3, 1e30]
+    for rounding in (ROUND_HALF_EVEN, ROUND_FLOOR, ROUND_CEILING):
+        assert floats_to_units(values, rounding) == [to_units(Decimal(value), rounding=rounding) for value in values]
+
+@pytest.mark.asyncio
+async def test_managers_keep_results_exact():
+    reserves = ReserveManager()
+    await reserves.add_to_reserves(ReserveType.COMPUTATIONAL, Decimal("100"))
+    await reserves.add_to_reserves(ReserveType.STORAGE, Decimal("50"))
+    await reserves.add_to_reserves(ReserveType.ENGAGEMENT, Decimal("0.1"))
+    assert await reserves.get_total_reserves() == Decimal("55.03")
+    
+    distribution = DistributionManager()
+    reward = await distribution.calculate_reward("alice", RewardType.CONTRIBUTION, {"impact": 1.1})
+    assert reward == Decimal("1.65")
@@ -0,0 +1,79 @@
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.deps import get_analytics_manager, get_current_user
+from app.core.analytics import AnalyticsManager
+from app.core.rollups import RollupStore
+
+START = datetime(2024, 3, 1)
+
+def test_ranges_are_tiled_with_the_coarsest_buckets():
+    store = RollupStore()
+    for minute in range(3 * 1440):
+        store.add(START + timedelta(minutes=minute), "value", minute)
+        
+    # 10:17:30 on day one to 03:42:10 on day three
+    tiles = store.tiles(
+        START + timedelta(hours=10, minutes=17, seconds=30),
+        START + timedelta(days=2, hours=3, minutes=42, seconds=10)
+    )
+    
+    resolutions = [resolution for _, resolution, _ in tiles]
+    assert resolutions == ["minute"] * 43 + ["hour"] * 13 + ["day"] + ["hour"] * 3 + ["minute"] * 43
+    assert [start for start, _, _ in tiles] == sorted(start for start, _, _ in tiles)
+    minutes = range(10 * 60 + 17, 2 * 1440 + 3 * 60 + 43)
+    assert sum(bucket["value"].sum for _, _, bucket in tiles) == sum(minutes)
+    assert [resolution for _, resolution, _ in store.tiles()] == ["day"] * 3
+
+def test_ranges_older_than_a_retention_are_rounded_out():
+    store = RollupStore({"minute": 3600, "hour": 7 * 86400})
+    for minute in range(3 * 1440):
+        store.add(START + timedelta(minutes=minute), "value", 1)
+    now = START + timedelta(days=3)
+    
+    assert len(store.buckets(START, now, "minute")) == 61
+    # Minutes from day one are gone, so the range is widened to whole hours
+    tiles = store.tiles(START + timedelta(hours=10, minutes=17), START + timedelta(hours=11, minutes=5), now)
+    assert [resolution for _, resolution, _ in tiles] == ["hour", "hour"]
+    assert sum(bucket["value"].count for _, _, bucket in tiles) == 120
+
+@pytest.mark.asyncio
+async def test_transaction_metrics_by_hour():
+    analytics = AnalyticsManager()
+    for hour, user_id, amount in [(9, "alice", "10"), (9, "bob", "5"), (14, "alice", "2.5"), (33, "carol", "1")]:
+        await analytics.record_transaction(Decimal(amount), user_id, START + timedelta(hours=hour))
+        
+    metrics = await analytics.get_transaction_metrics(
+        START + timedelta(hours=9), START + timedelta(hours=14, minutes=59), resolution="hour"
+    )
+    
+    assert metrics["total_volume"] == Decimal("17.5")
+    assert metrics["total_active_users"] == 2
+    assert [(point["timestamp"].hour, point["volume"], point["transaction_count"], point["active_users"])
+            for point in metrics["history"]] == [(9, Decimal("15"), 2, 2), (14, Decimal("2.5"), 1, 1)]
+    everything = await analytics.get_transaction_metrics()
+    assert everything["average_daily_volume"] == Decimal("9.25")
+    assert everything["average_daily_users"] == 1.5
+    with pytest.raises(ValueError):
+        await analytics.get_transaction_metrics(START, START + timedelta(days=30), resolution="minute")
+
+def test_metrics_endpoints_take_a_resolution():
+    analytics = AnalyticsManager()
+    app.dependency_overrides[get_current_user] = lambda: "alice"
+    app.dependency_overrides[get_analytics_manager] = lambda: analytics
+    try:
+        with TestClient(app) as client:
+            client.portal.call(analytics.record_reserve_state, {"compute": Decimal("40")})
+            client.portal.call(analytics.record_reserve_state, {"compute": Decimal("60")})
+            reserves = client.get("/api/v1/analytics/reserves", params={"resolution": "hour"}).json()
+            unknown = client.get("/api/v1/analytics/supply", params={"resolution": "week"})
+    finally:
+        app.dependency_overrides.clear()
+        
+    assert Decimal(reserves["average_reserves"]["compute"]) == Decimal("50")
+    assert len(reserves["history"]) == 1
+    assert Decimal(reserves["history"][0]["current_reserves"]["compute"]) == Decimal("60")
+    assert unknown.status_code == 400
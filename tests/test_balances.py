@@ -0,0 +1,91 @@
+import pytest
+from decimal import Decimal
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.balances import BalanceBook
+from app.core.transactions import TransactionManager, TransactionType, TransactionStatus
+from app.models.base import Base
+from app.models.currency import Balance
+
+async def _execute(manager, type, amount, recipient, sender=None):
+    transaction = await manager.create_transaction(
+        type=type,
+        amount=Decimal(amount),
+        recipient=recipient,
+        sender=sender
+    )
+    return await manager.execute_transaction(transaction.id), transaction
+
+@pytest.mark.asyncio
+async def test_transactions_update_balances_by_type():
+    book = BalanceBook()
+    manager = TransactionManager(balances=book)
+    
+    await _execute(manager, TransactionType.ISSUANCE, "100", "alice", sender="DACR")
+    await _execute(manager, TransactionType.TRANSFER, "30", "bob", sender="alice")
+    await _execute(manager, TransactionType.BURN, "5", "DACR", sender="bob")
+    
+    assert book.get_balance("alice") == Decimal("70")
+    assert book.get_balance("bob") == Decimal("25")
+    assert book.get_balance("DACR") == Decimal("0")
+
+@pytest.mark.asyncio
+async def test_overdraft_is_rejected():
+    book = BalanceBook()
+    manager = TransactionManager(balances=book)
+    await _execute(manager, TransactionType.ISSUANCE, "10", "alice")
+    
+    executed, transaction = await _execute(manager, TransactionType.TRANSFER, "11", "bob", sender="alice")
+    
+    assert not executed
+    assert transaction.status == TransactionStatus.FAILED
+    assert book.get_balance("alice") == Decimal("10")
+    assert await manager.get_transactions_by_address("bob") == []
+
+@pytest.mark.asyncio
+async def test_batch_checks_running_balance():
+    manager = TransactionManager(balances=BalanceBook())
+    await _execute(manager, TransactionType.ISSUANCE, "10", "alice")
+    
+    results = await manager.create_and_execute_batch(
+        sender="alice",
+        transfers=[
+            SimpleNamespace(amount=Decimal(amount), recipient="bob", metadata=None)
+            for amount in ("6", "6", "4")
+        ]
+    )
+    
+    assert [result.error is None for result in results] == [True, False, True]
+
+@pytest.mark.asyncio
+async def test_balances_roll_back_when_recording_fails():
+    class FailingPersistence:
+        async def record_many(self, transactions):
+            raise IOError("disk full")
+            
+    book = BalanceBook()
+    manager = TransactionManager(balances=book)
+    await _execute(manager, TransactionType.ISSUANCE, "10", "alice")
+    manager._persistence = FailingPersistence()
+    
+    executed, _ = await _execute(manager, TransactionType.TRANSFER, "4", "bob", sender="alice")
+    
+    assert not executed
+    assert book.get_balance("alice") == Decimal("10")
+    assert book.get_balance("bob") == Decimal("0")
+
+@pytest.mark.asyncio
+async def test_balances_are_written_through(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ledger.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    manager = TransactionManager(balances=BalanceBook(session_factory=session_factory))
+    
+    await _execute(manager, TransactionType.ISSUANCE, "10", "alice")
+    await _execute(manager, TransactionType.TRANSFER, "2.5", "bob", sender="alice")
+    
+    with session_factory() as session:
+        assert session.get(Balance, "alice").amount == Decimal("7.5")
+        assert session.get(Balance, "bob").amount == Decimal("2.5")
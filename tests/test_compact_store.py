@@ -0,0 +1,59 @@
+import pytest
+from decimal import Decimal
+from datetime import datetime
+
+from app.core.compact_store import CompactTransactionStore
+from app.core.transactions import (
+    Transaction,
+    TransactionManager,
+    TransactionType,
+    TransactionStatus
+)
+
+def _transaction(id, amount, sender, metadata=None):
+    return Transaction(
+        id=id,
+        type=TransactionType.TRANSFER,
+        amount=Decimal(amount),
+        sender=sender,
+        recipient="bob",
+        timestamp=datetime(2024, 5, 1, 12, 30, 15, 123456),
+        status=TransactionStatus.COMPLETED,
+        metadata=metadata or {}
+    )
+
+def test_rows_round_trip_exactly():
+    store = CompactTransactionStore(capacity=2)
+    transactions = [
+        _transaction("5f0c7f38-2f0e-4f6c-9d1b-0f6a3c1c2b10", "12.345678", "alice", {"memo": "x"}),
+        _transaction("9a1d2c3b-4e5f-4a6b-8c7d-9e0f1a2b3c4d", "0.0000000001", None),
+        _transaction("legacy-id", "1e30", "alice")
+    ]
+    rows = [store.add(tx) for tx in transactions]
+    
+    assert len(store) == 3
+    for row, tx in zip(rows, transactions):
+        assert store[row] == tx
+        assert store.get(tx.id) == tx
+    assert store.get("00000000-0000-0000-0000-000000000000") is None
+    assert "legacy-id" in store
+
+@pytest.mark.asyncio
+async def test_transaction_manager_with_compact_store():
+    manager = TransactionManager(store=CompactTransactionStore())
+    for i in range(5):
+        tx = await manager.create_transaction(
+            type=TransactionType.TRANSFER,
+            amount=Decimal(i + 1),
+            sender="alice",
+            recipient=f"user-{i % 2}"
+        )
+        await manager.execute_transaction(tx.id)
+        
+    history = await manager.get_transaction_history()
+    assert [tx.amount for tx in history] == [Decimal(i + 1) for i in range(5)]
+    assert [tx.amount for tx in await manager.get_transactions_by_address("user-1")] == [Decimal(2), Decimal(4)]
+    assert await manager.get_transaction(history[2].id) == history[2]
+    
+    resumed = manager.iter_transactions(after=(history[1].timestamp, history[1].id), chunk_size=2)
+    assert [tx.id for tx in resumed] == [tx.id for tx in history[2:]]
@@ -1,10 +1,18 @@
 import pytest
+import json
+import time
 from decimal import Decimal
 from fastapi.testclient import TestClient
 from datetime import datetime
 
 from app.main import app
+from app.deps import get_current_user, get_currency_manager, get_transaction_manager
+from app.core.amount import to_units
+from app.core.balances import BalanceBook
 from app.core.currency import CurrencyManager
+from app.core.growth import SupplyGrowthLimiter
+from app.core.persistence import DurabilityMode, LedgerPersistence
+from app.core.reserves import ReserveManager, ReserveType
 from app.core.transactions import TransactionManager
 
 client = TestClient(app)
@@ -46,3 +54,74 @@ async def test_transaction_creation(transaction_manager):
     assert transaction.id is not None
     assert transaction.amount == Decimal("100")
     assert transaction.status == "PENDING"
+
+@pytest.mark.asyncio
+async def test_issuance_is_capped_by_live_reserve_ratio():
+    reserves = ReserveManager()
+    currency_manager = CurrencyManager(reserves=reserves, min_reserve_ratio=Decimal("0.95"))
+    await reserves.add_to_reserves(ReserveType.COMPUTATIONAL, Decimal("250"))
+    
+    # 250 * 0.4 = 100 weighted reserves back at most 100 / 0.95 DAC
+    assert await currency_manager.issue_currency(Decimal("105"), "test")
+    assert not await currency_manager.issue_currency(Decimal("0.27"), "test")
+    assert await currency_manager.get_reserve_ratio() == Decimal("0.952380952380952381")
+    
+    await reserves.add_to_reserves(ReserveType.STORAGE, Decimal("10"))
+    assert await currency_manager.issue_currency(Decimal("0.27"), "test")
+    assert await currency_manager.burn_currency(Decimal("105.27"), "test")
+    assert await currency_manager.get_reserve_ratio() is None
+
+@pytest.mark.asyncio
+async def test_issuance_is_limited_by_supply_growth():
+    limiter = SupplyGrowthLimiter(0.1, window_seconds=3600, num_buckets=6, min_allowance=100)
+    currency_manager = CurrencyManager(growth_limiter=limiter)
+    
+    assert await currency_manager.issue_currency(Decimal("100"), "test")
+    assert not await currency_manager.issue_currency(Decimal("1"), "test")
+    
+    # Once the first issuance leaves the window, 10% of a larger supply is allowed
+    now = time.time() + 3600
+    assert limiter.allows(to_units(Decimal("250")), to_units(Decimal("2500")), now)
+    assert not limiter.allows(to_units(Decimal("250.01")), to_units(Decimal("2500")), now)
+
+def test_growth_window_survives_restart():
+    limiter = SupplyGrowthLimiter(0.1, window_seconds=3600, num_buckets=6)
+    limiter.record(to_units(Decimal("5")), now=1000)
+    limiter.record(to_units(Decimal("7")), now=2000)
+    
+    restored = SupplyGrowthLimiter(0.1, window_seconds=3600, num_buckets=6)
+    restored.load_state(json.loads(json.dumps(limiter.export_state())))
+    
+    assert restored.issued(now=2000) == Decimal("12")
+    assert restored.issued(now=4500) == Decimal("7")
+    assert restored.issued(now=6000) == Decimal("0")
+
+def test_failed_issuance_is_reverted_and_not_cached():
+    def unavailable():
+        raise RuntimeError("db down")
+        
+    limiter = SupplyGrowthLimiter(Decimal("0.1"), min_allowance=100)
+    currency_manager = CurrencyManager(growth_limiter=limiter)
+    balances = BalanceBook()
+    transaction_manager = TransactionManager(
+        persistence=LedgerPersistence(unavailable, mode=DurabilityMode.SYNC),
+        balances=balances
+    )
+    app.dependency_overrides[get_current_user] = lambda: "admin"
+    app.dependency_overrides[get_currency_manager] = lambda: currency_manager
+    app.dependency_overrides[get_transaction_manager] = lambda: transaction_manager
+    request = {"amount": "5", "recipient": "alice", "reason": "test"}
+    try:
+        with TestClient(app) as test_client:
+            responses = [
+                test_client.post("/api/v1/currency/issue", json=request, headers={"Idempotency-Key": "k1"})
+                for _ in range(2)
+            ]
+    finally:
+        app.dependency_overrides.clear()
+        
+    # The retry executes again rather than replaying the failure
+    assert [response.status_code for response in responses] == [500, 500]
+    assert currency_manager._supply_units() == 0
+    assert limiter.issued() == 0
+    assert balances.get_balance("alice") == 0
@@ -0,0 +1,44 @@
+import pytest
+from decimal import Decimal
+
+from app.core.amount import to_units
+from app.core.distribution import DistributionManager, RewardEngine, RewardTier, RewardType
+
+def test_tiers_do_not_depend_on_threshold_order():
+    engine = RewardEngine(
+        {tier: to_units(1) for tier in RewardTier},
+        {
+            RewardTier.PREMIUM: to_units(10000),
+            RewardTier.BASIC: to_units(0),
+            RewardTier.ADVANCED: to_units(1000),
+            RewardTier.INTERMEDIATE: to_units(100)
+        }
+    )
+    
+    assert engine.tier_for(to_units(99)) == RewardTier.BASIC
+    assert engine.tier_for(to_units(100)) == RewardTier.INTERMEDIATE
+    assert engine.tier_for(to_units(9999)) == RewardTier.ADVANCED
+    assert engine.tier_for(to_units(10 ** 6)) == RewardTier.PREMIUM
+
+def test_memoized_rewards_stay_exact():
+    engine = RewardEngine({tier: to_units("2.5") for tier in RewardTier}, {RewardTier.BASIC: 0}, max_entries=2)
+    for _ in range(2):
+        assert engine.reward(RewardTier.BASIC, RewardType.ENGAGEMENT, {"duration": 1}) == to_units("2.500694444444444444")
+        assert engine.reward(RewardTier.BASIC, RewardType.CONTRIBUTION, {"impact": 1.1}) == to_units("4.125")
+        assert engine.reward(RewardTier.BASIC, RewardType.MILESTONE, {}) == to_units(5)
+    with pytest.raises((ArithmeticError, TypeError, ValueError)):
+        engine.reward(RewardTier.BASIC, RewardType.MILESTONE, {"importance": [1]})
+
+@pytest.mark.asyncio
+async def test_schedule_changes_recompile_the_engine():
+    distribution = DistributionManager()
+    metadata = {"complexity": 2}
+    assert await distribution.calculate_reward("alice", RewardType.TASK_COMPLETION, metadata) == Decimal("2")
+    
+    distribution.update_schedule(
+        rates={RewardTier.BASIC: Decimal("1.5")},
+        thresholds={RewardTier.INTERMEDIATE: Decimal("3")}
+    )
+    assert await distribution.calculate_reward("alice", RewardType.TASK_COMPLETION, metadata) == Decimal("3")
+    assert await distribution.distribute_reward("alice", Decimal("3"), RewardType.TASK_COMPLETION)
+    assert await distribution.get_user_tier("alice") == RewardTier.INTERMEDIATE
@@ -0,0 +1,115 @@
+import pytest
+import time
+from decimal import Decimal
+
+from app.core.balances import BalanceBook
+from app.core.currency import CurrencyManager
+from app.core.expiry import EXPIRY_REASON, ExpiryManager, TimingWheel
+from app.core.ledger_log import LedgerLog
+from app.core.transactions import TransactionManager, TransactionType
+
+LIFETIMES = {TransactionType.ISSUANCE: 3600, TransactionType.REWARD: 600}
+
+async def _credit(currency_manager, transaction_manager, type, amount, recipient):
+    if type == TransactionType.ISSUANCE:
+        await currency_manager.issue_currency(Decimal(amount), "test")
+    transaction = await transaction_manager.create_transaction(
+        type=type,
+        amount=Decimal(amount),
+        recipient=recipient,
+        sender="DACR"
+    )
+    assert await transaction_manager.execute_transaction(transaction.id)
+    return transaction
+
+def test_wheel_returns_keys_at_their_due_tick():
+    # Spans 16 ticks, so later keys are refiled from the top level
+    wheel = TimingWheel(start=0, bits=2, levels=2)
+    dues = {"a": 0, "b": 3, "c": 4, "d": 5, "e": 15, "f": 17, "g": 40, "h": 40}
+    for key, due in dues.items():
+        wheel.add(key, due)
+        
+    fired = {}
+    for tick in range(50):
+        for key in wheel.advance(tick):
+            fired[key] = tick
+            
+    assert fired == dues
+    assert len(wheel) == 0
+    # Overdue keys come out of the next advance
+    wheel.add("late", 10)
+    assert wheel.advance(1000) == ["late"]
+
+@pytest.mark.asyncio
+async def test_oldest_lots_are_spent_first_and_the_rest_burned():
+    currency_manager = CurrencyManager()
+    expiry = ExpiryManager(currency_manager, LIFETIMES)
+    book = BalanceBook()
+    transaction_manager = TransactionManager(balances=book, expiry=expiry)
+    
+    await _credit(currency_manager, transaction_manager, TransactionType.ISSUANCE, "100", "alice")
+    await _credit(currency_manager, transaction_manager, TransactionType.REWARD, "50", "alice")
+    transfer = await transaction_manager.create_transaction(
+        type=TransactionType.TRANSFER,
+        amount=Decimal("120"),
+        recipient="bob",
+        sender="alice"
+    )
+    await transaction_manager.execute_transaction(transfer.id)
+    
+    # The issuance went first, leaving 30 of the reward, which expires sooner
+    assert [lot["amount"] for lot in expiry.get_expiring("alice")] == [Decimal("30")]
+    assert await expiry.expire(transaction_manager, now=time.time() + 60) == Decimal("0")
+    assert await expiry.expire(transaction_manager, now=time.time() + 700) == Decimal("30")
+    
+    assert book.get_balance("alice") == Decimal("0")
+    assert book.get_balance("bob") == Decimal("120")  # Transferred DAC carries no lot
+    assert await currency_manager.get_supply() == Decimal("70")
+    burn = (await transaction_manager.get_transactions_by_address("alice"))[-1]
+    assert burn.type == TransactionType.BURN
+    assert burn.metadata["reason"] == EXPIRY_REASON
+    assert expiry.lot_count == 0
+    assert await expiry.expire(transaction_manager, now=time.time() + 7200) == Decimal("0")
+
+@pytest.mark.asyncio
+async def test_expired_lots_stay_burned_after_recovery(tmp_path):
+    ledger_log = LedgerLog(str(tmp_path), snapshot_interval=1000)
+    currency_manager = CurrencyManager()
+    expiry = ExpiryManager(currency_manager, LIFETIMES)
+    ledger_log.register_state("currency", currency_manager)
+    ledger_log.register_state("expiry", expiry)
+    await ledger_log.start()
+    transaction_manager = TransactionManager(ledger_log=ledger_log, balances=BalanceBook(), expiry=expiry)
+    
+    await _credit(currency_manager, transaction_manager, TransactionType.REWARD, "5", "alice")
+    await _credit(currency_manager, transaction_manager, TransactionType.ISSUANCE, "10", "bob")
+    assert await expiry.expire(transaction_manager, now=time.time() + 700) == Decimal("5")
+    await ledger_log._log.close()
+    
+    recovered_log = LedgerLog(str(tmp_path), snapshot_interval=1000)
+    recovered_expiry = ExpiryManager(CurrencyManager(), LIFETIMES)
+    recovered_log.register_state("expiry", recovered_expiry)
+    await recovered_log.recover()
+    
+    assert recovered_expiry.get_expiring("alice") == []
+    assert [lot["amount"] for lot in recovered_expiry.get_expiring("bob")] == [Decimal("10")]
+
+@pytest.mark.asyncio
+async def test_lots_of_failed_burns_are_retried(monkeypatch):
+    currency_manager = CurrencyManager()
+    expiry = ExpiryManager(currency_manager, LIFETIMES)
+    book = BalanceBook()
+    transaction_manager = TransactionManager(balances=book, expiry=expiry)
+    await _credit(currency_manager, transaction_manager, TransactionType.ISSUANCE, "10", "alice")
+    
+    async def fail(transactions):
+        raise IOError("disk full")
+        
+    with monkeypatch.context() as patched:
+        patched.setattr(transaction_manager, "execute_batch", fail)
+        assert await expiry.expire(transaction_manager, now=time.time() + 7200) == Decimal("0")
+    assert [lot["amount"] for lot in expiry.get_expiring("alice")] == [Decimal("10")]
+    
+    assert await expiry.expire(transaction_manager, now=time.time() + 7260) == Decimal("10")
+    assert book.get_balance("alice") == Decimal("0")
+    assert await currency_manager.get_supply() == Decimal("0")
@@ -0,0 +1,104 @@
+import pytest
+import asyncio
+from decimal import Decimal
+
+from app.core.idempotency import (
+    IdempotencyCache,
+    IdempotencyConflict,
+    IdempotencyRecord,
+    InMemoryIdempotencyBackend,
+    SQLiteIdempotencyBackend
+)
+from app.core.transactions import TransactionManager, TransactionType
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "sqlite":
+        backend = SQLiteIdempotencyBackend(str(tmp_path / "idempotency.db"))
+    else:
+        backend = InMemoryIdempotencyBackend()
+    return IdempotencyCache(backend)
+
+@pytest.mark.asyncio
+async def test_duplicate_returns_original_without_reexecuting(cache):
+    manager = TransactionManager()
+    
+    async def transfer():
+        transaction = await manager.create_transaction(
+            type=TransactionType.TRANSFER,
+            amount=Decimal("5"),
+            sender="alice",
+            recipient="bob"
+        )
+        await manager.execute_transaction(transaction.id)
+        return transaction
+        
+    first = await cache.execute("alice:transfer:k1", "body", transfer)
+    second = await cache.execute("alice:transfer:k1", "body", transfer)
+    
+    assert second["id"] == first.id
+    assert Decimal(second["amount"]) == first.amount
+    assert len(await manager.get_transactions_by_address("bob")) == 1
+    
+    with pytest.raises(IdempotencyConflict):
+        await cache.execute("alice:transfer:k1", "other body", transfer)
+
+@pytest.mark.asyncio
+async def test_failed_request_can_be_retried(cache):
+    manager = TransactionManager()
+    calls = []
+    
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("timeout")
+        return await manager.create_transaction(
+            type=TransactionType.ISSUANCE,
+            amount=Decimal("1"),
+            recipient="bob"
+        )
+        
+    with pytest.raises(RuntimeError):
+        await cache.execute("k2", "body", flaky)
+    result = await cache.execute("k2", "body", flaky)
+    assert result.recipient == "bob"
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_least_recently_used():
+    backend = InMemoryIdempotencyBackend(max_entries=2)
+    for key in ("a", "b"):
+        assert await backend.claim(key, "body", lease=60)
+        await backend.complete(key, "{}", ttl=60)
+    await backend.get("a")
+    assert await backend.claim("c", "body", lease=60)
+    await backend.complete("c", "{}", ttl=60)
+    
+    assert await backend.get("a") is not None
+    assert await backend.get("b") is None
+    
+    # In-flight claims are never evicted, however many keys complete meanwhile
+    assert await backend.claim("running", "body", lease=60)
+    for key in ("d", "e", "f"):
+        assert await backend.claim(key, "body", lease=60)
+        await backend.complete(key, "{}", ttl=60)
+    assert not await backend.claim("running", "body", lease=60)
+
+@pytest.mark.asyncio
+async def test_cancelled_request_releases_its_key(cache):
+    started = asyncio.Event()
+    
+    async def slow():
+        started.set()
+        await asyncio.sleep(60)
+        
+    task = asyncio.ensure_future(cache.execute("k3", "body", slow))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+        
+    async def quick():
+        return IdempotencyRecord(fingerprint="done", expires_at=0)
+        
+    assert (await cache.execute("k3", "body", quick)).fingerprint == "done"
@@ -0,0 +1,42 @@
+import pytest
+import asyncio
+from decimal import Decimal
+
+from app.core.ledger import ShardedLedger
+
+@pytest.mark.asyncio
+async def test_transfer_moves_balance_and_rejects_overdraft():
+    ledger = ShardedLedger(num_shards=8)
+    assert await ledger.credit("alice", Decimal("10"))
+    
+    assert await ledger.transfer("alice", "bob", Decimal("4"))
+    assert not await ledger.transfer("alice", "bob", Decimal("7"))
+    assert not await ledger.debit("bob", Decimal("-1"))
+    
+    assert ledger.get_balance("alice") == Decimal("6")
+    assert ledger.get_balance("bob") == Decimal("4")
+
+@pytest.mark.asyncio
+async def test_opposing_transfers_do_not_deadlock():
+    ledger = ShardedLedger(num_shards=4)
+    accounts = [f"addr-{i}" for i in range(16)]
+    for account in accounts:
+        ledger.apply_credit(account, Decimal("100"))
+        
+    async def transfer(sender, recipient):
+        async with ledger.locked(sender, recipient):
+            await asyncio.sleep(0)
+            ledger.apply_transfer(sender, recipient, Decimal("1"))
+            
+    await asyncio.wait_for(asyncio.gather(*(
+        transfer(a, b) for a in accounts for b in accounts if a != b
+    )), timeout=5)
+    
+    assert all(ledger.get_balance(account) == Decimal("100") for account in accounts)
+
+def test_state_round_trips():
+    ledger = ShardedLedger(num_shards=2)
+    ledger.apply_credit("alice", Decimal("1.5"))
+    restored = ShardedLedger(num_shards=16)
+    restored.load_state(ledger.export_state())
+    assert restored.get_balance("alice") == Decimal("1.5")
@@ -0,0 +1,145 @@
+import pytest
+import os
+from decimal import Decimal
+
+from app.core.currency import CurrencyManager
+from app.core.ledger_log import LedgerLog, SegmentedLog
+from app.core.reserves import ReserveManager, ReserveType
+from app.core.transactions import TransactionManager, TransactionStatus, TransactionType
+
+async def _issue(currency_manager, transaction_manager, amount, recipient):
+    await currency_manager.issue_currency(Decimal(amount), "test")
+    transaction = await transaction_manager.create_transaction(
+        type=TransactionType.ISSUANCE,
+        amount=Decimal(amount),
+        recipient=recipient,
+        sender="DACR"
+    )
+    await transaction_manager.execute_transaction(transaction.id)
+    return transaction
+
+@pytest.mark.asyncio
+async def test_segments_roll_and_reopen(tmp_path):
+    log = SegmentedLog(str(tmp_path), segment_size=256)
+    await log.start()
+    for i in range(20):
+        await log.append([f"record-{i}".encode()])
+    await log.close()
+    
+    assert len(list(tmp_path.glob("*.seg"))) > 1
+    
+    reopened = SegmentedLog(str(tmp_path), segment_size=256)
+    assert reopened.last_seq == 20
+    records = [(seq, payload.tobytes()) for seq, payload in reopened.iter_records(from_seq=15)]
+    assert records == [(seq, f"record-{seq - 1}".encode()) for seq in range(15, 21)]
+    
+    await reopened.append([b"record-20"])
+    assert reopened.last_seq == 21
+    await reopened.close()
+
+@pytest.mark.asyncio
+async def test_recovery_replays_only_tail(tmp_path):
+    ledger_log = LedgerLog(str(tmp_path), snapshot_interval=3)
+    currency_manager = CurrencyManager()
+    reserve_manager = ReserveManager()
+    ledger_log.register_state("currency", currency_manager)
+    ledger_log.register_state("reserves", reserve_manager)
+    await ledger_log.start()
+    transaction_manager = TransactionManager(ledger_log=ledger_log)
+    
+    await reserve_manager.add_to_reserves(ReserveType.STORAGE, Decimal("50"))
+    issued = [
+        await _issue(currency_manager, transaction_manager, "10", f"user-{i}")
+        for i in range(4)
+    ]
+    # Skip the final snapshot a clean shutdown would take, as after a crash
+    await ledger_log._log.close()
+    
+    recovered_log = LedgerLog(str(tmp_path), snapshot_interval=3)
+    recovered_currency = CurrencyManager()
+    recovered_reserves = ReserveManager()
+    recovered_log.register_state("currency", recovered_currency)
+    recovered_log.register_state("reserves", recovered_reserves)
+    recovered_transactions = TransactionManager()
+    
+    replayed = await recovered_log.recover(recovered_transactions)
+    
+    assert replayed == 1
+    assert await recovered_currency.get_supply() == Decimal("40")
+    assert (await recovered_reserves.get_reserve_status())["storage"] == Decimal("50")
+    restored = await recovered_transactions.get_transaction(issued[-1].id)
+    assert restored.amount == Decimal("10")
+    assert [tx.id for tx in recovered_log.iter_transactions()] == [tx.id for tx in issued]
+
+@pytest.mark.asyncio
+async def test_snapshot_between_issuance_and_its_record(tmp_path):
+    ledger_log = LedgerLog(str(tmp_path), snapshot_interval=2)
+    currency_manager = CurrencyManager()
+    ledger_log.register_state("currency", currency_manager)
+    await ledger_log.start()
+    transaction_manager = TransactionManager(ledger_log=ledger_log)
+    
+    # Supply is raised, then other records trigger a snapshot before the issuance is logged
+    await currency_manager.issue_currency(Decimal("10"), "test")
+    for _ in range(2):
+        reward = await transaction_manager.create_transaction(
+            type=TransactionType.REWARD, amount=Decimal("1"), recipient="bob", sender="DACR"
+        )
+        await transaction_manager.execute_transaction(reward.id)
+    issuance = await transaction_manager.create_transaction(
+        type=TransactionType.ISSUANCE, amount=Decimal("10"), recipient="alice", sender="DACR"
+    )
+    await transaction_manager.execute_transaction(issuance.id)
+    await ledger_log._log.close()
+    
+    recovered_log = LedgerLog(str(tmp_path), snapshot_interval=2)
+    recovered_currency = CurrencyManager()
+    recovered_log.register_state("currency", recovered_currency)
+    await recovered_log.recover()
+    
+    assert await recovered_currency.get_supply() == Decimal("10")
+
+@pytest.mark.asyncio
+async def test_failed_sync_discards_the_records(tmp_path, monkeypatch):
+    ledger_log = LedgerLog(str(tmp_path))
+    currency_manager = CurrencyManager()
+    ledger_log.register_state("currency", currency_manager)
+    await ledger_log.start()
+    transaction_manager = TransactionManager(ledger_log=ledger_log)
+    first = await _issue(currency_manager, transaction_manager, "10", "alice")
+    
+    fsync = os.fsync
+    def fail_once(fd):
+        monkeypatch.setattr(os, "fsync", fsync)
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "fsync", fail_once)
+    
+    lost = await _issue(currency_manager, transaction_manager, "5", "bob")
+    assert lost.status == TransactionStatus.FAILED
+    assert ledger_log._log.last_seq == 1
+    assert currency_manager.export_state()["total_supply"] == "10"
+    
+    last = await _issue(currency_manager, transaction_manager, "1", "carol")
+    assert ledger_log._log.last_seq == 2
+    await ledger_log._log.close()
+    
+    recovered_log = LedgerLog(str(tmp_path))
+    recovered_currency = CurrencyManager()
+    recovered_log.register_state("currency", recovered_currency)
+    await recovered_log.recover()
+    assert [tx.id for tx in recovered_log.iter_transactions()] == [first.id, last.id]
+    assert await recovered_currency.get_supply() == Decimal("11")
+
+@pytest.mark.asyncio
+async def test_empty_segment_is_recovered(tmp_path):
+    log = SegmentedLog(str(tmp_path), segment_size=256)
+    await log.append([b"record-0"])
+    await log.close()
+    # A crash between creating a segment and preallocating it
+    (tmp_path / "00000000000000000002.seg").touch()
+    
+    reopened = SegmentedLog(str(tmp_path), segment_size=256)
+    assert [payload.tobytes() for _, payload in reopened.iter_records()] == [b"record-0"]
+    await reopened.append([b"record-1"])
+    assert reopened.last_seq == 2
+    await reopened.close()
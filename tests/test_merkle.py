@@ -0,0 +1,98 @@
+import pytest
+from decimal import Decimal
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.deps import get_current_user
+from app.core.amount import to_units
+from app.core.merkle import MerkleSumTree, leaf_hash, node_hash, verify_proof
+from app.core.reserves import ReserveManager, ReserveType
+
+def test_incremental_updates_match_a_full_build():
+    tree = MerkleSumTree(capacity=2)
+    balances = {}
+    for i in range(50):
+        address, value = f"addr-{i % 13}", i * 10 ** 17
+        tree.update(address, value)
+        balances[address] = value
+        
+    rebuilt = MerkleSumTree()
+    rebuilt.load((address, balances[address]) for address in [f"addr-{i}" for i in range(13)])
+    
+    assert tree.root == rebuilt.root
+    assert tree.total == sum(balances.values())
+
+def test_batch_update_matches_single_updates():
+    single, batched = MerkleSumTree(capacity=2), MerkleSumTree(capacity=2)
+    entries = [(f"addr-{i % 37}", i * 3) for i in range(100)]
+    for key, value in entries:
+        single.update(key, value)
+    batched.update_many(entries)
+    
+    assert batched.root == single.root
+    assert batched.total == single.total
+    with pytest.raises(ValueError):
+        batched.update_many([("addr-1", 5), ("addr-2", -1)])
+    assert batched.get("addr-1") == single.get("addr-1")
+
+def test_proofs_verify_against_the_root():
+    tree = MerkleSumTree()
+    tree.load((f"addr-{i}", i) for i in range(100))
+    proof = tree.proof("addr-42")
+    
+    assert verify_proof("addr-42", 42, proof["index"], proof["siblings"], tree.root, tree.total)
+    assert not verify_proof("addr-42", 43, proof["index"], proof["siblings"], tree.root, tree.total)
+    assert not verify_proof("addr-43", 42, proof["index"], proof["siblings"], tree.root, tree.total)
+    assert tree.proof("unknown") is None
+
+def test_sibling_sums_cannot_be_shifted():
+    alice, bob = leaf_hash("alice", 5), leaf_hash("bob", 7)
+    honest = node_hash(alice, 5, bob, 7)
+    assert verify_proof("alice", 5, 0, [(bob, 7)], honest, 12)
+    assert verify_proof("bob", 7, 1, [(alice, 5)], honest, 12)
+    
+    # Each forged proof understates the other's sum so that both add up to 7
+    for root in (node_hash(alice, 5, bob, 2), node_hash(alice, 0, bob, 7)):
+        assert not (
+            verify_proof("alice", 5, 0, [(bob, 2)], root, 7)
+            and verify_proof("bob", 7, 1, [(alice, 0)], root, 7)
+        )
+    assert not verify_proof("alice", 5, 0, [(bob, -2)], node_hash(alice, 5, bob, -2), 3)
+
+@pytest.mark.asyncio
+async def test_reserve_root_tracks_weighted_reserves():
+    manager = ReserveManager()
+    await manager.add_to_reserves(ReserveType.COMPUTATIONAL, Decimal("100"))
+    await manager.upsert_reserve_item("gpu-pool-a", quantity=4, price=2.5, weight=1.0)
+    
+    assert manager.merkle_tree.total == to_units(await manager.get_total_reserves())
+
+def test_inclusion_proof_endpoint():
+    user = {"name": "proof-test"}
+    app.dependency_overrides[get_current_user] = lambda: user["name"]
+    try:
+        with TestClient(app) as client:
+            client.post(
+                "/api/v1/currency/issue",
+                json={"amount": "12.5", "recipient": "proof-test", "reason": "test"}
+            )
+            roots = client.get("/api/v1/reserves/proof").json()
+            proof = client.get("/api/v1/reserves/proof/proof-test").json()
+            forbidden = client.get("/api/v1/reserves/proof/nobody")
+            user["name"] = "admin"
+            missing = client.get("/api/v1/reserves/proof/nobody")
+    finally:
+        app.dependency_overrides.clear()
+        
+    siblings = [(bytes.fromhex(node["hash"]), node["sum"]) for node in proof["siblings"]]
+    assert proof["root"] == roots["liabilities"]["root"]
+    assert Decimal(proof["balance"]) >= Decimal("12.5")
+    assert verify_proof(
+        "proof-test", proof["units"], proof["index"], siblings, bytes.fromhex(proof["root"]), proof["total_units"],
+        bytes.fromhex(proof["salt"])
+    )
+    assert not verify_proof(
+        "proof-test", proof["units"], proof["index"], siblings, bytes.fromhex(proof["root"]), proof["total_units"]
+    )
+    assert forbidden.status_code == 403
+    assert missing.status_code == 404
@@ -0,0 +1,153 @@
+import pytest
+import json
+from decimal import Decimal
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.persistence import LedgerPersistence, DurabilityMode
+from app.core.transactions import TransactionManager, TransactionType
+from app.models.base import Base
+from app.models.currency import Transaction as TransactionRecord
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ledger.db'}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+def _count_rows(session_factory):
+    with session_factory() as session:
+        return session.scalar(select(func.count()).select_from(TransactionRecord))
+
+async def _issue(manager, recipient):
+    transaction = await manager.create_transaction(
+        type=TransactionType.ISSUANCE,
+        amount=Decimal("1.5"),
+        recipient=recipient,
+        sender="DACR",
+        metadata={"reason": "test"}
+    )
+    await manager.execute_transaction(transaction.id)
+    return transaction
+
+@pytest.mark.asyncio
+async def test_sync_mode_commits_each_write(session_factory):
+    persistence = LedgerPersistence(session_factory, mode=DurabilityMode.SYNC)
+    manager = TransactionManager(persistence=persistence)
+    
+    transaction = await _issue(manager, "alice")
+    
+    assert _count_rows(session_factory) == 1
+    with session_factory() as session:
+        record = session.get(TransactionRecord, transaction.id)
+        assert record.amount == Decimal("1.5")
+        assert record.meta == {"reason": "test"}
+
+@pytest.mark.asyncio
+async def test_batched_mode_flushes_on_size_threshold(session_factory):
+    persistence = LedgerPersistence(
+        session_factory,
+        mode=DurabilityMode.BATCHED,
+        batch_size=3,
+        flush_interval=60
+    )
+    await persistence.start()
+    manager = TransactionManager(persistence=persistence)
+    
+    await _issue(manager, "alice")
+    await _issue(manager, "bob")
+    assert persistence.pending_count == 2
+    assert _count_rows(session_factory) == 0
+    
+    await _issue(manager, "carol")
+    await _issue(manager, "dave")
+    await persistence.stop()
+    
+    assert persistence.pending_count == 0
+    assert persistence.persisted_count == 4
+    assert _count_rows(session_factory) == 4
+
+@pytest.mark.asyncio
+async def test_iter_transactions_filters_in_sql(session_factory):
+    persistence = LedgerPersistence(session_factory, mode=DurabilityMode.SYNC)
+    manager = TransactionManager(persistence=persistence)
+    
+    issued = [await _issue(manager, recipient) for recipient in ("alice", "bob", "alice", "alice")]
+    alice_ids = [tx.id for tx in issued if tx.recipient == "alice"]
+    
+    streamed = list(persistence.iter_transactions(address="alice", chunk_size=2))
+    assert [tx.id for tx in streamed] == alice_ids
+    assert streamed[0].metadata == {"reason": "test"}
+    
+    resumed = persistence.iter_transactions(
+        address="alice",
+        after=(streamed[0].timestamp, streamed[0].id)
+    )
+    assert [tx.id for tx in resumed] == alice_ids[1:]
+    
+    assert list(persistence.iter_transactions(type=TransactionType.BURN)) == []
+
+@pytest.mark.asyncio
+async def test_rejected_row_is_dead_lettered(session_factory, tmp_path):
+    dead_letters = tmp_path / "dead_letter.jsonl"
+    persistence = LedgerPersistence(
+        session_factory,
+        mode=DurabilityMode.BATCHED,
+        flush_interval=60,
+        max_attempts=2,
+        dead_letter_path=str(dead_letters)
+    )
+    manager = TransactionManager(persistence=persistence)
+    
+    duplicate = await _issue(manager, "alice")
+    await persistence.flush()
+    # Recorded again with an ID the table already holds, so its insert always fails
+    await persistence.record(duplicate)
+    await _issue(manager, "bob")
+    
+    with pytest.raises(IntegrityError):
+        await persistence.flush()
+    assert _count_rows(session_factory) == 2
+    assert persistence.pending_count == 1
+    
+    await _issue(manager, "carol")
+    with pytest.raises(IntegrityError):
+        await persistence.flush()
+    assert _count_rows(session_factory) == 3
+    assert persistence.pending_count == 0
+    assert persistence.dead_letter_count == 1
+    
+    [record] = [json.loads(line) for line in dead_letters.read_text().splitlines()]
+    assert record["attempts"] == 2
+    assert record["transaction"]["id"] == duplicate.id
+    assert await persistence.flush() == 0
+
+@pytest.mark.asyncio
+async def test_stop_dead_letters_rows_it_cannot_write(session_factory, tmp_path):
+    dead_letters = tmp_path / "dead_letter.jsonl"
+    available = {"db": True}
+    
+    def sessions():
+        if not available["db"]:
+            raise RuntimeError("db down")
+        return session_factory()
+        
+    persistence = LedgerPersistence(
+        sessions,
+        mode=DurabilityMode.BATCHED,
+        flush_interval=60,
+        dead_letter_path=str(dead_letters)
+    )
+    await persistence.start()
+    manager = TransactionManager(persistence=persistence)
+    transaction = await _issue(manager, "alice")
+    
+    available["db"] = False
+    await persistence.stop()
+    
+    assert persistence.pending_count == 0
+    assert persistence.dead_letter_count == 1
+    [record] = [json.loads(line) for line in dead_letters.read_text().splitlines()]
+    assert record["transaction"]["id"] == transaction.id
+    assert record["error"] == "db down"
@@ -0,0 +1,94 @@
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.amount import to_units
+from app.core.reserve_history import ReserveHistoryStore
+from app.core.reserves import ReserveManager, ReserveType
+from app.models.base import Base
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reserves.db'}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+@pytest.mark.asyncio
+async def test_changes_are_rolled_up(session_factory):
+    store = ReserveHistoryStore(session_factory)
+    start = datetime(2024, 1, 1, 12, 0)
+    for seconds, level in ((0, "10"), (20, "30"), (50, "20"), (70, "5")):
+        await store.record({"storage": to_units(Decimal(level))}, start + timedelta(seconds=seconds))
+        
+    end = start + timedelta(minutes=5)
+    raw = await store.history(start, end, resolution="raw")
+    minutes = await store.history(start, end, resolution="minute")
+    hours = await store.history(start, end, resolution="hour")
+    
+    assert [point["amount"] for point in raw] == [Decimal("10"), Decimal("30"), Decimal("20"), Decimal("5")]
+    assert [(point["min"], point["max"], point["avg"], point["amount"]) for point in minutes] == [
+        (Decimal("10"), Decimal("30"), Decimal("20"), Decimal("20")),
+        (Decimal("5"), Decimal("5"), Decimal("5"), Decimal("5"))
+    ]
+    assert len(hours) == 1 and hours[0]["avg"] == Decimal("16.25")
+
+@pytest.mark.asyncio
+async def test_long_ranges_use_coarse_rollups_and_retention(session_factory):
+    store = ReserveHistoryStore(
+        session_factory,
+        retention={"raw": 3600, "minute": 86400},
+        max_points=200
+    )
+    now = datetime.utcnow()
+    await store.record({"storage": to_units(Decimal("1"))}, now - timedelta(days=3))
+    await store.record({"storage": to_units(Decimal("2"))}, now)
+    store.prune(now)
+    
+    week = await store.history(now - timedelta(days=7), now)
+    assert {point["resolution"] for point in week} == {"hour"}
+    assert [point["amount"] for point in week] == [Decimal("1"), Decimal("2")]
+    # The old sample's raw row and minute bucket are gone
+    assert len(await store.history(now - timedelta(days=7), now, resolution="raw")) == 1
+    assert len(await store.history(now - timedelta(days=7), now, resolution="minute")) == 1
+
+@pytest.mark.asyncio
+async def test_raw_reads_return_the_newest_rows(session_factory):
+    store = ReserveHistoryStore(session_factory, max_raw_rows=3)
+    start = datetime(2024, 1, 1)
+    for level in range(10):
+        await store.record({"storage": to_units(Decimal(level))}, start + timedelta(seconds=level))
+        
+    raw = await store.history(start, start + timedelta(minutes=1), resolution="raw")
+    assert [point["amount"] for point in raw] == [Decimal("7"), Decimal("8"), Decimal("9")]
+
+@pytest.mark.asyncio
+async def test_reserve_manager_records_changes(session_factory):
+    manager = ReserveManager(history=ReserveHistoryStore(session_factory))
+    await manager.add_to_reserves(ReserveType.STORAGE, Decimal("8"))
+    await manager.remove_from_reserves(ReserveType.STORAGE, Decimal("3"))
+    
+    now = datetime.utcnow()
+    history = await manager.get_history(now - timedelta(minutes=1), now, ReserveType.STORAGE, "raw")
+    
+    assert [point["amount"] for point in history] == [Decimal("8"), Decimal("5")]
+
+@pytest.mark.asyncio
+async def test_batch_adjustment_records_one_snapshot(session_factory):
+    manager = ReserveManager(history=ReserveHistoryStore(session_factory))
+    await manager.add_to_reserves(ReserveType.STORAGE, Decimal("8"))
+    assert await manager.apply_adjustments([
+        (ReserveType.STORAGE, Decimal("-3")),
+        (ReserveType.COMPUTATIONAL, Decimal("10")),
+        (ReserveType.STORAGE, Decimal("1"))
+    ])
+    
+    now = datetime.utcnow()
+    history = await manager.get_history(now - timedelta(minutes=1), now, resolution="raw")
+    
+    assert sorted((point["reserve_type"], point["amount"]) for point in history) == [
+        ("computational", Decimal("10")),
+        ("storage", Decimal("6")),
+        ("storage", Decimal("8"))
+    ]
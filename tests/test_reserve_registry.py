@@ -0,0 +1,72 @@
+import pytest
+from decimal import Decimal
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.deps import get_current_user
+from app.core.amount import from_units
+from app.core.reserve_registry import ReserveRegistry
+from app.core.reserves import ReserveManager, ReserveType
+
+def test_registry_revalues_in_bulk():
+    registry = ReserveRegistry(capacity=2)
+    for i in range(5):
+        registry.upsert(f"gpu-{i}", quantity=10, price=2.0, weight=0.5, category="gpu")
+    registry.upsert("disk-0", quantity=100, price=0.1, weight=1.0, category="storage")
+    
+    registry.update_prices(["gpu-1", "gpu-3"], [4.0, 4.0])
+    assert registry.total_value() == pytest.approx(5 * 20 + 2 * 20 + 10)
+    assert registry.totals_by_category() == pytest.approx({"gpu": 70.0, "storage": 10.0})
+    
+    assert registry.remove("gpu-0")
+    assert len(registry) == 5
+    assert {item["item_id"]: item["value"] for item in registry.items()}["gpu-3"] == 40.0
+    with pytest.raises(KeyError):
+        registry.update_prices(["gpu-0"], [1.0])
+
+@pytest.mark.asyncio
+async def test_line_items_add_to_the_exact_total():
+    manager = ReserveManager()
+    await manager.add_to_reserves(ReserveType.COMPUTATIONAL, Decimal("100"))
+    await manager.add_to_reserves(ReserveType.STORAGE, Decimal("50.00000000000000001"))
+    assert await manager.get_total_reserves() == Decimal("55.000000000000000003")
+    
+    assert await manager.upsert_reserve_item("gpu-pool-a", quantity=8, price=2.5, weight=0.5)
+    assert await manager.get_total_reserves() == Decimal("65.000000000000000003")
+    assert not await manager.update_prices({"gpu-pool-a": 1.0, "unknown": 1.0})
+    assert await manager.update_prices({"gpu-pool-a": 1.0})
+    assert await manager.get_total_reserves() == Decimal("59.000000000000000003")
+    
+    restored = ReserveManager()
+    restored.load_state(manager.export_state())
+    assert await restored.get_total_reserves() == Decimal("59.000000000000000003")
+
+@pytest.mark.asyncio
+async def test_line_item_total_follows_each_change():
+    manager = ReserveManager()
+    for i in range(20):
+        assert await manager.upsert_reserve_item(f"gpu-{i % 7}", quantity=i, price=0.1, weight=0.3)
+    assert await manager.update_prices({"gpu-2": 3.3, "gpu-5": 0.7})
+    assert await manager.remove_reserve_item("gpu-4")
+    
+    leaves = sum(manager.merkle_tree.get(f"item:gpu-{i}") for i in range(7))
+    assert await manager.get_total_reserves() == from_units(leaves)
+    restored = ReserveManager()
+    restored.load_state(manager.export_state())
+    assert await restored.get_total_reserves() == await manager.get_total_reserves()
+
+def test_line_item_changes_require_an_admin():
+    app.dependency_overrides[get_current_user] = lambda: "alice"
+    try:
+        with TestClient(app) as client:
+            responses = [
+                client.put("/api/v1/reserves/items/gpu-0", json={"quantity": 1, "price": 1, "weight": 1}),
+                client.delete("/api/v1/reserves/items/gpu-0"),
+                client.post("/api/v1/reserves/prices", json={"prices": {"gpu-0": 2}})
+            ]
+            listed = client.get("/api/v1/reserves/items")
+    finally:
+        app.dependency_overrides.clear()
+        
+    assert [response.status_code for response in responses] == [403, 403, 403]
+    assert listed.status_code == 200
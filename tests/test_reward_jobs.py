@@ -0,0 +1,91 @@
+import pytest
+import json
+from decimal import Decimal
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.deps import get_current_user
+from app.core.distribution import DistributionManager, RewardTier, RewardType
+from app.core.reward_jobs import JobStatus, RewardDistributionJob
+
+REWARDS = [
+    {"user_id": "alice", "reward_type": "engagement", "metadata": {"duration": 1800}},
+    {"user_id": "bob", "reward_type": "task_completion", "metadata": {"complexity": 2.5}},
+    {"user_id": "carol", "reward_type": "milestone", "metadata": {"importance": 60}},
+    {"user_id": "dave", "reward_type": "contribution", "metadata": {"impact": "bad"}},
+    {"user_id": "erin", "reward_type": "contribution", "metadata": {"impact": 3}}
+]
+
+def write_rewards(path, lines):
+    path.write_text("".join(line if isinstance(line, str) else json.dumps(line) + "\n" for line in lines))
+    return path
+
+@pytest.mark.asyncio
+async def test_bulk_job_matches_per_user_rewards(tmp_path):
+    input_path = write_rewards(tmp_path / "rewards.jsonl", REWARDS + ["not json\n"])
+    distribution = DistributionManager()
+    result = await RewardDistributionJob(distribution, str(input_path), chunk_size=2).run()
+    
+    expected = DistributionManager()
+    for reward in REWARDS:
+        if reward["user_id"] == "dave":
+            continue
+        reward_type = RewardType(reward["reward_type"])
+        amount = await expected.calculate_reward(reward["user_id"], reward_type, reward["metadata"])
+        await expected.distribute_reward(reward["user_id"], amount, reward_type)
+        
+    assert result["status"] == "completed"
+    assert (result["lines"], result["paid"], result["failed"]) == (6, 4, 2)
+    assert result["amount"] == Decimal("1.5") + Decimal("2.5") + Decimal("120") + Decimal("4.5")
+    assert distribution.export_state() == expected.export_state()
+    assert await distribution.get_user_tier("carol") == RewardTier.INTERMEDIATE
+
+@pytest.mark.asyncio
+async def test_job_resumes_from_checkpoint(tmp_path):
+    input_path = write_rewards(tmp_path / "rewards.jsonl", REWARDS)
+    checkpoint_path = tmp_path / "rewards.checkpoint"
+    distribution = DistributionManager()
+    
+    def stop_after_first_chunk(progress):
+        raise RuntimeError("interrupted")
+        
+    interrupted = await RewardDistributionJob(
+        distribution,
+        str(input_path),
+        checkpoint_path=str(checkpoint_path),
+        chunk_size=2,
+        checkpoint_state=True,
+        progress=stop_after_first_chunk
+    ).run()
+    assert interrupted["status"] == JobStatus.FAILED.value and interrupted["lines"] == 2
+    
+    # A fresh process starts from the checkpoint's state, not from scratch
+    resumed_distribution = DistributionManager()
+    resumed = await RewardDistributionJob(
+        resumed_distribution,
+        str(input_path),
+        checkpoint_path=str(checkpoint_path),
+        chunk_size=2,
+        checkpoint_state=True
+    ).run()
+    again = await RewardDistributionJob(
+        resumed_distribution,
+        str(input_path),
+        checkpoint_path=str(checkpoint_path),
+        checkpoint_state=True
+    ).run()
+    
+    assert (resumed["lines"], resumed["paid"], resumed["failed"]) == (5, 4, 1)
+    assert again["paid"] == 4 and again["amount"] == resumed["amount"]
+    assert await resumed_distribution.get_user_balance("alice") == Decimal("1.5")
+    assert await resumed_distribution.get_user_balance("erin") == Decimal("4.5")
+
+def test_reward_jobs_require_an_admin():
+    app.dependency_overrides[get_current_user] = lambda: "alice"
+    try:
+        with TestClient(app) as client:
+            response = client.post("/api/v1/admin/rewards/jobs", json={"input_file": "rewards.jsonl"})
+    finally:
+        app.dependency_overrides.clear()
+        
+    assert response.status_code == 403
@@ -0,0 +1,91 @@
+import pytest
+import asyncio
+from decimal import Decimal
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.deps import get_current_user, get_distribution_manager, get_reward_queue
+from app.core.distribution import DistributionManager, RewardTier
+from app.core.reward_queue import RewardQueue
+
+@pytest.mark.asyncio
+async def test_credits_are_merged_per_user():
+    distribution = DistributionManager()
+    queue = RewardQueue(distribution, flush_interval=60)
+    await queue.start()
+    for _ in range(100):
+        assert await queue.submit("alice", Decimal("1.01"))
+        assert await queue.submit("bob", Decimal("0.000000000000000001"))
+    assert not await queue.submit("carol", Decimal("0.0000000000000000001"))
+    assert await distribution.get_user_balance("alice") == Decimal("0")
+    
+    # Stopping applies what is still pending
+    await queue.stop()
+    
+    assert await distribution.get_user_balance("alice") == Decimal("101")
+    assert await distribution.get_user_balance("bob") == Decimal("0.0000000000000001")
+    assert await distribution.get_user_tier("alice") == RewardTier.INTERMEDIATE
+    assert (queue.submitted_count, queue.applied_count) == (200, 2)
+
+@pytest.mark.asyncio
+async def test_full_queue_waits_for_a_flush():
+    distribution = DistributionManager()
+    queue = RewardQueue(distribution, flush_interval=60, max_pending=2)
+    await queue.start()
+    await queue.submit("alice", Decimal("1"))
+    await queue.submit("bob", Decimal("1"))
+    # A third user waits for the flusher, a known one does not
+    await queue.submit("alice", Decimal("1"))
+    await asyncio.wait_for(queue.submit("carol", Decimal("1")), timeout=5)
+    
+    assert await distribution.get_user_balance("alice") == Decimal("2")
+    assert queue.pending_count == 1
+    await queue.stop()
+    assert await distribution.get_user_balance("carol") == Decimal("1")
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_the_credits(monkeypatch):
+    distribution = DistributionManager()
+    queue = RewardQueue(distribution, flush_interval=60)
+    credit_rewards = distribution.credit_rewards
+    
+    async def unavailable(credits):
+        raise RuntimeError("unavailable")
+        
+    await queue.submit("alice", Decimal("1"))
+    monkeypatch.setattr(distribution, "credit_rewards", unavailable)
+    with pytest.raises(RuntimeError):
+        await queue.flush()
+    await queue.submit("alice", Decimal("2"))
+    
+    monkeypatch.setattr(distribution, "credit_rewards", credit_rewards)
+    assert await queue.flush() == 1
+    assert await distribution.get_user_balance("alice") == Decimal("3")
+
+def test_rewards_are_credited_through_the_queue():
+    distribution = DistributionManager()
+    queue = RewardQueue(distribution, flush_interval=60)
+    user = {"name": "alice"}
+    app.dependency_overrides[get_current_user] = lambda: user["name"]
+    app.dependency_overrides[get_distribution_manager] = lambda: distribution
+    app.dependency_overrides[get_reward_queue] = lambda: queue
+    reward = {"user_id": "bob", "reward_type": "engagement", "metadata": {"duration": 1800}}
+    try:
+        with TestClient(app) as client:
+            refused = client.post("/api/v1/admin/rewards", json=reward)
+            user["name"] = "admin"
+            responses = [client.post("/api/v1/admin/rewards", json=reward) for _ in range(3)]
+            invalid = client.post(
+                "/api/v1/admin/rewards",
+                json={"user_id": "bob", "reward_type": "contribution", "metadata": {"impact": "bad"}}
+            )
+    finally:
+        app.dependency_overrides.clear()
+        
+    assert refused.status_code == 403
+    assert [response.status_code for response in responses] == [202, 202, 202]
+    assert Decimal(responses[0].json()["amount"]) == Decimal("1.5")
+    assert invalid.status_code == 400
+    assert queue.pending_count == 1
+    asyncio.run(queue.flush())
+    assert asyncio.run(distribution.get_user_balance("bob")) == Decimal("4.5")
@@ -0,0 +1,63 @@
+import pytest
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.core.analytics import AnalyticsManager
+from app.core.series import TimeSeries
+
+def _fields(aggregate):
+    return aggregate.count, aggregate.sum, aggregate.min, aggregate.max, aggregate.last
+
+def test_range_summaries_match_a_scan():
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1)
+    series = TimeSeries(capacity=4)
+    points = []
+    for i in range(300):
+        timestamp, value = start + timedelta(seconds=i // 3), rng.randrange(-10 ** 6, 10 ** 6)
+        series.append(timestamp, value)
+        points.append((timestamp, value))
+        
+    for _ in range(200):
+        low, high = sorted(start + timedelta(seconds=rng.randrange(-5, 105)) for _ in range(2))
+        values = [value for timestamp, value in points if low <= timestamp <= high]
+        summary = series.summary(low, high)
+        if not values:
+            assert summary is None
+            continue
+        assert _fields(summary) == (len(values), sum(values), min(values), max(values), values[-1])
+        
+    values = [value for _, value in points]
+    expected = (300, sum(values), min(values), max(values), values[-1])
+    assert _fields(series.summary()) == _fields(series.summary(start, None)) == expected
+
+def test_earlier_timestamps_are_placed_at_the_last():
+    series = TimeSeries()
+    series.append(datetime(2024, 1, 2), 5)
+    series.append(datetime(2024, 1, 1), 7)
+    
+    assert series.summary(end_time=datetime(2024, 1, 1, 12)) is None
+    assert series.summary(start_time=datetime(2024, 1, 2)).count == 2
+
+@pytest.mark.asyncio
+async def test_supply_metrics_with_and_without_range():
+    analytics = AnalyticsManager()
+    assert (await analytics.get_supply_metrics())["current_supply"] == Decimal("0")
+    for amount in ("100", "250.5", "50"):
+        await analytics.record_supply_change(Decimal(amount))
+        
+    metrics = await analytics.get_supply_metrics()
+    assert metrics == {
+        "current_supply": Decimal("50"),
+        "max_supply": Decimal("250.5"),
+        "min_supply": Decimal("50"),
+        "average_supply": Decimal("133.5")
+    }
+    future = datetime.utcnow() + timedelta(days=1)
+    assert await analytics.get_supply_metrics(start_time=future) == {
+        "current_supply": Decimal("0"),
+        "max_supply": Decimal("0"),
+        "min_supply": Decimal("0"),
+        "average_supply": Decimal("0")
+    }
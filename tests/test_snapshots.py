@@ -0,0 +1,130 @@
+import pytest
+import asyncio
+from decimal import Decimal
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.deps import get_current_user
+from app.core.currency import CurrencyManager
+from app.core.reserves import ReserveManager, ReserveType
+from app.core.snapshots import SnapshotCache, StateVersion
+
+def test_unchanged_info_returns_304():
+    app.dependency_overrides[get_current_user] = lambda: "alice"
+    try:
+        with TestClient(app) as client:
+            first = client.get("/api/v1/currency/info")
+            etag = first.headers["ETag"]
+            unchanged = client.get("/api/v1/currency/info", headers={"If-None-Match": etag})
+            client.post(
+                "/api/v1/currency/issue",
+                json={"amount": "1", "recipient": "snapshot-test", "reason": "test"}
+            )
+            changed = client.get("/api/v1/currency/info", headers={"If-None-Match": etag})
+    finally:
+        app.dependency_overrides.clear()
+        
+    assert first.status_code == 200
+    assert unchanged.status_code == 304
+    assert unchanged.headers["ETag"] == etag
+    assert changed.status_code == 200
+    assert Decimal(changed.json()["total_supply"]) == Decimal(first.json()["total_supply"]) + 1
+
+@pytest.mark.asyncio
+async def test_snapshot_is_rebuilt_only_after_a_change():
+    version = StateVersion()
+    currency_manager = CurrencyManager(state_version=version)
+    cache = SnapshotCache(version)
+    builds = []
+    
+    async def build() -> bytes:
+        builds.append(1)
+        return str(await currency_manager.get_supply()).encode()
+        
+    first = await cache.get("info", build)
+    assert await cache.get("info", build) == first
+    await currency_manager.issue_currency(Decimal("3"), "test")
+    
+    assert (await cache.get("info", build)).body == b"3"
+    assert len(builds) == 2
+
+@pytest.mark.asyncio
+async def test_etag_ignores_the_build_time():
+    builds = iter([
+        b'{"total_supply": "3", "timestamp": "2026-01-01T00:00:00"}',
+        b'{"timestamp": "2026-01-02T00:00:00", "total_supply": "3"}',
+        b'{"total_supply": "4", "timestamp": "2026-01-02T00:00:00"}'
+    ])
+    
+    async def build() -> bytes:
+        return next(builds)
+        
+    # A restarted process starts over at version 0 with a fresh cache
+    before = await SnapshotCache(StateVersion()).get("info", build)
+    after = await SnapshotCache(StateVersion()).get("info", build)
+    changed = await SnapshotCache(StateVersion()).get("info", build)
+    assert after.etag == before.etag
+    assert changed.etag != before.etag
+
+@pytest.mark.asyncio
+async def test_long_poll_wakes_on_change():
+    version = StateVersion()
+    currency_manager = CurrencyManager(state_version=version)
+    cache = SnapshotCache(version)
+    
+    async def build() -> bytes:
+        return str(await currency_manager.get_supply()).encode()
+        
+    current = await cache.get("info", build)
+    poll = asyncio.ensure_future(cache.poll("info", build, current.etag, wait=5))
+    await asyncio.sleep(0.01)
+    assert not poll.done()
+    
+    await currency_manager.issue_currency(Decimal("2"), "test")
+    changed = await asyncio.wait_for(poll, 1)
+    assert changed.body == b"2"
+    
+    # Without a change the poll returns the same snapshot once the wait is over
+    assert (await cache.poll("info", build, changed.etag, wait=0.05)) == changed
+
+@pytest.mark.asyncio
+async def test_batch_adjustment_is_one_change():
+    version = StateVersion()
+    reserve_manager = ReserveManager(state_version=version)
+    await reserve_manager.add_to_reserves(ReserveType.STORAGE, Decimal("5"))
+    before = version.value
+    
+    # Netted per type, so removing 7 of 5 after adding 4 is fine
+    assert await reserve_manager.apply_adjustments([
+        (ReserveType.STORAGE, Decimal("4")),
+        (ReserveType.STORAGE, Decimal("-7")),
+        (ReserveType.ENGAGEMENT, Decimal("2"))
+    ])
+    assert version.value == before + 1
+    
+    # Rejected as a whole: nothing changes and nothing is bumped
+    assert not await reserve_manager.apply_adjustments([
+        (ReserveType.ENGAGEMENT, Decimal("1")),
+        (ReserveType.STORAGE, Decimal("-3"))
+    ])
+    assert version.value == before + 1
+    assert await reserve_manager.get_reserve_status() == {
+        "computational": Decimal("0"),
+        "storage": Decimal("2"),
+        "engagement": Decimal("2")
+    }
+
+def test_batch_adjustment_requires_an_admin():
+    user = {"name": "alice"}
+    app.dependency_overrides[get_current_user] = lambda: user["name"]
+    body = {"adjustments": [{"reserve_type": "storage", "amount": "1"}]}
+    try:
+        with TestClient(app) as client:
+            forbidden = client.post("/api/v1/reserves/adjustments", json=body)
+            user["name"] = "admin"
+            allowed = client.post("/api/v1/reserves/adjustments", json=body)
+    finally:
+        app.dependency_overrides.clear()
+        
+    assert forbidden.status_code == 403
+    assert allowed.status_code == 200
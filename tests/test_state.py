@@ -0,0 +1,142 @@
+import pytest
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.deps import get_current_user
+from app.core.balances import BalanceBook
+from app.core.config import get_settings
+from app.core.currency import CurrencyManager
+from app.core.growth import SupplyGrowthLimiter
+from app.core.shared_state import SharedLedger, SharedStateStore
+from app.core.state import StateRegistry
+from app.core.transactions import TransactionManager, TransactionType
+
+WORKERS = 4
+
+def test_state_persists_across_requests():
+    app.dependency_overrides[get_current_user] = lambda: "alice"
+    try:
+        with TestClient(app) as client:
+            before = Decimal(client.get("/api/v1/currency/info").json()["total_supply"])
+            for _ in range(2):
+                response = client.post(
+                    "/api/v1/currency/issue",
+                    json={"amount": "5", "recipient": "state-test", "reason": "test"}
+                )
+                assert response.status_code == 200
+            after = Decimal(client.get("/api/v1/currency/info").json()["total_supply"])
+            balance = client.get("/api/v1/currency/balance/state-test").json()["balance"]
+    finally:
+        app.dependency_overrides.clear()
+        
+    assert after - before == Decimal("10")
+    assert Decimal(balance) == Decimal("10")
+
+def _worker(path: str) -> int:
+    """Issues 50 DAC and tries 50 transfers of 1 DAC from a shared balance"""
+    async def run() -> int:
+        store = SharedStateStore(path)
+        currency = CurrencyManager(shared_store=store)
+        manager = TransactionManager(balances=BalanceBook(SharedLedger(store)))
+        executed = 0
+        for _ in range(50):
+            await currency.issue_currency(Decimal("1"), "test")
+            transaction = await manager.create_transaction(
+                type=TransactionType.TRANSFER,
+                amount=Decimal("1"),
+                sender="alice",
+                recipient="bob"
+            )
+            executed += await manager.execute_transaction(transaction.id)
+        store.close()
+        return executed
+    return asyncio.run(run())
+
+def test_workers_share_supply_and_balances(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = SharedStateStore(path)
+    store.adjust_balance("alice", Decimal("120"))
+    
+    with ProcessPoolExecutor(WORKERS) as pool:
+        executed = sum(pool.map(_worker, [path] * WORKERS))
+        
+    assert executed == 120
+    assert store.get_counter("total_supply") == Decimal(WORKERS * 50)
+    assert store.get_balance("alice") == Decimal("0")
+    assert store.get_balance("bob") == Decimal("120")
+
+@pytest.mark.asyncio
+async def test_workers_share_the_growth_window(tmp_path):
+    path = str(tmp_path / "state.db")
+    stores = [SharedStateStore(path) for _ in range(2)]
+    workers = [
+        CurrencyManager(
+            shared_store=store,
+            min_reserve_ratio=None,
+            growth_limiter=SupplyGrowthLimiter(0.1, window_seconds=3600, num_buckets=6, min_allowance=100, store=store)
+        )
+        for store in stores
+    ]
+    
+    assert await workers[0].issue_currency(Decimal("60"), "test")
+    assert not await workers[1].issue_currency(Decimal("60"), "test")
+    assert await workers[1].issue_currency(Decimal("40"), "test")
+    assert not await workers[0].issue_currency(Decimal("1"), "test")
+    assert stores[0].get_counter("total_supply") == Decimal("100")
+    for store in stores:
+        store.close()
+
+def test_per_worker_reserves_cannot_back_shared_supply(tmp_path):
+    settings = get_settings().model_copy(update={
+        "SHARED_STATE_ENABLED": True,
+        "SHARED_STATE_PATH": str(tmp_path / "state.db"),
+        "RESERVE_RATIO_ENFORCED": True
+    })
+    with pytest.raises(ValueError):
+        StateRegistry(settings)
+
+@pytest.mark.asyncio
+async def test_stop_closes_the_ledger_log_after_a_failure(tmp_path, monkeypatch):
+    settings = get_settings().model_copy(update={
+        "LEDGER_LOG_ENABLED": True,
+        "LEDGER_LOG_DIR": str(tmp_path / "ledger")
+    })
+    registry = StateRegistry(settings)
+    await registry.start()
+    assert await registry.currency.issue_currency(Decimal("5"), "test")
+    transaction = await registry.transactions.create_transaction(
+        type=TransactionType.ISSUANCE,
+        amount=Decimal("5"),
+        recipient="alice",
+        sender="DACR"
+    )
+    assert await registry.transactions.execute_transaction(transaction.id)
+    
+    stop_queue = registry.reward_queue.stop
+    
+    async def failing_stop():
+        await stop_queue()
+        raise RuntimeError("stop failed")
+        
+    monkeypatch.setattr(registry.reward_queue, "stop", failing_stop)
+    with pytest.raises(RuntimeError):
+        await registry.stop()
+        
+    # Later components were still stopped, so the final snapshot was taken
+    assert list((tmp_path / "ledger").rglob("*.json"))
+
+def test_shared_amounts_keep_every_unit(tmp_path):
+    store = SharedStateStore(str(tmp_path / "state.db"))
+    unit = Decimal("1E-18")
+    assert store.add_to_counter("total_supply", Decimal("20000000000"))
+    assert store.add_to_counter("total_supply", unit)
+    assert not store.add_to_counter("total_supply", unit, maximum=Decimal("20000000000.000000000000000001"))
+    store.adjust_balance("alice", Decimal("20000000000"))
+    store.adjust_balance("alice", unit)
+    
+    assert store.get_counter("total_supply") == Decimal("20000000000.000000000000000001")
+    assert store.get_balance("alice") == Decimal("20000000000.000000000000000001")
+    store.close()
@@ -0,0 +1,142 @@
+import pytest
+import asyncio
+import time
+from decimal import Decimal
+from datetime import datetime
+
+from app.core.transactions import TransactionManager, TransactionType, TransactionStatus
+
+@pytest.fixture
+def transaction_manager():
+    return TransactionManager()
+
+async def _execute(manager, type, amount, recipient, sender=None):
+    transaction = await manager.create_transaction(
+        type=type,
+        amount=Decimal(amount),
+        recipient=recipient,
+        sender=sender
+    )
+    await manager.execute_transaction(transaction.id)
+    return transaction
+
+@pytest.mark.asyncio
+async def test_transactions_by_address_uses_sender_and_recipient(transaction_manager):
+    issued = await _execute(transaction_manager, TransactionType.ISSUANCE, "100", "alice", "DACR")
+    sent = await _execute(transaction_manager, TransactionType.TRANSFER, "10", "bob", "alice")
+    await _execute(transaction_manager, TransactionType.TRANSFER, "5", "carol", "bob")
+    
+    alice = await transaction_manager.get_transactions_by_address("alice")
+    assert [tx.id for tx in alice] == [issued.id, sent.id]
+    
+    transfers = await transaction_manager.get_transactions_by_address(
+        "alice", type=TransactionType.TRANSFER
+    )
+    assert [tx.id for tx in transfers] == [sent.id]
+    
+    assert await transaction_manager.get_transactions_by_address("nobody") == []
+
+@pytest.mark.asyncio
+async def test_pending_transactions_are_not_indexed(transaction_manager):
+    await transaction_manager.create_transaction(
+        type=TransactionType.TRANSFER,
+        amount=Decimal("1"),
+        recipient="bob",
+        sender="alice"
+    )
+    assert await transaction_manager.get_transactions_by_address("alice") == []
+    assert await transaction_manager.get_transaction_history() == []
+
+@pytest.mark.asyncio
+async def test_transaction_history_range(transaction_manager):
+    first = await _execute(transaction_manager, TransactionType.ISSUANCE, "1", "alice", "DACR")
+    second = await _execute(transaction_manager, TransactionType.TRANSFER, "1", "bob", "alice")
+    third = await _execute(transaction_manager, TransactionType.TRANSFER, "1", "carol", "bob")
+    
+    history = await transaction_manager.get_transaction_history()
+    assert [tx.id for tx in history] == [first.id, second.id, third.id]
+    
+    ranged = await transaction_manager.get_transaction_history(
+        start_time=second.timestamp,
+        end_time=third.timestamp,
+        status=TransactionStatus.COMPLETED
+    )
+    assert [tx.id for tx in ranged] == [second.id, third.id]
+    
+    issuances = await transaction_manager.get_transaction_history(type=TransactionType.ISSUANCE)
+    assert [tx.id for tx in issuances] == [first.id]
+    
+    assert await transaction_manager.get_transaction_history(end_time=datetime(2000, 1, 1)) == []
+
+@pytest.mark.asyncio
+async def test_create_and_execute_batch(transaction_manager):
+    from app.schemas.currency import TransferRequest
+    
+    transfers = [
+        TransferRequest(amount=Decimal("5"), recipient="bob"),
+        TransferRequest.model_construct(amount=Decimal("-1"), recipient="carol", metadata=None),
+        TransferRequest(amount=Decimal("2"), recipient="carol", metadata={"memo": "tip"})
+    ]
+    results = await transaction_manager.create_and_execute_batch("alice", transfers)
+    
+    assert [result.index for result in results] == [0, 1, 2]
+    assert results[1].transaction is None and results[1].error
+    assert results[0].transaction.status == TransactionStatus.COMPLETED
+    assert results[2].transaction.metadata == {"memo": "tip"}
+    
+    # Batch items share a timestamp, so they are ordered by ID
+    sent = await transaction_manager.get_transactions_by_address("alice")
+    assert [tx.id for tx in sent] == sorted([results[0].transaction.id, results[2].transaction.id])
+
+@pytest.mark.asyncio
+async def test_iter_transactions_resumes_after_cursor(transaction_manager):
+    from app.schemas.currency import TransferRequest
+    
+    # Batch items share one timestamp, so resuming has to find the cursor among ties
+    results = await transaction_manager.create_and_execute_batch(
+        "alice",
+        [TransferRequest(amount=Decimal(i + 1), recipient="bob") for i in range(5)]
+    )
+    ids = sorted(result.transaction.id for result in results)
+    
+    first_page = list(transaction_manager.iter_transactions(address="bob", chunk_size=2))[:2]
+    last = first_page[-1]
+    rest = transaction_manager.iter_transactions(address="bob", after=(last.timestamp, last.id), chunk_size=2)
+    
+    assert [tx.id for tx in first_page] + [tx.id for tx in rest] == ids
+
+@pytest.mark.asyncio
+async def test_expire_pending_fails_only_overdue_transactions():
+    manager = TransactionManager(pending_ttl=60)
+    abandoned = await manager.create_transaction(
+        type=TransactionType.TRANSFER,
+        amount=Decimal("1"),
+        recipient="bob",
+        sender="alice"
+    )
+    executed = await _execute(manager, TransactionType.ISSUANCE, "5", "alice")
+    
+    assert manager.expire_pending(time.monotonic() + 30) == 0
+    assert manager.expire_pending(time.monotonic() + 61) == 1
+    
+    assert abandoned.status == TransactionStatus.FAILED
+    assert executed.status == TransactionStatus.COMPLETED
+    assert await manager.get_transaction(abandoned.id) is None
+    assert not await manager.execute_transaction(abandoned.id)
+    assert manager.pending_count == 0
+    assert manager.expired_count == 1
+
+@pytest.mark.asyncio
+async def test_background_sweep_expires_pending():
+    manager = TransactionManager(pending_ttl=0)
+    transaction = await manager.create_transaction(
+        type=TransactionType.ISSUANCE,
+        amount=Decimal("1"),
+        recipient="bob"
+    )
+    await manager.start(sweep_interval=0.01)
+    await asyncio.sleep(0.05)
+    await manager.stop()
+    
+    assert transaction.status == TransactionStatus.FAILED
+    assert manager.expired_count == 1